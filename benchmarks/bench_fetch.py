@@ -0,0 +1,169 @@
+"""
+Offline throughput benchmark for adding movies through the OMDb fetch path.
+
+Starts the OMDb fixture server (benchmarks/omdb_stub.py) with the requested
+network conditions, points fetch_movie at it via OMDB_BASE_URL and measures:
+
+    single   one fetch + add_movie after the other, as the "Add movie" command does
+    bulk     all fetches in parallel (fetch_movies_data), then the adds
+
+Titles the fixtures don't know are answered with synthetic movies, so any
+number of adds can be simulated.
+
+Usage (from the project root):
+    python -m benchmarks.bench_fetch --count 200 --latency-ms 80 --jitter-ms 40
+    python -m benchmarks.bench_fetch --count 500 --error-rate 0.05 --rate-limit 50 --workers 16
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import fetch_movie
+from benchmarks.omdb_stub import DEFAULT_FIXTURES, start_stub
+from benchmarks.synthetic_catalogue import iter_synthetic_movies
+from storage.storage_json import StorageJson
+
+DEFAULT_COUNT = 100
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+def _summary(mode, titles, added, elapsed, latencies):
+    return {
+        "mode": mode,
+        "requested": len(titles),
+        "added": added,
+        "failed": len(titles) - added,
+        "seconds": elapsed,
+        "adds_per_second": added / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+    }
+
+
+def bench_single(storage, titles):
+    """
+    Fetch and add movies one at a time.
+
+    Args:
+        storage (IStorage): Storage to add to.
+        titles (list): Titles to add.
+
+    Returns:
+        dict: Throughput and per-add latency summary.
+    """
+    latencies = []
+    added = 0
+    start = time.perf_counter()
+    for title in titles:
+        began = time.perf_counter()
+        data = fetch_movie.fetch_movie_data(title, quiet=True)
+        if data:
+            storage.add_movie(*fetch_movie.parse_movie_data(data))
+            added += 1
+        latencies.append(time.perf_counter() - began)
+    return _summary("single", titles, added, time.perf_counter() - start, latencies)
+
+
+def bench_bulk(storage, titles, workers):
+    """
+    Fetch all movies concurrently, then add them.
+
+    Args:
+        storage (IStorage): Storage to add to.
+        titles (list): Titles to add.
+        workers (int): Parallel requests.
+
+    Returns:
+        dict: Throughput summary plus the time spent fetching.
+    """
+    start = time.perf_counter()
+    results = fetch_movie.fetch_movies_data(titles, workers)
+    fetched = time.perf_counter()
+    added = 0
+    for data in results.values():
+        if data:
+            storage.add_movie(*fetch_movie.parse_movie_data(data))
+            added += 1
+    summary = _summary(f"bulk x{workers}", titles, added, time.perf_counter() - start, [])
+    summary["fetch_seconds"] = fetched - start
+    return summary
+
+
+def run(count, workers, modes, fixtures, **conditions):
+    """
+    Run the benchmark against a freshly started stub server.
+
+    Args:
+        count (int): Movies to add per mode.
+        workers (int): Parallel requests in bulk mode.
+        modes (list): "single" and/or "bulk".
+        fixtures (str): Fixture file for the stub.
+        **conditions: NetworkConditions keyword arguments.
+
+    Returns:
+        dict: Conditions, per-mode results and the stub's outcome counts.
+    """
+    server = start_stub(fixtures, mode="synthetic", **conditions)
+    os.environ["OMDB_BASE_URL"] = server.base_url
+    os.environ.setdefault("OMDB_API_KEY", "offline-benchmark")
+    titles = [title for title, _ in iter_synthetic_movies(count)]
+    results = []
+    try:
+        for mode in modes:
+            with tempfile.TemporaryDirectory() as directory, \
+                    open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                storage = StorageJson(os.path.join(directory, "movies.json"))
+                if mode == "single":
+                    results.append(bench_single(storage, titles))
+                else:
+                    results.append(bench_bulk(storage, titles, workers))
+            print(f"{mode:<8} done", file=sys.stderr)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {"conditions": conditions, "results": results, "stub_outcomes": server.conditions.counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark adding movies against an offline OMDb stub.")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Movies to add per mode")
+    parser.add_argument("--workers", type=int, default=fetch_movie.BULK_WORKERS, help="Parallel bulk requests")
+    parser.add_argument("--modes", nargs="+", choices=("single", "bulk"), default=["single", "bulk"])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, help="Requests per second before 429 responses")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = run(args.count, args.workers, args.modes, args.fixtures, latency_ms=args.latency_ms,
+                 jitter_ms=args.jitter_ms, error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed)
+
+    print(f"\n{'mode':<10} {'added':>7} {'failed':>7} {'seconds':>9} {'adds/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for result in report["results"]:
+        print(f"{result['mode']:<10} {result['added']:>7} {result['failed']:>7} {result['seconds']:>9.2f} "
+              f"{result['adds_per_second']:>9.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+    print(f"stub outcomes: {report['stub_outcomes']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=4)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold-start benchmark: import the app and construct it in a fresh interpreter.
+
+Each run starts a new Python process, imports main and builds the app
+exactly as main.main() does (main.create_app()), and reports how long that
+took. The
+run fails (exit code 1) if the median exceeds the budget or if the network
+stack or a storage backend was loaded eagerly.
+
+Usage (from the project root):
+    python -m benchmarks.bench_startup --runs 20 --budget-ms 50 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+STARTUP_BUDGET_MS = 50.0
+DEFAULT_RUNS = 15
+
+# Modules that must not be imported before the first command needs them.
+DEFERRED_MODULES = ("requests", "dotenv", "storage.storage_json", "storage.storage_csv",
+                    "storage.watched_storage", "storage.file_watch")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+app = main.create_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_startup(runs):
+    """
+    Measure app import and construction time in fresh interpreters.
+
+    Args:
+        runs (int): Number of processes to start.
+
+    Returns:
+        dict: Per-run timings in seconds and modules that were loaded eagerly.
+    """
+    timings = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE % (DEFERRED_MODULES,)], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        loaded.update(result["loaded"])
+    return {"timings": timings, "eagerly_loaded": sorted(loaded)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MovieApp cold-start time.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    result = measure_startup(args.runs)
+    median_ms = statistics.median(result["timings"]) * 1000
+    report = {
+        "median_ms": median_ms,
+        "min_ms": min(result["timings"]) * 1000,
+        "budget_ms": args.budget_ms,
+        "eagerly_loaded": result["eagerly_loaded"],
+    }
+    print(f"Startup median: {median_ms:.1f} ms (min {report['min_ms']:.1f} ms, budget {args.budget_ms:.0f} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=4)
+
+    failed = False
+    if result["eagerly_loaded"]:
+        print(f"FAIL: loaded at startup: {', '.join(result['eagerly_loaded'])}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print("FAIL: startup exceeds the budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Local OMDb stand-in that records and replays API responses.
+
+Point the app at it with OMDB_BASE_URL=http://127.0.0.1:<port>/ and every
+fetch is answered from a fixture file instead of www.omdbapi.com, so the add
+and import paths can be tested offline and benchmarked reproducibly.
+Realistic network conditions are simulated on top:
+
+    latency        fixed delay plus uniform jitter per request
+    error rate     fraction of requests answered with HTTP 500
+    rate limit     requests per second (token bucket); excess gets 429 + Retry-After
+    daily limit    total requests before OMDb's 401 "Request limit reached!"
+
+Modes:
+    replay      answer from the fixtures; unknown titles get OMDb's "Movie not found!"
+    synthetic   like replay, but unknown titles get a generated, deterministic movie
+    record      forward unknown titles to the real API (needs OMDB_API_KEY) and
+                add the responses to the fixture file
+
+Usage (from the project root):
+    python -m benchmarks.omdb_stub --port 8099 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+    python -m benchmarks.omdb_stub --mode record --fixtures benchmarks/fixtures/omdb.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import urlopen
+
+from storage.atomic_file import atomic_write
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "omdb.json")
+# Fixture file key describing where the responses come from; not a title.
+ABOUT_KEY = "_about"
+UPSTREAM_URL = "http://www.omdbapi.com/"
+MODES = ("replay", "synthetic", "record")
+
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+NO_TITLE = {"Response": "False", "Error": "Incorrect IMDb ID."}
+LIMIT_REACHED = {"Response": "False", "Error": "Request limit reached!"}
+
+
+def fixture_key(title):
+    """
+    Normalize a title the way OMDb matches t= lookups (case-insensitive).
+
+    Args:
+        title (str): The requested title.
+
+    Returns:
+        str: The fixture key.
+    """
+    return " ".join(title.lower().split())
+
+
+def synthetic_response(title):
+    """
+    Generate a deterministic OMDb-shaped response for any title.
+
+    Args:
+        title (str): The requested title.
+
+    Returns:
+        dict: An OMDb "t=" response.
+    """
+    rng = random.Random(hashlib.sha1(fixture_key(title).encode("utf-8")).digest())
+    year = rng.randint(1920, 2025)
+    return {
+        "Title": title, "Year": str(year), "Rated": rng.choice(("G", "PG", "PG-13", "R")),
+        "Released": f"{rng.randint(1, 28):02d} Jan {year}", "Runtime": f"{rng.randint(80, 180)} min",
+        "Genre": ", ".join(rng.sample(("Action", "Drama", "Comedy", "Sci-Fi", "Thriller", "Romance"), 2)),
+        "Director": f"Director {rng.randint(1, 500)}", "Writer": f"Writer {rng.randint(1, 500)}",
+        "Actors": ", ".join(f"Actor {rng.randint(1, 2000)}" for _ in range(3)),
+        "Plot": "A synthetic movie served by the OMDb fixture server.", "Language": "English",
+        "Country": "United States", "Awards": "N/A",
+        "Poster": f"https://m.media-amazon.com/images/M/MV5B{rng.getrandbits(96):024x}._V1_SX300.jpg",
+        "Ratings": [], "Metascore": "N/A", "imdbRating": f"{rng.uniform(1, 9.9):.1f}",
+        "imdbVotes": f"{rng.randint(100, 2000000):,}", "imdbID": f"tt{rng.randint(1000000, 9999999)}",
+        "Type": "movie", "DVD": "N/A", "BoxOffice": "N/A", "Production": "N/A", "Website": "N/A",
+        "Response": "True",
+    }
+
+
+class FixtureStore:
+    """Recorded OMDb responses keyed by normalized title, optionally persisted."""
+
+    def __init__(self, path=None):
+        """
+        Initialize the store and load the fixture file if it exists.
+
+        Args:
+            path (str): JSON fixture file {key: response}, or None for memory only.
+                An optional "_about" entry describes the file's provenance.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._responses = {}
+        self.about = None
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fixture_file:
+                self._responses = json.load(fixture_file)
+            self.about = self._responses.pop(ABOUT_KEY, None)
+
+    def __len__(self):
+        return len(self._responses)
+
+    def get(self, title):
+        """
+        Look up the recorded response for a title.
+
+        Args:
+            title (str): The requested title.
+
+        Returns:
+            dict or None: The response, or None if it was never recorded.
+        """
+        return self._responses.get(fixture_key(title))
+
+    def record(self, title, response):
+        """
+        Store a response and rewrite the fixture file.
+
+        Args:
+            title (str): The requested title.
+            response (dict): The OMDb response.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._responses[fixture_key(title)] = response
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                content = dict(sorted(self._responses.items()))
+                if self.about:
+                    content = {ABOUT_KEY: self.about, **content}
+                with atomic_write(self.path, encoding="utf-8") as fixture_file:
+                    json.dump(content, fixture_file, indent=2)
+
+
+class NetworkConditions:
+    """Simulated latency, failures and rate limits, shared by all request threads."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit=None, daily_limit=None,
+                 seed=None):
+        """
+        Initialize the conditions.
+
+        Args:
+            latency_ms (float): Fixed delay per request.
+            jitter_ms (float): Extra uniform random delay, 0..jitter_ms.
+            error_rate (float): Fraction of requests answered with HTTP 500.
+            rate_limit (float): Allowed requests per second (burst of one
+                second's worth), or None for no limit.
+            daily_limit (int): Requests served before every answer becomes
+                OMDb's 401 "Request limit reached!", or None.
+            seed (int): Seed for reproducible jitter and errors.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.daily_limit = daily_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit or 0)
+        self._refilled_at = time.monotonic()
+        self.requests = 0
+        self.counts = {"ok": 0, "error": 0, "throttled": 0, "limit": 0}
+
+    def admit(self):
+        """
+        Decide how to answer the next request.
+
+        Returns:
+            tuple: (outcome, delay seconds, retry-after seconds) where outcome
+            is "ok", "error", "throttled" or "limit".
+        """
+        with self._lock:
+            self.requests += 1
+            delay = (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1000
+            retry_after = 0.0
+            if self.daily_limit is not None and self.requests > self.daily_limit:
+                outcome = "limit"
+            elif self.rate_limit and not self._take_token():
+                outcome = "throttled"
+                retry_after = (1 - self._tokens) / self.rate_limit
+            elif self._rng.random() < self.error_rate:
+                outcome = "error"
+            else:
+                outcome = "ok"
+            self.counts[outcome] += 1
+            return outcome, delay, retry_after
+
+    def _take_token(self):
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+class OmdbStubHandler(BaseHTTPRequestHandler):
+    """Answers OMDb "t=" lookups from the fixture store."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "OmdbStub/1.0"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload, headers=()):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        title = query.get("t", [""])[0]
+        outcome, delay, retry_after = self.server.conditions.admit()
+        if delay:
+            time.sleep(delay)
+
+        if outcome == "limit":
+            self._send(401, LIMIT_REACHED)
+        elif outcome == "throttled":
+            self._send(429, {"Response": "False", "Error": "Too many requests."},
+                       [("Retry-After", f"{max(retry_after, 0.001):.3f}")])
+        elif outcome == "error":
+            self._send(500, {"Response": "False", "Error": "Simulated server error."})
+        elif not title.strip():
+            self._send(200, NO_TITLE)
+        else:
+            self._send(200, self.server.lookup(title))
+
+
+class OmdbStubServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fixtures, mode and network conditions."""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, fixtures, conditions, mode="replay", verbose=False):
+        """
+        Initialize the server.
+
+        Args:
+            server_address (tuple): (host, port) to bind to; port 0 picks a free one.
+            fixtures (FixtureStore): Recorded responses.
+            conditions (NetworkConditions): Simulated network behaviour.
+            mode (str): One of MODES.
+            verbose (bool): Log every request to stderr.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Choose from: {', '.join(MODES)}")
+        super().__init__(server_address, OmdbStubHandler)
+        self.fixtures = fixtures
+        self.conditions = conditions
+        self.mode = mode
+        self.verbose = verbose
+
+    @property
+    def base_url(self):
+        """The URL to put into OMDB_BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def lookup(self, title):
+        """
+        Answer a title lookup according to the mode.
+
+        Args:
+            title (str): The requested title.
+
+        Returns:
+            dict: The OMDb response.
+        """
+        response = self.fixtures.get(title)
+        if response is not None:
+            return response
+        if self.mode == "synthetic":
+            return synthetic_response(title)
+        if self.mode == "record":
+            response = self._fetch_upstream(title)
+            if response.get("Response") == "True" or response.get("Error") == NOT_FOUND["Error"]:
+                self.fixtures.record(title, response)
+            return response
+        return NOT_FOUND
+
+    @staticmethod
+    def _fetch_upstream(title):
+        api_key = os.getenv("OMDB_API_KEY")
+        if not api_key:
+            return {"Response": "False", "Error": "Recording needs OMDB_API_KEY."}
+        with urlopen(f"{UPSTREAM_URL}?{urlencode({'apikey': api_key, 't': title})}", timeout=10) as upstream:
+            return json.load(upstream)
+
+
+def start_stub(fixtures_path=DEFAULT_FIXTURES, mode="replay", host="127.0.0.1", port=0, **conditions):
+    """
+    Start a stub server on a background thread, e.g. for a benchmark.
+
+    Args:
+        fixtures_path (str): Fixture file, or None for an empty in-memory store.
+        mode (str): One of MODES.
+        host (str): Interface to bind to.
+        port (int): Port to bind to; 0 picks a free one.
+        **conditions: Keyword arguments for NetworkConditions.
+
+    Returns:
+        OmdbStubServer: The running server. Stop it with shutdown() and server_close().
+    """
+    server = OmdbStubServer((host, port), FixtureStore(fixtures_path), NetworkConditions(**conditions), mode)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded OMDb responses with simulated network conditions.")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Fixture file (JSON)")
+    parser.add_argument("--mode", choices=MODES, default="replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 answers, 0-1")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second before 429 responses")
+    parser.add_argument("--daily-limit", type=int, help="Requests before 401 'Request limit reached!'")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible jitter and errors")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    conditions = NetworkConditions(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit,
+                                   args.daily_limit, args.seed)
+    server = OmdbStubServer((args.host, args.port), FixtureStore(args.fixtures), conditions, args.mode, args.verbose)
+    print(f"[INFO] OMDb stub ({args.mode}, {len(server.fixtures)} fixtures) on {server.base_url}")
+    print(f"[INFO] Use it with: OMDB_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{conditions.counts}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Benchmark harness for the storage backends and the helper analytics.
+
+For every backend and catalogue size, a synthetic catalogue is written to a
+temporary directory and each operation is timed several times. Results are
+printed as a table and can be saved as JSON so that two runs can be compared.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 1000000 --backends json sharded versioned
+    python -m benchmarks.run_benchmarks --compare bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.synthetic_catalogue import generate_catalogue
+from helpers import (filter_movies, get_average_rating, get_best_rated_movies, get_median_rating,
+                     get_worst_rated_movies, render_website, search_movies, sort_movies_by_rating,
+                     sort_movies_by_year)
+from storage.file_storage import FileStorage
+from storage.storage_factory import open_storage
+from storage.storage_sharded import StorageSharded
+from storage.storage_versioned import StorageVersioned
+
+DEFAULT_SIZES = (1000, 100000)
+DEFAULT_REPEATS = 5
+REGRESSION_THRESHOLD = 1.2
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "static", "index_template.html")
+
+# Backend name -> (open_storage location relative to the benchmark directory, open_storage options).
+# Every storage a user can select is listed, including the in-memory proxy main.py runs with.
+BACKENDS = {
+    "json": ("movies.json", {}),
+    "json.gz": ("movies.json.gz", {}),
+    "csv": ("movies.csv", {}),
+    "csv.gz": ("movies.csv.gz", {}),
+    "json-watched": ("movies.json", {"watch": True}),
+    "sharded": ("sharded:{directory}/shards", {}),
+    "sharded-decade": ("sharded:{directory}/shards?partition=decade", {}),
+    "versioned": ("versioned:{directory}/versioned", {}),
+}
+
+
+def time_operation(operation, repeats):
+    """
+    Time an operation several times.
+
+    Args:
+        operation (callable): Called once per repeat with the repeat number.
+        repeats (int): Number of timed runs.
+
+    Returns:
+        dict: Minimum, median and maximum wall time in seconds.
+    """
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for repeat in range(repeats):
+            start = time.perf_counter()
+            operation(repeat)
+            timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "repeats": repeats,
+    }
+
+
+def populate(storage, movies):
+    """
+    Write a whole catalogue into an empty storage in one go.
+
+    Adding the movies one at a time would rewrite the files once per movie.
+
+    Args:
+        storage (IStorage): A storage opened by open_storage without options.
+        movies (dict): The catalogue to write.
+
+    Returns:
+        None
+    """
+    if isinstance(storage, FileStorage):
+        storage._write_data(movies)
+    elif isinstance(storage, StorageSharded):
+        shards = {}
+        for title, details in movies.items():
+            shards.setdefault(storage._shard_key(title, details["year"]), {})[title] = details
+        for key, shard_movies in shards.items():
+            storage._shard(key)._write_data(shard_movies)
+    elif isinstance(storage, StorageVersioned):
+        storage._mutate(lambda current: current.update(movies))
+    else:
+        raise TypeError(f"Don't know how to populate {type(storage).__name__}")
+
+
+def open_populated_storage(backend, movies, directory):
+    """
+    Open a storage the way users select it (open_storage) and fill it with movies.
+
+    Args:
+        backend (str): Key in BACKENDS.
+        movies (dict): The catalogue to write.
+        directory (str): Directory for the data files.
+
+    Returns:
+        IStorage: The populated storage.
+    """
+    location, options = BACKENDS[backend]
+    if ":" in location:
+        location = location.format(directory=directory)
+    else:
+        location = os.path.join(directory, location)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        storage = open_storage(location)
+        populate(storage, movies)
+        if options:
+            storage = open_storage(location, **options)
+    return storage
+
+
+def storage_operations(storage, movies):
+    """
+    Build the timed storage operations.
+
+    Args:
+        storage (IStorage): A populated storage.
+        movies (dict): The catalogue stored in it.
+
+    Returns:
+        dict: Operation name -> callable(repeat).
+    """
+    existing_title = next(iter(movies))
+    return {
+        "list_movies": lambda repeat: storage.list_movies(),
+        "list_movie_records": lambda repeat: storage.list_movie_records(),
+        "add_movie": lambda repeat: storage.add_movie(f"Benchmark {repeat}", 2000, 7.5, ""),
+        "update_movie": lambda repeat: storage.update_movie(existing_title, repeat % 10),
+        "delete_movie": lambda repeat: storage.delete_movie(f"Benchmark {repeat}"),
+        "random_movie": lambda repeat: storage.random_movie(),
+    }
+
+
+def helper_operations(movies, template):
+    """
+    Build the timed helper analytics and website rendering.
+
+    Args:
+        movies (dict): The catalogue to analyse.
+        template (str): Website template.
+
+    Returns:
+        dict: Operation name -> callable(repeat).
+    """
+    return {
+        "get_average_rating": lambda repeat: get_average_rating(movies),
+        "get_median_rating": lambda repeat: get_median_rating(movies),
+        "get_best_rated_movies": lambda repeat: get_best_rated_movies(movies),
+        "get_worst_rated_movies": lambda repeat: get_worst_rated_movies(movies),
+        "search_movies": lambda repeat: search_movies(movies, "night"),
+        "filter_movies": lambda repeat: filter_movies(movies, 7.0, 1980, 2000),
+        "sort_movies_by_rating": lambda repeat: sort_movies_by_rating(movies, True),
+        "sort_movies_by_year": lambda repeat: sort_movies_by_year(movies, False),
+        "render_website": lambda repeat: render_website(movies, "Benchmark", template),
+    }
+
+
+def run_benchmarks(sizes, backends, repeats):
+    """
+    Run all benchmarks.
+
+    Args:
+        sizes (list): Catalogue sizes to test.
+        backends (list): Backend names to test.
+        repeats (int): Timed runs per operation.
+
+    Returns:
+        dict: Metadata and a list of result records.
+    """
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as template_file:
+        template = template_file.read()
+
+    results = []
+    for size in sizes:
+        movies = generate_catalogue(size)
+        print(f"\n----- {size} movies -----", file=sys.stderr)
+        for operation, function in helper_operations(movies, template).items():
+            results.append({"backend": "helpers", "size": size, "operation": operation,
+                            **time_operation(function, repeats)})
+            print(f"{'helpers':<14} {operation:<24} done", file=sys.stderr)
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as directory:
+                storage = open_populated_storage(backend, movies, directory)
+                for operation, function in storage_operations(storage, movies).items():
+                    results.append({"backend": backend, "size": size, "operation": operation,
+                                    **time_operation(function, repeats)})
+                    print(f"{backend:<14} {operation:<24} done", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def print_results(report, baseline=None):
+    """
+    Print results as a table, optionally next to a baseline run.
+
+    Args:
+        report (dict): Output of run_benchmarks.
+        baseline (dict): A previous report to compare against, or None.
+
+    Returns:
+        None
+    """
+    previous = {}
+    if baseline:
+        previous = {(r["backend"], r["size"], r["operation"]): r for r in baseline["results"]}
+
+    print(f"\n{'backend':<14} {'size':>9} {'operation':<24} {'median ms':>11} {'min ms':>10}"
+          + (f" {'vs base':>8}" if baseline else ""))
+    for result in report["results"]:
+        line = (f"{result['backend']:<14} {result['size']:>9} {result['operation']:<24} "
+                f"{result['median'] * 1000:>11.3f} {result['min'] * 1000:>10.3f}")
+        old = previous.get((result["backend"], result["size"], result["operation"]))
+        if old and old["median"] > 0:
+            ratio = result["median"] / old["median"]
+            line += f" {ratio:>7.2f}x" + ("  REGRESSION" if ratio > REGRESSION_THRESHOLD else "")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark movie storage backends and helpers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Catalogue sizes, e.g. 1000 100000 1000000")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.backends, args.repeats)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    print_results(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=4)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Deterministic synthetic movie catalogues for benchmarks.
+
+Titles, ratings, years and poster URLs follow the shape of the real data in
+data/movies.json, so file sizes and parse costs are representative.
+"""
+
+import random
+
+from helpers import MAX_RATING, MIN_RATING
+
+FIRST_YEAR = 1920
+LAST_YEAR = 2025
+
+WORDS = ("Night", "Return", "Empire", "Shadow", "Road", "Dream", "Last", "Star", "Ghost", "River",
+         "King", "Game", "Storm", "City", "Heart", "Code", "Silent", "Red", "Lost", "Iron")
+
+POSTER_PREFIX = "https://m.media-amazon.com/images/M/"
+
+
+def synthetic_movie(rng, number):
+    """
+    Create one synthetic movie record.
+
+    Args:
+        rng (random.Random): Random number generator to draw from.
+        number (int): Sequence number, used to keep titles unique.
+
+    Returns:
+        tuple: (title, {"rating", "year", "poster"})
+    """
+    title = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {number:07d}"
+    poster = f"{POSTER_PREFIX}MV5B{rng.getrandbits(192):048x}._V1_SX300.jpg"
+    return title, {
+        "rating": round(rng.uniform(MIN_RATING, MAX_RATING), 1),
+        "year": rng.randint(FIRST_YEAR, LAST_YEAR),
+        "poster": poster,
+    }
+
+
+def iter_synthetic_movies(size, seed=42):
+    """
+    Yield synthetic movies one at a time.
+
+    Args:
+        size (int): Number of movies to generate.
+        seed (int): Seed for reproducible catalogues.
+
+    Yields:
+        tuple: (title, {"rating", "year", "poster"})
+    """
+    rng = random.Random(seed)
+    for number in range(size):
+        yield synthetic_movie(rng, number)
+
+
+def generate_catalogue(size, seed=42):
+    """
+    Generate a synthetic catalogue.
+
+    Args:
+        size (int): Number of movies to generate.
+        seed (int): Seed for reproducible catalogues.
+
+    Returns:
+        dict: Movies in the format {title: {rating, year, poster}}.
+    """
+    return dict(iter_synthetic_movies(size, seed))
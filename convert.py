@@ -0,0 +1,70 @@
+"""
+Convert movie catalogues between formats without loading them into memory.
+
+The source and target formats are chosen by file extension (.json, .csv,
+.ndjson/.jsonl, .parquet, .arrow; text formats optionally with .gz/.zst).
+Movies are streamed one at a time, or in batches of --batch-size rows for
+the columnar formats, so memory use does not grow with the catalogue.
+
+Usage:
+    python convert.py data/movies.json exports/movies.ndjson.gz
+    python convert.py data/movies.csv exports/movies.parquet --batch-size 50000
+"""
+
+import argparse
+import time
+
+from storage.formats import DEFAULT_BATCH_SIZE, detect_format, iter_catalogue, write_catalogue
+
+
+def convert_catalogue(source_path, target_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream a catalogue file into another file and format.
+
+    Args:
+        source_path (str): The catalogue to read.
+        target_path (str): The file to write (replaced atomically).
+        batch_size (int): Rows per batch for the columnar formats.
+
+    Returns:
+        int: Number of movies converted.
+    """
+    detect_format(target_path)  # fail before reading anything
+    return write_catalogue(target_path, iter_catalogue(source_path, batch_size), batch_size)
+
+
+def export_storage(storage, target_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream all movies of an IStorage backend into a catalogue file.
+
+    Args:
+        storage (IStorage): The storage to export.
+        target_path (str): The file to write (replaced atomically).
+        batch_size (int): Rows per batch for the columnar formats.
+
+    Returns:
+        int: Number of movies exported.
+    """
+    return write_catalogue(target_path, storage.iter_movies(), batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert movie catalogues between formats.")
+    parser.add_argument("source", help="Catalogue to read")
+    parser.add_argument("target", help="File to write")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per batch for Parquet/Arrow")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        count = convert_catalogue(args.source, args.target, args.batch_size)
+    except (ValueError, ImportError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        return
+    print(f"Converted {count} movies from {args.source} to {args.target} "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Bucketed rating and release-year distributions.
+
+Ratings are 0.0-10.0 in steps of 0.1, so 101 counters describe any number
+of movies exactly. Median, percentiles, averages and histograms are then
+answered in O(buckets) time with constant memory, and a distribution can
+be built from a stream of movies without holding the catalogue in memory.
+"""
+
+RATING_BUCKETS = 101  # 0.0, 0.1, ..., 10.0
+RATING_SCALE = 10  # buckets per rating point
+HISTOGRAM_WIDTH = 40
+
+
+class RatingDistribution:
+    """Counts of movies per rating bucket and per release year."""
+
+    def __init__(self):
+        self.rating_counts = [0] * RATING_BUCKETS
+        self.year_counts = {}
+        self.year_rating_sums = {}
+        self.count = 0
+
+    @classmethod
+    def from_movies(cls, movies):
+        """
+        Build a distribution from a catalogue.
+
+        Args:
+            movies (dict): {title: details} where details supports
+                ["rating"] and ["year"] (dicts or Movie records).
+
+        Returns:
+            RatingDistribution: The filled distribution.
+        """
+        return cls.from_records(movies.values())
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a distribution from any iterable of movie details, e.g. a stream.
+
+        Args:
+            records (iterable): Items supporting ["rating"] and ["year"].
+
+        Returns:
+            RatingDistribution: The filled distribution.
+        """
+        distribution = cls()
+        for record in records:
+            distribution.add(record["rating"], record["year"])
+        return distribution
+
+    @staticmethod
+    def _bucket(rating):
+        return min(max(round(float(rating) * RATING_SCALE), 0), RATING_BUCKETS - 1)
+
+    def add(self, rating, year):
+        """
+        Count one movie.
+
+        Args:
+            rating (float): The movie rating (0.0-10.0).
+            year (int): The release year.
+
+        Returns:
+            None
+        """
+        bucket = self._bucket(rating)
+        self.rating_counts[bucket] += 1
+        self.year_counts[year] = self.year_counts.get(year, 0) + 1
+        self.year_rating_sums[year] = self.year_rating_sums.get(year, 0) + bucket
+        self.count += 1
+
+    def _bucket_at_rank(self, rank):
+        """
+        Return the rating bucket of the movie at a 0-based rank in sorted order.
+
+        Args:
+            rank (int): 0 <= rank < count.
+
+        Returns:
+            int: The bucket index (rating * 10).
+        """
+        seen = 0
+        for bucket, bucket_count in enumerate(self.rating_counts):
+            seen += bucket_count
+            if seen > rank:
+                return bucket
+        return RATING_BUCKETS - 1
+
+    def percentile(self, percent):
+        """
+        Compute a rating percentile with linear interpolation between ranks.
+
+        Args:
+            percent (float): 0-100.
+
+        Returns:
+            float or None: The percentile rounded to 2 decimals, or None if empty.
+        """
+        if not self.count:
+            return None
+        position = min(max(percent, 0.0), 100.0) / 100 * (self.count - 1)
+        lower_rank = int(position)
+        lower = self._bucket_at_rank(lower_rank)
+        upper = self._bucket_at_rank(min(lower_rank + 1, self.count - 1))
+        return round((lower + (upper - lower) * (position - lower_rank)) / RATING_SCALE, 2)
+
+    def median(self):
+        """
+        Compute the median rating (same result as statistics.median).
+
+        Returns:
+            float or None: The median rounded to 1 decimal, or None if empty.
+        """
+        if not self.count:
+            return None
+        lower = self._bucket_at_rank((self.count - 1) // 2)
+        upper = self._bucket_at_rank(self.count // 2)
+        # Same float operations as statistics.median, so ties round identically
+        return round((lower / RATING_SCALE + upper / RATING_SCALE) / 2, 1)
+
+    def average(self):
+        """
+        Compute the average rating.
+
+        Returns:
+            float or None: The average rounded to 1 decimal, or None if empty.
+        """
+        if not self.count:
+            return None
+        total = sum(bucket * bucket_count for bucket, bucket_count in enumerate(self.rating_counts))
+        return round(total / self.count / RATING_SCALE, 1)
+
+    def decade_counts(self):
+        """
+        Count movies per decade.
+
+        Returns:
+            dict: {decade start year: count}, sorted by decade.
+        """
+        decades = {}
+        for year, year_count in self.year_counts.items():
+            decade = year // 10 * 10
+            decades[decade] = decades.get(decade, 0) + year_count
+        return dict(sorted(decades.items()))
+
+    def decade_averages(self):
+        """
+        Compute the average rating per decade.
+
+        Returns:
+            dict: {decade start year: average rating rounded to 1 decimal}, sorted by decade.
+        """
+        sums = {}
+        for year, rating_sum in self.year_rating_sums.items():
+            decade = year // 10 * 10
+            sums[decade] = sums.get(decade, 0) + rating_sum
+        counts = self.decade_counts()
+        return {decade: round(sums[decade] / counts[decade] / RATING_SCALE, 1) for decade in counts}
+
+    def rating_histogram(self, bin_width=1.0):
+        """
+        Group rating counts into wider bins.
+
+        Args:
+            bin_width (float): Bin width in rating points, a multiple of 0.1.
+
+        Returns:
+            dict: {(low, high): count} where the last bin includes 10.0.
+        """
+        buckets_per_bin = max(round(bin_width * RATING_SCALE), 1)
+        bins = {}
+        for start in range(0, RATING_BUCKETS - 1, buckets_per_bin):
+            end = min(start + buckets_per_bin, RATING_BUCKETS - 1)
+            last = end == RATING_BUCKETS - 1
+            bins[(start / RATING_SCALE, end / RATING_SCALE)] = sum(self.rating_counts[start:end + 1 if last else end])
+        return bins
+
+
+def format_ascii_histogram(counts, width=HISTOGRAM_WIDTH):
+    """
+    Render labelled counts as horizontal ASCII bars.
+
+    Args:
+        counts (dict): {label: count}.
+        width (int): Length of the longest bar.
+
+    Returns:
+        str: One line per label.
+    """
+    if not counts:
+        return ""
+    largest = max(counts.values()) or 1
+    label_width = max(len(str(label)) for label in counts)
+    return "\n".join(f"{str(label):>{label_width}} | {'#' * round(count / largest * width):<{width}} {count}"
+                     for label, count in counts.items())
@@ -0,0 +1,234 @@
+"""
+Out-of-core sorting and filtering for catalogues larger than RAM.
+
+helpers.sort_movies_by_rating, sort_movies_by_year and filter_movies need the
+whole catalogue as a dict. The functions here stream movies instead (e.g.
+from a CSV export via storage.formats.iter_catalogue): rows that pass the
+filter are collected until the memory budget is reached, sorted and spilled
+to a temporary run file, and the runs are then k-way merged with heapq.
+Only one budget's worth of rows plus one buffered row per run is ever held
+in memory.
+
+Usage:
+    python external_sort.py data/archive.csv --by rating --desc --output sorted.csv
+    python external_sort.py data/archive.csv --min-rating 7 --start-year 1980 --end-year 1999
+    python external_sort.py data/archive.csv --by year --page 3 --per-page 50 --memory-mb 16
+"""
+
+import argparse
+import csv
+import heapq
+import itertools
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, closing
+
+from helpers import MAX_RATING, MAX_YEAR, MIN_RATING, MIN_YEAR
+from storage.formats import iter_catalogue, write_catalogue
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+MIN_MEMORY_BUDGET = 64 * 1024
+MAX_MERGE_FAN_IN = 64
+ROW_OVERHEAD = 240  # tuple + details dict + float + int, measured on CPython 3.11
+RUN_BUFFER_SIZE = 1 << 16
+
+SORT_KEYS = {
+    "rating": lambda movie: movie[1]["rating"],
+    "year": lambda movie: movie[1]["year"],
+    "title": lambda movie: movie[0],
+}
+
+
+def estimate_row_size(title, details):
+    """
+    Estimate the memory held by one buffered (title, details) row.
+
+    Args:
+        title (str): The movie title.
+        details (dict): {"rating", "year", "poster"}
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    return ROW_OVERHEAD + sys.getsizeof(title) + sys.getsizeof(details["poster"])
+
+
+def movie_filter(min_rating=MIN_RATING, start_year=MIN_YEAR, end_year=MAX_YEAR):
+    """
+    Build the predicate used by helpers.filter_movies.
+
+    Args:
+        min_rating (float): Minimum rating threshold.
+        start_year (int): Start year.
+        end_year (int): End year.
+
+    Returns:
+        callable: predicate((title, details)) -> bool
+    """
+    return lambda movie: movie[1]["rating"] >= min_rating and start_year <= movie[1]["year"] <= end_year
+
+
+def _write_run(rows, directory, number):
+    path = os.path.join(directory, f"run-{number:06d}.csv")
+    with open(path, "w", newline="", encoding="utf-8", buffering=RUN_BUFFER_SIZE) as run_file:
+        writer = csv.writer(run_file)
+        for title, details in rows:
+            writer.writerow((title, repr(details["rating"]), details["year"], details["poster"]))
+    return path
+
+
+def _read_run(path):
+    with open(path, "r", newline="", encoding="utf-8", buffering=RUN_BUFFER_SIZE) as run_file:
+        for title, rating, year, poster in csv.reader(run_file):
+            yield title, {"rating": float(rating), "year": int(year), "poster": poster}
+
+
+def _merge_runs(paths, key, descending):
+    with ExitStack() as stack:
+        runs = [stack.enter_context(closing(_read_run(path))) for path in paths]
+        yield from heapq.merge(*runs, key=key, reverse=descending)
+
+
+def external_sort(movies, key="rating", descending=False, predicate=None,
+                  memory_budget=DEFAULT_MEMORY_BUDGET, temp_dir=None):
+    """
+    Sort (and optionally filter) a stream of movies within a memory budget.
+
+    The order is the same as sorted(..., reverse=descending) on the whole
+    catalogue, including the original order of movies with equal keys.
+
+    Args:
+        movies (iterable): (title, {"rating", "year", "poster"}) pairs.
+        key (str): One of SORT_KEYS: "rating", "year" or "title".
+        descending (bool): True for descending order.
+        predicate (callable): Keeps a movie if predicate((title, details))
+            is true, e.g. movie_filter(7.0, 1980, 1999). None keeps all.
+        memory_budget (int): Bytes of rows buffered before spilling a run.
+        temp_dir (str): Where run files are created (default: system temp).
+
+    Yields:
+        tuple: (title, details) in sorted order.
+
+    Raises:
+        ValueError: If key is not a supported sort key.
+    """
+    if key not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key '{key}'. Choose from: {', '.join(SORT_KEYS)}")
+    sort_key = SORT_KEYS[key]
+    memory_budget = max(memory_budget, MIN_MEMORY_BUDGET)
+
+    with tempfile.TemporaryDirectory(prefix="movie-sort-", dir=temp_dir) as directory:
+        runs = []
+        buffer = []
+        buffered_bytes = 0
+        for movie in movies:
+            if predicate is not None and not predicate(movie):
+                continue
+            buffer.append(movie)
+            buffered_bytes += estimate_row_size(*movie)
+            if buffered_bytes >= memory_budget:
+                buffer.sort(key=sort_key, reverse=descending)
+                runs.append(_write_run(buffer, directory, len(runs)))
+                buffer = []
+                buffered_bytes = 0
+
+        buffer.sort(key=sort_key, reverse=descending)
+        if not runs:
+            yield from buffer  # everything fit in the budget, no disk needed
+            return
+        if buffer:
+            runs.append(_write_run(buffer, directory, len(runs)))
+        buffer = None
+
+        # Merge in passes so no more than MAX_MERGE_FAN_IN run files are open at once.
+        # Runs stay in input order, which keeps equal keys in their original order.
+        next_run = len(runs)
+        while len(runs) > MAX_MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(runs), MAX_MERGE_FAN_IN):
+                group = runs[start:start + MAX_MERGE_FAN_IN]
+                merged.append(_write_run(_merge_runs(group, sort_key, descending), directory, next_run))
+                next_run += 1
+                for path in group:
+                    os.remove(path)
+            runs = merged
+        yield from _merge_runs(runs, sort_key, descending)
+
+
+def paginate(movies, page, per_page):
+    """
+    Return one page of a sorted stream without materializing the rest.
+
+    Args:
+        movies (iterable): The sorted stream.
+        page (int): 1-based page number.
+        per_page (int): Movies per page.
+
+    Returns:
+        dict: Movies on the page in the format {title: details}.
+    """
+    start = (max(page, 1) - 1) * per_page
+    return dict(itertools.islice(movies, start, start + per_page))
+
+
+def sort_catalogue_file(source_path, target_path, key="rating", descending=False, predicate=None,
+                        memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Sort and filter a catalogue file into another file, in bounded memory.
+
+    Args:
+        source_path (str): Catalogue to read (any format of storage.formats).
+        target_path (str): File to write; the extension selects the format.
+        key (str): Sort key, see SORT_KEYS.
+        descending (bool): True for descending order.
+        predicate (callable): Optional filter, see movie_filter.
+        memory_budget (int): Bytes of rows buffered before spilling a run.
+
+    Returns:
+        int: Number of movies written.
+    """
+    temp_dir = os.path.dirname(os.path.abspath(target_path))  # runs are as large as the output
+    return write_catalogue(target_path, external_sort(iter_catalogue(source_path), key, descending, predicate,
+                                                      memory_budget, temp_dir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort and filter catalogues larger than memory.")
+    parser.add_argument("source", help="Catalogue to read (.csv, .json, .ndjson, ...)")
+    parser.add_argument("--by", choices=sorted(SORT_KEYS), default="rating", help="Sort key")
+    parser.add_argument("--desc", action="store_true", help="Sort in descending order")
+    parser.add_argument("--min-rating", type=float, default=MIN_RATING)
+    parser.add_argument("--start-year", type=int, default=MIN_YEAR)
+    parser.add_argument("--end-year", type=int, default=MAX_YEAR)
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_BUDGET / 1024 / 1024,
+                        help="Memory budget for buffered rows")
+    parser.add_argument("--output", help="Write the result to this file instead of printing a page")
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    predicate = None
+    if (args.min_rating, args.start_year, args.end_year) != (MIN_RATING, MIN_YEAR, MAX_YEAR):
+        predicate = movie_filter(args.min_rating, args.start_year, args.end_year)
+    memory_budget = int(args.memory_mb * 1024 * 1024)
+
+    start = time.perf_counter()
+    try:
+        if args.output:
+            count = sort_catalogue_file(args.source, args.output, args.by, args.desc, predicate, memory_budget)
+            print(f"Wrote {count} movies to {args.output} in {time.perf_counter() - start:.2f}s.")
+            return
+        page = paginate(external_sort(iter_catalogue(args.source), args.by, args.desc, predicate, memory_budget),
+                        args.page, args.per_page)
+    except (ValueError, ImportError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        return
+    for title, details in page.items():
+        print(f"{title} ({details['year']}): {details['rating']}")
+    print(f"\nPage {args.page}: {len(page)} movies in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
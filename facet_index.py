@@ -0,0 +1,525 @@
+"""
+Inverted indexes over OMDb genre, director and actors for faceted search.
+
+Every catalogue movie gets a dense document id. For each facet value
+(e.g. genre "Drama", director "Christopher Nolan") the index keeps a
+posting list: the sorted array of ids of the movies that have it. A query
+such as
+
+    drama & director:nolan & rating>=8
+
+resolves every term to a posting list, intersects them smallest first
+(probing the larger lists by binary search when they are much longer) and
+then checks rating and year per remaining movie. Facet counts for the
+result come from a forward index (id -> value ids per facet), so only the
+matching movies are visited.
+
+A bare term matches any facet. A term matches a value when it is the whole
+value or when all its words occur in it ("nolan" matches "Christopher Nolan"
+and "Jonathan Nolan"), case-insensitively.
+
+Movies are indexed from the catalogue (rating, year) joined with the OMDb
+payloads in storage/metadata_store.py. add_movie, remove_movie and
+set_rating keep a built index current without rebuilding it.
+
+Usage (from the project root):
+    python facet_index.py "drama & nolan & rating>=8"
+    python facet_index.py --backfill --workers 8
+"""
+
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+from instrumentation import instrumented
+
+# Facet name -> OMDb field holding a comma-separated list of values.
+FACETS = {
+    "genre": "Genre",
+    "director": "Director",
+    "actor": "Actors",
+}
+FACET_ALIASES = {"genres": "genre", "directors": "director", "actors": "actor", "cast": "actor"}
+
+TOP_FACET_VALUES = 10
+# Same limits as helpers.get_valid_rating_from_user / get_valid_year_from_user
+# (helpers imports this module, so they can't be imported from there).
+BOUND_LIMITS = {"rating": (0.0, 10.0), "year": (1000, 9999)}
+RAW_CACHE_SIZE = 50000
+
+_CONJUNCTION = re.compile(r"\s*(?:&|∧|,|\band\b)\s*", re.IGNORECASE)
+_RANGE = re.compile(r"^(rating|year)\s*(>=|≥|<=|≤|=|==|>|<)\s*(\S+)$", re.IGNORECASE)
+
+
+def facet_values(payload, facet):
+    """
+    Extract the values of a facet from an OMDb payload.
+
+    Args:
+        payload (dict): OMDb response.
+        facet (str): Facet name, a key of FACETS.
+
+    Returns:
+        list: The values, e.g. ["Action", "Sci-Fi"]; empty for "N/A" or missing fields.
+    """
+    raw = payload.get(FACETS[facet]) or ""
+    if raw == "N/A":
+        return []
+    return [value.strip() for value in raw.split(",") if value.strip()]
+
+
+class FacetQuery:
+    """A parsed faceted query: terms that must all match plus rating/year bounds."""
+
+    __slots__ = ("terms", "min_rating", "max_rating", "start_year", "end_year")
+
+    def __init__(self, terms=(), min_rating=None, max_rating=None, start_year=None, end_year=None):
+        """
+        Initialize the query.
+
+        Args:
+            terms (iterable): (facet or None, text) pairs; None matches any facet.
+            min_rating (float): Lowest rating to include.
+            max_rating (float): Highest rating to include.
+            start_year (int): First release year to include.
+            end_year (int): Last release year to include.
+        """
+        self.terms = tuple(terms)
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+        self.start_year = start_year
+        self.end_year = end_year
+
+    def __repr__(self):
+        return (f"FacetQuery(terms={self.terms!r}, min_rating={self.min_rating!r}, max_rating={self.max_rating!r}, "
+                f"start_year={self.start_year!r}, end_year={self.end_year!r})")
+
+
+def parse_facet_query(text):
+    """
+    Parse a query such as "genre:drama & nolan & rating>=8 & year<2000".
+
+    Clauses are joined by "&", "∧", "," or "and". Each clause is either
+    facet:value (genre, director, actor), rating/year compared with
+    >=, >, <=, <, or =, or a bare term that may match any facet.
+
+    Args:
+        text (str): The query.
+
+    Returns:
+        FacetQuery: The parsed query.
+
+    Raises:
+        ValueError: If the query is empty, a clause names an unknown facet or
+            has no value, or a bound is not a number in BOUND_LIMITS.
+    """
+    query = FacetQuery()
+    terms = []
+    for clause in _CONJUNCTION.split(text.strip()):
+        if not clause:
+            continue
+        match = _RANGE.match(clause)
+        if match:
+            field, operator, number = match.group(1).lower(), match.group(2), match.group(3)
+            try:
+                value = float(number) if field == "rating" else int(number)
+            except ValueError:
+                raise ValueError(f"'{number}' is not a valid {field}") from None
+            low, high = BOUND_LIMITS[field]
+            if not low <= value <= high:
+                raise ValueError(f"{field.capitalize()} {number} is invalid, it must be between {low} and {high}")
+            _apply_bound(query, field, operator, value)
+            continue
+        facet, separator, value = clause.partition(":")
+        if separator:
+            facet = FACET_ALIASES.get(facet.strip().lower(), facet.strip().lower())
+            if facet not in FACETS:
+                raise ValueError(f"Unknown facet '{facet}'. Use one of: {', '.join(FACETS)}")
+            if not value.strip():
+                raise ValueError(f"No value given for '{facet}:'")
+            terms.append((facet, value.strip()))
+        else:
+            terms.append((None, clause))
+    query.terms = tuple(terms)
+    if not terms and query.min_rating is None and query.max_rating is None \
+            and query.start_year is None and query.end_year is None:
+        raise ValueError("Enter at least one term or bound")
+    return query
+
+
+def _apply_bound(query, field, operator, value):
+    """
+    Narrow the rating or year bounds of a query by one comparison.
+
+    Ratings have one decimal, so "rating>8" means "rating>=8.1".
+
+    Args:
+        query (FacetQuery): The query to update.
+        field (str): "rating" or "year".
+        operator (str): The comparison operator.
+        value (float or int): The number compared with.
+
+    Returns:
+        None
+    """
+    low, high = ("min_rating", "max_rating") if field == "rating" else ("start_year", "end_year")
+    step = 0.1 if field == "rating" else 1
+    if operator == ">":
+        operator, value = ">=", round(value + step, 1)
+    elif operator == "<":
+        operator, value = "<=", round(value - step, 1)
+    if operator in (">=", "≥", "=", "=="):
+        current = getattr(query, low)
+        setattr(query, low, value if current is None else max(current, value))
+    if operator in ("<=", "≤", "=", "=="):
+        current = getattr(query, high)
+        setattr(query, high, value if current is None else min(current, value))
+
+
+def _tokens(text):
+    return text.casefold().split()
+
+
+def intersect_postings(postings):
+    """
+    Intersect sorted posting lists.
+
+    The lists are processed from shortest to longest. A list much longer
+    than the running result is probed by binary search instead of being
+    scanned, so a rare term keeps the whole intersection cheap.
+
+    Args:
+        postings (list): Sorted sequences of document ids.
+
+    Returns:
+        list: The ids present in every list, sorted.
+    """
+    if not postings:
+        return []
+    ordered = sorted(postings, key=len)
+    result = list(ordered[0])
+    for other in ordered[1:]:
+        if not result:
+            break
+        if len(result) * max(math.log2(len(other)), 1) < len(other):
+            matches = []
+            position = 0
+            size = len(other)
+            for doc in result:
+                position = bisect_left(other, doc, position)
+                if position == size:
+                    break
+                if other[position] == doc:
+                    matches.append(doc)
+            result = matches
+        else:
+            members = set(other)
+            result = [doc for doc in result if doc in members]
+    return result
+
+
+class FacetIndex:
+    """Posting lists and a forward index over the facets of a catalogue."""
+
+    def __init__(self):
+        """Initialize an empty index. Use FacetIndex.build() to index a catalogue."""
+        self._titles = []
+        self._doc_ids = {}
+        self._ratings = array("d")
+        self._years = array("i")
+        self._alive = bytearray()
+        self._deleted = 0
+        self._values = {facet: [] for facet in FACETS}  # facet -> value id -> display value
+        self._value_ids = {facet: {} for facet in FACETS}  # facet -> value (as seen and folded) -> value id
+        self._tokens = {facet: {} for facet in FACETS}  # facet -> token -> value ids
+        self._postings = {facet: [] for facet in FACETS}  # facet -> value id -> array of doc ids
+        self._forward = {facet: [] for facet in FACETS}  # facet -> doc id -> tuple of value ids
+        self._raw_cache = {facet: {} for facet in FACETS}  # facet -> field string -> value ids
+
+    @classmethod
+    @instrumented("facet_index.build")
+    def build(cls, movies, payloads):
+        """
+        Index a catalogue.
+
+        Payloads are reduced to facet value ids as they stream in, so they
+        are never all held in memory.
+
+        Args:
+            movies (dict): {title: Movie} or {title: {"rating", "year", ...}}.
+            payloads (iterable): (title, OMDb payload) pairs; titles that are
+                not in movies are skipped.
+
+        Returns:
+            FacetIndex: The index. Movies without a payload are indexed with
+            rating and year only.
+        """
+        index = cls()
+        found = {title: index._payload_value_ids(payload) for title, payload in payloads if title in movies}
+        no_values = ((),) * len(FACETS)
+        for title, movie in movies.items():
+            index._add(title, movie, found.get(title, no_values))
+        return index
+
+    def __len__(self):
+        return len(self._titles) - self._deleted
+
+    def __contains__(self, title):
+        return title in self._doc_ids
+
+    def _value_id(self, facet, value):
+        """
+        Return the id of a facet value, registering the value on first sight.
+
+        Values are compared case- and whitespace-insensitively.
+
+        Args:
+            facet (str): The facet.
+            value (str): The value as OMDb spells it.
+
+        Returns:
+            int: The value id.
+        """
+        value_ids = self._value_ids[facet]
+        value_id = value_ids.get(value)
+        if value_id is None:
+            folded = " ".join(_tokens(value))
+            value_id = value_ids.get(folded)
+            if value_id is None:
+                value_id = len(self._values[facet])
+                self._values[facet].append(value)
+                self._postings[facet].append(array("I"))
+                for token in set(folded.split()):
+                    self._tokens[facet].setdefault(token, []).append(value_id)
+                value_ids[folded] = value_id
+            value_ids[value] = value_id  # spelling as seen, skips folding next time
+        return value_id
+
+    def _payload_value_ids(self, payload):
+        """
+        Map the facet fields of a payload to value ids.
+
+        Field strings seen before (genre combinations, directors) are looked
+        up in a bounded cache and share one tuple.
+
+        Args:
+            payload (dict): OMDb payload.
+
+        Returns:
+            tuple: One tuple of distinct value ids per facet, in FACETS order.
+        """
+        result = []
+        for facet, field in FACETS.items():
+            raw = payload.get(field)
+            if not raw or raw == "N/A":
+                result.append(())
+                continue
+            cache = self._raw_cache[facet]
+            value_ids = cache.get(raw)
+            if value_ids is None:
+                value_ids = tuple(dict.fromkeys(self._value_id(facet, value)
+                                                for value in facet_values(payload, facet)))
+                if len(cache) < RAW_CACHE_SIZE:
+                    cache[raw] = value_ids
+            result.append(value_ids)
+        return tuple(result)
+
+    def _add(self, title, movie, facet_value_ids):
+        rating, year = (movie["rating"], movie["year"]) if isinstance(movie, dict) else (movie.rating, movie.year)
+        doc = len(self._titles)
+        self._titles.append(title)
+        self._doc_ids[title] = doc
+        self._ratings.append(float(rating))
+        self._years.append(int(year))
+        self._alive.append(1)
+        for facet, value_ids in zip(FACETS, facet_value_ids):
+            postings = self._postings[facet]
+            for value_id in value_ids:
+                postings[value_id].append(doc)  # ids only grow, so lists stay sorted
+            self._forward[facet].append(value_ids)
+
+    def add_movie(self, title, movie, payload=None):
+        """
+        Index one movie, replacing an earlier entry with the same title.
+
+        Args:
+            title (str): The movie title.
+            movie (Movie or dict): The catalogue entry (rating and year).
+            payload (dict): The OMDb payload, or None if unknown.
+
+        Returns:
+            None
+        """
+        if title in self._doc_ids:
+            self.remove_movie(title)
+        self._add(title, movie, self._payload_value_ids(payload or {}))
+
+    def remove_movie(self, title):
+        """
+        Drop a movie from the index. Unknown titles are ignored.
+
+        Args:
+            title (str): The movie title.
+
+        Returns:
+            None
+        """
+        doc = self._doc_ids.pop(title, None)
+        if doc is not None:
+            # Posting lists keep the id; searches skip documents that are not alive.
+            self._alive[doc] = 0
+            self._deleted += 1
+
+    def set_rating(self, title, rating):
+        """
+        Update the rating of an indexed movie.
+
+        Args:
+            title (str): The movie title.
+            rating (float): The new rating.
+
+        Returns:
+            None
+        """
+        doc = self._doc_ids.get(title)
+        if doc is not None:
+            self._ratings[doc] = float(round(rating, 1))
+
+    def _matching_values(self, facet, text):
+        """
+        Find the values of a facet that a term matches.
+
+        Args:
+            facet (str): The facet to look in.
+            text (str): The term.
+
+        Returns:
+            set: Matching value ids.
+        """
+        tokens = _tokens(text)
+        if not tokens:
+            return set()
+        candidates = [self._tokens[facet].get(token, ()) for token in tokens]
+        matches = set(min(candidates, key=len))
+        for candidate in candidates:
+            matches.intersection_update(candidate)
+        return matches
+
+    def _term_postings(self, facet, text):
+        """
+        Return the posting list of a query term.
+
+        Args:
+            facet (str or None): The facet, or None to match any facet.
+            text (str): The term.
+
+        Returns:
+            sequence: Sorted ids of the movies the term matches.
+        """
+        lists = [self._postings[name][value_id]
+                 for name in ((facet,) if facet else FACETS)
+                 for value_id in self._matching_values(name, text)]
+        if len(lists) == 1:
+            return lists[0]
+        return sorted(set(chain.from_iterable(lists)))
+
+    @instrumented("facet_index.search")
+    def search(self, query, limit=None, top_values=TOP_FACET_VALUES):
+        """
+        Run a faceted query.
+
+        Args:
+            query (FacetQuery): The parsed query.
+            limit (int): Return details of at most this many matches (None for all).
+            top_values (int): Number of facet values to count per facet.
+
+        Returns:
+            dict: {"total": number of matches,
+                   "movies": {title: {"rating", "year"}}, best rated first,
+                   "facets": {facet: [(value, count), ...]}, most frequent first,
+                             counted over all matches}
+        """
+        if query.terms:
+            docs = intersect_postings([self._term_postings(facet, text) for facet, text in query.terms])
+        else:
+            docs = range(len(self._titles))
+
+        alive, ratings, years, titles = self._alive, self._ratings, self._years, self._titles
+        if self._deleted:
+            docs = [doc for doc in docs if alive[doc]]
+        if query.min_rating is not None or query.max_rating is not None:
+            low = query.min_rating if query.min_rating is not None else -math.inf
+            high = query.max_rating if query.max_rating is not None else math.inf
+            docs = [doc for doc in docs if low <= ratings[doc] <= high]
+        if query.start_year is not None or query.end_year is not None:
+            start = query.start_year if query.start_year is not None else -math.inf
+            end = query.end_year if query.end_year is not None else math.inf
+            docs = [doc for doc in docs if start <= years[doc] <= end]
+        docs = list(docs)
+
+        facets = {}
+        for facet in FACETS:
+            forward, values = self._forward[facet], self._values[facet]
+            counts = Counter(chain.from_iterable(map(forward.__getitem__, docs)))
+            facets[facet] = [(values[value_id], count) for value_id, count in counts.most_common(top_values)]
+
+        # Stable, so equally rated movies keep catalogue order, as in sort_movies_by_rating.
+        docs.sort(key=ratings.__getitem__, reverse=True)
+        shown = docs if limit is None else docs[:limit]
+        return {
+            "total": len(docs),
+            "movies": {titles[doc]: {"rating": ratings[doc], "year": years[doc]} for doc in shown},
+            "facets": facets,
+        }
+
+
+def main():
+    import argparse
+
+    from fetch_movie import fetch_movies_data
+    from storage.metadata_store import MetadataStore
+    from storage.storage_factory import open_storage
+
+    parser = argparse.ArgumentParser(description="Faceted search over genre, director and actors.")
+    parser.add_argument("query", nargs="?", default="", help='e.g. "drama & director:nolan & rating>=8"')
+    parser.add_argument("--storage", help="Data file (default: $MOVIE_APP_STORAGE or data/movies.json)")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Fetch and store OMDb metadata for movies that have none yet")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel OMDb requests for --backfill")
+    parser.add_argument("--limit", type=int, default=20, help="Matches to print")
+    args = parser.parse_args()
+    try:
+        # Without a query, show counts over the whole catalogue.
+        query = parse_facet_query(args.query) if args.query else FacetQuery()
+    except ValueError as e:
+        parser.error(str(e))
+
+    storage = open_storage(args.storage)
+    metadata = MetadataStore.for_storage(storage)
+    movies = storage.list_movie_records()
+
+    if args.backfill:
+        missing = [title for title in movies if title not in metadata]
+        print(f"Fetching metadata for {len(missing)} movies...")
+        stored = 0
+        for title, data in fetch_movies_data(missing, args.workers).items():
+            if data:
+                metadata.put(title, data)
+                stored += 1
+        print(f"Stored metadata for {stored} movies in {metadata.file_path}.")
+
+    if args.query or not args.backfill:
+        index = FacetIndex.build(movies, metadata.items())
+        result = index.search(query, limit=args.limit)
+        print(f"{result['total']} matches")
+        for title, movie in result["movies"].items():
+            print(f"  {title} ({movie['year']}): {movie['rating']}")
+        for facet, counts in result["facets"].items():
+            print(f"{facet}: " + ", ".join(f"{value} ({count})" for value, count in counts))
+
+
+if __name__ == "__main__":
+    main()
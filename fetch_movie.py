@@ -4,21 +4,103 @@ Module for fetching movie data from the OMDb API.
 This module loads the OMDb API key from a .env file and defines a function
 to fetch movie information (title, year, rating, actors, poster, etc.) using
 the movie title as a search parameter.
+
+The network stack (requests) and python-dotenv are imported on the first
+fetch, so sessions that never add a movie don't pay for them at startup.
+
+Set OMDB_BASE_URL (in the environment or .env) to talk to another server
+with the OMDb interface, e.g. the local fixture server in
+benchmarks/omdb_stub.py for offline and reproducible tests.
 """
 
 import os
+import threading
+import time
+
+from instrumentation import instrumented
 
-import requests
-from dotenv import load_dotenv
+DEFAULT_BASE_URL = "http://www.omdbapi.com/"
+REQUEST_TIMEOUT = 5
+MAX_RETRIES = 2
+MAX_RETRY_DELAY = 5.0
+# 500 too: transient upstream failures (and the stub's simulated errors) surface as plain 500s.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BULK_WORKERS = 8
 
-# Load environment variables from .env file
-load_dotenv()
+_api_key = None
+_session = None
+_session_lock = threading.Lock()
 
-# Retrieve the API key from the environment
-API_KEY = os.getenv("OMDB_API_KEY")
 
+def get_api_key():
+    """
+    Load the OMDb API key from the environment or the .env file on first use.
 
-def fetch_movie_data(title):
+    Returns:
+        str or None: The API key, or None if it is not configured.
+    """
+    global _api_key
+    if _api_key is None:
+        from dotenv import load_dotenv
+
+        # Load environment variables from .env file
+        load_dotenv()
+        _api_key = os.getenv("OMDB_API_KEY")
+    return _api_key
+
+
+def get_base_url():
+    """
+    Return the OMDb endpoint, which can be overridden with OMDB_BASE_URL.
+
+    Returns:
+        str: The base URL requests are sent to.
+    """
+    get_api_key()  # makes OMDB_BASE_URL from .env visible too
+    return os.getenv("OMDB_BASE_URL") or DEFAULT_BASE_URL
+
+
+def _get_session():
+    """
+    Return the shared HTTP session, so repeated fetches reuse connections.
+
+    Returns:
+        requests.Session: The session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=BULK_WORKERS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _retry_delay(response, attempt):
+    """
+    Seconds to wait before retrying a throttled or failed request.
+
+    Args:
+        response (requests.Response): The response to retry.
+        attempt (int): 0-based attempt number.
+
+    Returns:
+        float: Retry-After if the server sent one, exponential backoff otherwise.
+    """
+    try:
+        delay = float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        delay = 0.5 * 2 ** attempt
+    return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+
+@instrumented("omdb.fetch_movie_data")
+def fetch_movie_data(title, quiet=False):
     """
     Fetch movie information from the OMDb API based on the movie title.
 
@@ -26,28 +108,75 @@ def fetch_movie_data(title):
     movie details such as title, year, rating, actors, poster URL, etc.
 
     Handles cases where the movie is not found or the API is unreachable.
+    Rate-limited (429) and server error (500, 502-504) responses are retried
+    up to MAX_RETRIES times.
 
     :param title: The movie title to search for (string)
+    :param quiet: Don't print why a fetch failed (bool)
     :return: A dictionary with movie data if found, otherwise None
     """
-    url = f"http://www.omdbapi.com/?apikey={API_KEY}&t={title}"
+    import requests
+
+    params = {"apikey": get_api_key(), "t": title}
+    url = get_base_url()
     try:
-        response = requests.get(url, timeout=5)
+        for attempt in range(MAX_RETRIES + 1):
+            response = _get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            time.sleep(_retry_delay(response, attempt))
+
         if response.status_code == 200:
             data = response.json()
             if data.get("Response") == "True":
                 return data
             else:
-                print(f"\nMovie '{title}' not found")
+                if not quiet:
+                    print(f"\nMovie '{title}' not found")
                 return None
         else:
-            print("\nError fetching data!")
+            if not quiet:
+                print("\nError fetching data!")
             return None
     except requests.exceptions.RequestException as e:
-        print(f"\nAPI request failed: {e}")
+        if not quiet:
+            print(f"\nAPI request failed: {e}")
         return None
 
 
+def parse_movie_data(data):
+    """
+    Extract the fields the storage keeps from an OMDb response.
+
+    Args:
+        data (dict): A successful OMDb response.
+
+    Returns:
+        tuple: (title, year, rating, poster); rating is 0.0 when OMDb has none.
+    """
+    year = int(data.get("Year"))
+    rating = float(data.get("imdbRating")) if data.get("imdbRating") != "N/A" else 0.0
+    return data.get("Title", ""), year, rating, data.get("Poster")
+
+
+def fetch_movies_data(titles, workers=BULK_WORKERS):
+    """
+    Fetch several movies concurrently, e.g. for a bulk import.
+
+    Args:
+        titles (list): Movie titles to search for.
+        workers (int): Number of parallel requests.
+
+    Returns:
+        dict: {title: movie data or None}, in the order of titles.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="omdb") as pool:
+        results = pool.map(lambda title: fetch_movie_data(title, quiet=True), titles)
+        return dict(zip(titles, results))
+
+
 if __name__ == "__main__":
     movie_title = "Titanic"
     result = fetch_movie_data(movie_title)
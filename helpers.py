@@ -1,5 +1,8 @@
-import statistics
-from random import choice
+import itertools
+
+from distribution import RatingDistribution, format_ascii_histogram
+from facet_index import parse_facet_query
+from instrumentation import instrumented
 
 __all__ = [
     "menu",
@@ -12,8 +15,8 @@ __all__ = [
     "get_median_rating",
     "get_best_rated_movies",
     "get_worst_rated_movies",
-    "get_random_movie",
-    "find_movies",
+    "get_search_term_from_user",
+    "search_movies",
     "sort_movies_by_rating",
     "get_title_from_user",
     "get_valid_year_from_user",
@@ -26,7 +29,12 @@ __all__ = [
     "get_minimum_rating_from_user",
     "get_start_year_from_user",
     "get_end_year_from_user",
-    "filter_movies"
+    "filter_movies",
+    "render_website",
+    "display_distribution",
+    "get_facet_query_from_user",
+    "display_facet_results",
+    "display_similar_movies"
 ]
 
 MIN_YEAR = 1000
@@ -46,7 +54,10 @@ menu = ("Exit",
         "Movies sorted by rating",
         "Movies sorted by year",
         "Filter movies",
-        "Generate website"
+        "Generate website",
+        "Distribution",
+        "Faceted search",
+        "More like this"
         )
 
 
@@ -116,6 +127,7 @@ def show_movies(movies):
             print(f"'{title}'\n\tRating: {float(data['rating'])} | Year: {data['year']} ")
 
 
+@instrumented("helpers.get_average_rating")
 def get_average_rating(movies):
     """
     Calculate the average rating of movies.
@@ -130,20 +142,23 @@ def get_average_rating(movies):
     return round(sum(ratings) / len(ratings), 1) if ratings else None
 
 
+@instrumented("helpers.get_median_rating")
 def get_median_rating(movies):
     """
     Calculate the median rating of movies.
 
+    Ratings are counted into 0.1-wide buckets instead of being sorted.
+
     Args:
         movies (dict): Dictionary of movies.
 
     Returns:
         float or None: Median rating rounded to 1 decimal place, or None if no movies.
     """
-    ratings = sorted([details["rating"] for details in movies.values()])
-    return round(statistics.median(ratings), 1) if ratings else None
+    return RatingDistribution.from_movies(movies).median()
 
 
+@instrumented("helpers.get_best_rated_movies")
 def get_best_rated_movies(movies):
     """
     Find the movie(s) with the highest rating.
@@ -168,6 +183,7 @@ def get_best_rated_movies(movies):
     return best_rated_movies if best_rated_movies else []
 
 
+@instrumented("helpers.get_worst_rated_movies")
 def get_worst_rated_movies(movies):
     """
     Find the movie(s) with the lowest rating.
@@ -192,39 +208,38 @@ def get_worst_rated_movies(movies):
     return worst_rated_movies if worst_rated_movies else []
 
 
-def get_random_movie(movies):
+@instrumented("input.get_search_term_from_user", idle=True)
+def get_search_term_from_user():
     """
-    Select a random movie from the collection.
-
-    Args:
-        movies (dict): Dictionary of movies.
+    Prompt user to enter part of a movie title.
 
     Returns:
-        tuple: Movie title and its details.
+        str: The search term entered by the user.
     """
-    random_movie_name = choice(list(movies))
-    random_movie_data = movies[random_movie_name]
-    return random_movie_name, random_movie_data
+    return input("Enter part of movie name: ")
 
 
-def find_movies(movies):
+@instrumented("helpers.search_movies")
+def search_movies(movies, part_of_movie_name):
     """
-    Search for movies containing a user-provided substring.
+    Find movies whose title contains the given substring (case-insensitive).
 
     Args:
         movies (dict): Dictionary of movies.
+        part_of_movie_name (str): Substring to search for.
 
     Returns:
         dict: Movies matching the search criteria.
     """
-    part_of_movie_name = input("Enter part of movie name: ")
+    search_term = part_of_movie_name.lower()
     found_items = {}
     for title, data in movies.items():
-        if part_of_movie_name.lower() in title.lower():
+        if search_term in title.lower():
             found_items[title] = data
     return found_items
 
 
+@instrumented("helpers.sort_movies_by_rating")
 def sort_movies_by_rating(movies, order):
     """
     Sort movies by rating.
@@ -240,6 +255,7 @@ def sort_movies_by_rating(movies, order):
     return sorted_movies
 
 
+@instrumented("input.get_title_from_user", idle=True)
 def get_title_from_user():
     """
     Prompt user to enter a movie title.
@@ -250,6 +266,7 @@ def get_title_from_user():
     return input("Enter movie name: ").strip()
 
 
+@instrumented("input.get_valid_year_from_user", idle=True)
 def get_valid_year_from_user():
     """
     Prompt user to enter a valid year.
@@ -268,6 +285,7 @@ def get_valid_year_from_user():
     return year
 
 
+@instrumented("input.get_valid_rating_from_user", idle=True)
 def get_valid_rating_from_user():
     """
     Prompt user to enter a valid movie rating.
@@ -286,6 +304,7 @@ def get_valid_rating_from_user():
     return rating
 
 
+@instrumented("helpers.sort_movies_by_year")
 def sort_movies_by_year(movies, order):
     """
     Sort movies by release year.
@@ -301,6 +320,7 @@ def sort_movies_by_year(movies, order):
     return sorted_movies
 
 
+@instrumented("input.ask_user_for_sequence", idle=True)
 def ask_user_for_sequence():
     """
     Ask user to choose sorting sequence.
@@ -375,6 +395,7 @@ def display_random_movie(random_movie):
           f"and released {random_movie[1]['year']}.")
 
 
+@instrumented("input.get_minimum_rating_from_user", idle=True)
 def get_minimum_rating_from_user():
     """
     Prompt user to enter a minimum rating or leave blank for default.
@@ -396,6 +417,7 @@ def get_minimum_rating_from_user():
     return valid_rating
 
 
+@instrumented("input.get_start_year_from_user", idle=True)
 def get_start_year_from_user():
     """
     Prompt user to enter a start year or leave blank for default.
@@ -417,6 +439,7 @@ def get_start_year_from_user():
     return valid_year
 
 
+@instrumented("input.get_end_year_from_user", idle=True)
 def get_end_year_from_user():
     """
     Prompt user to enter an end year or leave blank for default.
@@ -438,6 +461,7 @@ def get_end_year_from_user():
     return valid_year
 
 
+@instrumented("helpers.filter_movies")
 def filter_movies(movies, min_rating, start_year, end_year):
     """
     Filter movies based on minimum rating and year range.
@@ -457,3 +481,123 @@ def filter_movies(movies, min_rating, start_year, end_year):
         if data["rating"] >= min_rating and start_year <= data["year"] <= end_year:
             filtered_movies[title] = data
     return filtered_movies
+
+
+@instrumented("helpers.render_website")
+def render_website(movies, title, template, grid_limit=None):
+    """
+    Render the static website for a collection of movies.
+
+    Args:
+        movies (dict): Dictionary of movies.
+        title (str): Title shown at the top of the page.
+        template (str): HTML template with __TEMPLATE_TITLE__,
+            __TEMPLATE_MOVIE_GRID__ and optionally __TEMPLATE_MOVIE_COUNT__
+            placeholders.
+        grid_limit (int): Render only the first grid_limit movies; the rest
+            are reachable through the search index. None renders all.
+
+    Returns:
+        str: The rendered HTML page.
+    """
+    movie_items = []
+    for name, data in itertools.islice(movies.items(), grid_limit):
+        poster = data.get("poster", "")
+        year = data.get("year", "")
+        rating = data.get("rating", "")
+
+        movie_items.append(f"""
+                <li>
+                  <div class="movie">
+                    <img class="movie-poster" src="{poster}" alt="{name} poster"/>
+                    <div class="movie-title">{name}</div>
+                    <div class="movie-year">{year}</div>
+                    <div class="movie-rating">Rating: {rating}</div>
+                  </div>
+                </li>
+                """)
+
+    if len(movie_items) < len(movies):
+        movie_count = f"Showing {len(movie_items)} of {len(movies)} movies. Search or filter to find the rest."
+    else:
+        movie_count = f"{len(movies)} movies"
+
+    page_content = template.replace("__TEMPLATE_TITLE__", title)
+    page_content = page_content.replace("__TEMPLATE_MOVIE_COUNT__", movie_count)
+    return page_content.replace("__TEMPLATE_MOVIE_GRID__", "".join(movie_items))
+
+
+def display_distribution(distribution):
+    """
+    Display rating percentiles, a rating histogram and per-decade statistics.
+
+    Args:
+        distribution (RatingDistribution): Bucketed counts of the movies.
+    """
+    if not distribution.count:
+        print("No movies found!")
+        return
+    print(f"\n----- Distribution of {distribution.count} movies -----")
+    print(f"Average rating: {distribution.average()} | Median rating: {distribution.median()}")
+    print("Percentiles   : " + " | ".join(f"P{percent}: {distribution.percentile(percent)}"
+                                          for percent in (10, 25, 75, 90)))
+    print("\nRatings:")
+    ratings = {f"{low:.0f}-{high:.0f}": count for (low, high), count in distribution.rating_histogram().items()}
+    print(format_ascii_histogram(ratings))
+    print("\nMovies per decade:")
+    print(format_ascii_histogram({f"{decade}s": count for decade, count in distribution.decade_counts().items()}))
+    print("\nAverage rating per decade:")
+    for decade, average in distribution.decade_averages().items():
+        print(f"{decade}s: {average}")
+
+
+@instrumented("input.get_facet_query_from_user", idle=True)
+def get_facet_query_from_user():
+    """
+    Prompt user for a faceted query until it can be parsed.
+
+    Returns:
+        FacetQuery: The parsed query.
+    """
+    print("Combine genre:, director:, actor:, plain terms and rating/year bounds with '&',")
+    print("e.g. drama & director:nolan & rating>=8 & year>=2000")
+    while True:
+        try:
+            return parse_facet_query(input("Enter faceted query: "))
+        except ValueError as e:
+            print(f"{e}. Please try again!")
+
+
+def display_facet_results(result):
+    """
+    Display the facet counts and the matching movies of a faceted search.
+
+    Args:
+        result (dict): Result of FacetIndex.search().
+    """
+    if not result["total"]:
+        print("\nNo movie found.")
+        return
+    print(f"\n----- {result['total']} matching movies -----")
+    for facet, counts in result["facets"].items():
+        if counts:
+            print(f"{facet.capitalize()}: " + ", ".join(f"{value} ({count})" for value, count in counts))
+    if len(result["movies"]) < result["total"]:
+        print(f"\nBest rated {len(result['movies'])}:")
+    show_movies(result["movies"])
+
+
+def display_similar_movies(title, similar_movies):
+    """
+    Display the movies most similar to a given one.
+
+    Args:
+        title (str): The movie the recommendations are for.
+        similar_movies (list): (title, {"rating", "year"}, distance) tuples, nearest first.
+    """
+    if not similar_movies:
+        print("\nNo similar movies found.")
+        return
+    print(f"\n----- More like '{title}' -----")
+    for similar_title, data, distance in similar_movies:
+        print(f"'{similar_title}'\n\tRating: {float(data['rating'])} | Year: {data['year']} | Distance: {distance:.2f}")
@@ -0,0 +1,272 @@
+"""
+Opt-in timing and resource instrumentation for MovieApp commands and storage calls.
+
+Set the environment variable MOVIE_APP_PROFILE=1 to enable it. When the flag
+is not set, the @instrumented decorator returns the function unchanged, so
+disabled instrumentation costs nothing at call time.
+
+For every instrumented name it records:
+- call count and wall time (total, max)
+- busy time: wall time minus time spent waiting for user input
+- bytes read/written, from /proc/self/io where available (process-wide)
+- peak traced memory above the level at entry (via tracemalloc)
+
+tracemalloc keeps a single, process-wide peak. Every measurement resets it
+when it starts, so before each reset the peak so far is folded into all
+measurements still running, in any thread. A measurement therefore never
+loses the peak of its own earlier work, but while threads overlap (e.g. in
+the HTTP server) their peaks include each other's allocations.
+
+MovieApp.run prints a summary table on exit. If MOVIE_APP_PROFILE_OUTPUT is
+set, the metrics are also written there, as Prometheus text if the file name
+ends in .prom and as JSON otherwise.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+ENABLED = os.getenv("MOVIE_APP_PROFILE", "").lower() in ("1", "true", "yes", "on")
+OUTPUT_PATH = os.getenv("MOVIE_APP_PROFILE_OUTPUT")
+
+PROC_IO_PATH = "/proc/self/io"
+
+_stats = {}
+_stats_lock = threading.Lock()
+_local = threading.local()
+# Frames of all threads that are still running, and the lock around tracemalloc's peak.
+_active_frames = set()
+_peak_lock = threading.Lock()
+
+
+def _read_io_counters():
+    """
+    Read the process-wide read/write byte counters.
+
+    Returns:
+        tuple: (bytes read, bytes written), or (0, 0) if unavailable.
+    """
+    try:
+        with open(PROC_IO_PATH, "rb") as io_file:
+            counters = dict(line.split(b":") for line in io_file.read().splitlines())
+        return int(counters[b"rchar"]), int(counters[b"wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class _Frame:
+    """Bookkeeping for one active measurement."""
+
+    __slots__ = ("name", "idle", "start", "io_start", "memory_start", "peak", "waiting")
+
+    def __init__(self, name, idle):
+        self.name = name
+        self.idle = idle
+        self.waiting = 0.0
+        self.peak = 0
+        with _peak_lock:
+            self.memory_start, peak = tracemalloc.get_traced_memory()
+            for frame in _active_frames:
+                frame.peak = max(frame.peak, peak)
+            tracemalloc.reset_peak()
+            _active_frames.add(self)
+        self.io_start = _read_io_counters()
+        self.start = time.perf_counter()
+
+
+def _record(frame, wall, bytes_read, bytes_written, peak_memory):
+    with _stats_lock:
+        stats = _stats.get(frame.name)
+        if stats is None:
+            stats = _stats[frame.name] = {
+                "calls": 0, "wall_seconds": 0.0, "max_wall_seconds": 0.0, "busy_seconds": 0.0,
+                "bytes_read": 0, "bytes_written": 0, "peak_memory_bytes": 0,
+            }
+        stats["calls"] += 1
+        stats["wall_seconds"] += wall
+        stats["max_wall_seconds"] = max(stats["max_wall_seconds"], wall)
+        stats["busy_seconds"] += 0.0 if frame.idle else wall - frame.waiting
+        stats["bytes_read"] += bytes_read
+        stats["bytes_written"] += bytes_written
+        stats["peak_memory_bytes"] = max(stats["peak_memory_bytes"], peak_memory)
+
+
+@contextmanager
+def measure(name, idle=False):
+    """
+    Measure a block of code under the given name.
+
+    Measurements nest: time spent in an idle child (e.g. waiting for user
+    input) is excluded from the parent's busy time, and a child's memory
+    peak counts towards the parent's peak.
+
+    Args:
+        name (str): Metric name, e.g. "command.add_movie".
+        idle (bool): True if the block only waits (for input, not for I/O).
+
+    Yields:
+        None
+    """
+    if not ENABLED:
+        yield
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    stack = _stack()
+    frame = _Frame(name, idle)
+    stack.append(frame)
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - frame.start
+        read_end, written_end = _read_io_counters()
+        with _peak_lock:
+            _, peak = tracemalloc.get_traced_memory()
+            _active_frames.discard(frame)
+        peak = max(peak, frame.peak)
+        stack.pop()
+        if stack:
+            parent = stack[-1]
+            parent.waiting += wall if idle else frame.waiting
+            parent.peak = max(parent.peak, peak)
+        _record(frame, wall, read_end - frame.io_start[0], written_end - frame.io_start[1],
+                max(peak - frame.memory_start, 0))
+
+
+def instrumented(name, idle=False):
+    """
+    Decorator that measures every call of a function under the given name.
+
+    Returns the function unchanged when instrumentation is disabled.
+
+    Args:
+        name (str): Metric name, e.g. "storage.json.save_data".
+        idle (bool): True if the function only waits for user input.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with measure(name, idle):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_stats():
+    """
+    Return a copy of the collected metrics.
+
+    Returns:
+        dict: Metric name -> dict of counters.
+    """
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def reset_stats():
+    """
+    Discard all collected metrics.
+
+    Returns:
+        None
+    """
+    with _stats_lock:
+        _stats.clear()
+
+
+def summary_table():
+    """
+    Format the collected metrics as a text table, slowest first.
+
+    Returns:
+        str: The table, or a note if nothing was recorded.
+    """
+    stats = get_stats()
+    if not stats:
+        return "No instrumentation data recorded."
+    lines = [f"{'name':<36} {'calls':>6} {'busy ms':>10} {'wall ms':>10} {'max ms':>9} "
+             f"{'read KiB':>9} {'write KiB':>9} {'peak KiB':>9}"]
+    for name, data in sorted(stats.items(), key=lambda item: item[1]["busy_seconds"], reverse=True):
+        lines.append(f"{name:<36} {data['calls']:>6} {data['busy_seconds'] * 1000:>10.2f} "
+                     f"{data['wall_seconds'] * 1000:>10.2f} {data['max_wall_seconds'] * 1000:>9.2f} "
+                     f"{data['bytes_read'] / 1024:>9.1f} {data['bytes_written'] / 1024:>9.1f} "
+                     f"{data['peak_memory_bytes'] / 1024:>9.1f}")
+    return "\n".join(lines)
+
+
+def to_prometheus():
+    """
+    Export the collected metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: One sample per metric and name, labelled with name="...".
+    """
+    metrics = (
+        ("calls", "movie_app_calls_total", "counter", "Number of calls."),
+        ("wall_seconds", "movie_app_wall_seconds_total", "counter", "Total wall time."),
+        ("busy_seconds", "movie_app_busy_seconds_total", "counter", "Wall time minus user input waits."),
+        ("bytes_read", "movie_app_bytes_read_total", "counter", "Bytes read by the process."),
+        ("bytes_written", "movie_app_bytes_written_total", "counter", "Bytes written by the process."),
+        ("peak_memory_bytes", "movie_app_peak_memory_bytes", "gauge", "Peak traced memory above entry."),
+    )
+    stats = get_stats()
+    lines = []
+    for key, metric, metric_type, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for name, data in sorted(stats.items()):
+            escaped = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{name="{escaped}"}} {data[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def to_json():
+    """
+    Export the collected metrics as JSON.
+
+    Returns:
+        str: The metrics keyed by name.
+    """
+    return json.dumps(get_stats(), indent=4, sort_keys=True)
+
+
+def write_report(path=None):
+    """
+    Write the metrics to a file, as Prometheus text for .prom files and JSON otherwise.
+
+    Args:
+        path (str): Target file, defaults to MOVIE_APP_PROFILE_OUTPUT.
+
+    Returns:
+        None
+    """
+    path = path or OUTPUT_PATH
+    if not path:
+        return
+    content = to_prometheus() if path.endswith(".prom") else to_json()
+    try:
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(content)
+        print(f"[INFO] Instrumentation report written to {path}")
+    except IOError as e:
+        print(f"Error while writing the instrumentation report: {e}")
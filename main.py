@@ -1,13 +1,17 @@
 from movie_app import MovieApp
-from storage.storage_csv import StorageCsv
-from storage.storage_json import StorageJson
+from storage.storage_factory import open_storage
+
+
+def create_app():
+    # Backend is chosen by the MOVIE_APP_STORAGE file extension (.json or .csv)
+    # and only opened when the first command needs it. Movies stay in memory
+    # and are only reloaded when the file changes.
+    storage = open_storage(lazy=True, watch=True)
+    return MovieApp(storage, "Lukas's Movies")
 
 
 def main():
-    storage = StorageCsv("data/movies.csv")
-    storage = StorageJson("data/movies.json")
-    app = MovieApp(storage, "Lukas's Movies")
-    app.run()
+    create_app().run()
 
 
 if __name__ == "__main__":
@@ -1,21 +1,123 @@
-from fetch_movie import fetch_movie_data
+from distribution import RatingDistribution
+from facet_index import FacetIndex
+from fetch_movie import fetch_movie_data, parse_movie_data
 from helpers import *
+from instrumentation import ENABLED as INSTRUMENTATION_ENABLED, instrumented, summary_table, write_report
+from query_cache import QueryCache
+from recommend import SimilarityIndex
+from search_index import write_search_index
+from storage.metadata_store import MetadataStore
+
+WEBSITE_GRID_LIMIT = 200
+FACET_RESULT_LIMIT = 50
+SIMILAR_MOVIES = 10
+
+# Indexes derived from the movies and their OMDb metadata, built on first use.
+INDEX_BUILDERS = {
+    "facets": FacetIndex.build,
+    "similar": SimilarityIndex.build,
+}
 
 
 class MovieApp:
     """Main application class for managing movies using a storage backend."""
 
-    def __init__(self, storage, title="My Movie Database"):
+    def __init__(self, storage, title="My Movie Database", query_cache=None, metadata=None):
         """
         Initialize the MovieApp.
 
         Args:
             storage (IStorage): The storage backend to use (e.g., StorageJson).
             title (str): The title to display in the UI.
+            query_cache (QueryCache): Cache for search/filter/sort/stats results.
+                Defaults to a new QueryCache.
+            metadata (MetadataStore): Side store for the full OMDb payloads.
+                Defaults to the store next to the storage's data file.
         """
         self._storage = storage
         self._title = title
+        self._query_cache = query_cache if query_cache is not None else QueryCache()
+        self._metadata = metadata
+        self._indexes = {}  # name -> (index, versions it was built for)
+
+    def _cached_query(self, operation, params, compute):
+        """
+        Run a read-only query through the result cache.
+
+        The cache key includes the storage's data version, so results are
+        recomputed after any change to the movies.
+
+        Args:
+            operation (str): Query name.
+            params (tuple): Hashable query parameters.
+            compute (callable): Computes the result from storage.
+
+        Returns:
+            The (possibly cached) result.
+        """
+        return self._query_cache.get_or_compute(operation, params, self._storage.data_version(), compute)
+
+    @property
+    def metadata(self):
+        """
+        The OMDb metadata side store, opened on first use.
+
+        Returns:
+            MetadataStore: The store.
+        """
+        if self._metadata is None:
+            self._metadata = MetadataStore.for_storage(self._storage)
+        return self._metadata
+
+    def _index_versions(self):
+        return self._storage.data_version(), self.metadata.version()
+
+    def _current_indexes(self):
+        """
+        Return the names of the derived indexes that still match the movies and the metadata.
+
+        Returns:
+            list: Names of INDEX_BUILDERS entries that can be used (and updated) as they are.
+        """
+        versions = self._index_versions()
+        if versions[0] is None:
+            return []
+        return [name for name, (_, version) in self._indexes.items() if version == versions]
+
+    def _get_index(self, name):
+        """
+        Return a derived index, rebuilding it if the movies or the metadata changed.
+
+        Args:
+            name (str): "facets" or "similar" (see INDEX_BUILDERS).
+
+        Returns:
+            FacetIndex or SimilarityIndex: The current index.
+        """
+        if name not in self._current_indexes():
+            index = INDEX_BUILDERS[name](self._storage.list_movie_records(), self.metadata.items())
+            self._indexes[name] = (index, self._index_versions())
+        return self._indexes[name][0]
+
+    def _update_indexes(self, current, method, *args):
+        """
+        Apply a change made by this app to the derived indexes instead of rebuilding them.
+
+        Args:
+            current (list): Indexes that were current before the change.
+            method (str): "add_movie", "remove_movie" or "set_rating".
+            *args: Arguments for that method.
+
+        Returns:
+            None
+        """
+        versions = self._index_versions()
+        for name in current:
+            index = self._indexes[name][0]
+            getattr(index, method)(*args)
+            self._indexes[name] = (index, versions)
 
+    @instrumented("command.list_movies")
     def _command_list_movies(self):
         """
         List all movies stored in the database.
@@ -26,6 +128,7 @@ class MovieApp:
         movies = self._storage.list_movies()
         show_movies(movies)
 
+    @instrumented("command.add_movie")
     def _command_add_movie(self):
         """
         Prompts the user for a movie title, fetches movie data from the OMDb API,
@@ -46,15 +149,17 @@ class MovieApp:
         title = get_title_from_user()
         data = fetch_movie_data(title)
         if data:
-            year = int(data.get("Year"))
+            omdb_title, year, rating, poster = parse_movie_data(data)
             if title in movies and movies.get(title).get("year") == year:
                 print(f"\nMovie '{title}' already exists!")
             else:
-                title = data.get("Title", "")
-                rating = float(data.get("imdbRating")) if data.get("imdbRating") != "N/A" else 0.0
-                poster = data.get("Poster")
-                self._storage.add_movie(title, year, rating, poster)
+                current = self._current_indexes()
+                self._storage.add_movie(omdb_title, year, rating, poster)
+                self.metadata.put(omdb_title, data)
+                self._update_indexes(current, "add_movie", omdb_title,
+                                     {"rating": float(round(rating, 1)), "year": year}, data)
 
+    @instrumented("command.delete_movie")
     def _command_delete_movie(self):
         """
         Prompt the user to delete a movie by title.
@@ -65,10 +170,14 @@ class MovieApp:
         movies = self._storage.list_movies()
         movie_to_delete = get_title_from_user()
         if movie_to_delete in movies:
+            current = self._current_indexes()
             self._storage.delete_movie(movie_to_delete)
+            self.metadata.remove(movie_to_delete)
+            self._update_indexes(current, "remove_movie", movie_to_delete)
         else:
             print(f"\nMovie '{movie_to_delete}' doesn't exist!")
 
+    @instrumented("command.update_movie")
     def _command_update_movie(self):
         """
         Prompt the user to update the rating of an existing movie.
@@ -80,10 +189,13 @@ class MovieApp:
         movie_name = get_title_from_user()
         if movie_name in movies:
             new_movie_rating = get_valid_rating_from_user()
+            current = self._current_indexes()
             self._storage.update_movie(movie_name, new_movie_rating)
+            self._update_indexes(current, "set_rating", movie_name, new_movie_rating)
         else:
             print(f"\nMovie '{movie_name}' doesn't exist!")
 
+    @instrumented("command.movie_stats")
     def _command_movie_stats(self):
         """
         Calculate and display statistics about the stored movies.
@@ -91,24 +203,32 @@ class MovieApp:
         Returns:
             None
         """
-        movies = self._storage.list_movies()
-        average = get_average_rating(movies)
-        median = get_median_rating(movies)
-        best_movies = get_best_rated_movies(movies)
-        worst_movies = get_worst_rated_movies(movies)
+        def compute():
+            movies = self._storage.list_movies()
+            return (get_average_rating(movies), get_median_rating(movies),
+                    get_best_rated_movies(movies), get_worst_rated_movies(movies))
+
+        average, median, best_movies, worst_movies = self._cached_query("movie_stats", (), compute)
         display_movie_stats(average, median, best_movies, worst_movies)
 
+    @instrumented("command.random_movie")
     def _command_random_movie(self):
         """
         Display a randomly selected movie from the database.
 
+        Uses the storage's random index, so the catalogue is not reloaded
+        on every pick.
+
         Returns:
             None
         """
-        movies = self._storage.list_movies()
-        movie = get_random_movie(movies)
+        movie = self._storage.random_movie()
+        if movie is None:
+            print("No movies found!")
+            return
         display_random_movie(movie)
 
+    @instrumented("command.search_movie")
     def _command_search_movie(self):
         """
         Prompt the user for a search term and display matching movies.
@@ -116,10 +236,13 @@ class MovieApp:
         Returns:
             None
         """
-        movies = self._storage.list_movies()
-        found_movies = find_movies(movies)
+        part_of_movie_name = get_search_term_from_user()
+        found_movies = self._cached_query(
+            "search", (part_of_movie_name.lower(),),
+            lambda: search_movies(self._storage.list_movies(), part_of_movie_name))
         display_found_movies(found_movies)
 
+    @instrumented("command.sort_by_rating")
     def _command_sort_by_rating(self):
         """
         Prompt the user for sort order and display movies sorted by rating.
@@ -127,11 +250,12 @@ class MovieApp:
         Returns:
             None
         """
-        movies = self._storage.list_movies()
         order = ask_user_for_sequence()
-        sorted_movies = sort_movies_by_rating(movies, order)
+        sorted_movies = self._cached_query(
+            "sort_by_rating", (order,), lambda: sort_movies_by_rating(self._storage.list_movies(), order))
         show_movies(sorted_movies)
 
+    @instrumented("command.sort_by_year")
     def _command_sort_by_year(self):
         """
         Prompt the user for sort order and display movies sorted by year.
@@ -139,11 +263,12 @@ class MovieApp:
         Returns:
             None
         """
-        movies = self._storage.list_movies()
         order = ask_user_for_sequence()
-        sorted_movies = sort_movies_by_year(movies, order)
+        sorted_movies = self._cached_query(
+            "sort_by_year", (order,), lambda: sort_movies_by_year(self._storage.list_movies(), order))
         show_movies(sorted_movies)
 
+    @instrumented("command.filter_movies")
     def _command_filter_movies(self):
         """
         Filter movies based on user-defined rating and year range.
@@ -151,19 +276,24 @@ class MovieApp:
         Returns:
             None
         """
-        movies = self._storage.list_movies()
         min_rating = get_minimum_rating_from_user()
         start_year = get_start_year_from_user()
         end_year = get_end_year_from_user()
-        filtered = filter_movies(movies, min_rating, start_year, end_year)
+        filtered = self._cached_query(
+            "filter", (min_rating, start_year, end_year),
+            lambda: filter_movies(self._storage.list_movies_in_years(start_year, end_year),
+                                  min_rating, start_year, end_year))
         show_movies(filtered)
 
+    @instrumented("command.generate_website")
     def _command_generate_website(self):
         """
         Generate a static HTML website based on the stored movies and a template file.
 
         Replaces title and movie list placeholders in the template and writes the result
-        to a new index.html file.
+        to a new index.html file. Only the first WEBSITE_GRID_LIMIT movies are rendered
+        into the page; static/search/ gets the search and filter index for the rest.
+        A minified, fingerprinted and precompressed copy is then built in static/dist/.
 
         Returns:
             None
@@ -177,39 +307,73 @@ class MovieApp:
             with open("static/index_template.html", "r", encoding="utf-8") as template_file:
                 template = template_file.read()
 
-            title = self._title
-            movie_grid_html = ""
-
-            for name, data in movies.items():
-                poster = data.get("poster", "")
-                year = data.get("year", "")
-                rating = data.get("rating", "")
-
-                movie_html = f"""
-                <li>
-                  <div class="movie">
-                    <img class="movie-poster" src="{poster}" alt="{name} poster"/>
-                    <div class="movie-title">{name}</div>
-                    <div class="movie-year">{year}</div>
-                    <div class="movie-rating">Rating: {rating}</div>
-                  </div>
-                </li>
-                """
-                movie_grid_html += movie_html
-
-            page_content = template.replace("__TEMPLATE_TITLE__", title)
-            page_content = page_content.replace("__TEMPLATE_MOVIE_GRID__", movie_grid_html)
+            page_content = render_website(movies, self._title, template, WEBSITE_GRID_LIMIT)
 
+            write_search_index(movies, "static/search")
             with open("static/index.html", "w", encoding="utf-8") as output_file:
                 output_file.write(page_content)
 
             print("\nWebsite was generated successfully.")
 
+            from site_build import build_site  # hashlib/gzip are only needed here
+            stats = build_site("static", "static/dist")
+            print(f"Production build: static/dist ({stats['bytes']} bytes, {stats['gzip_bytes']} gzipped).")
+
         except FileNotFoundError:
             print("\nError: Template file not found. Make sure 'static/index_template.html' exists.")
         except Exception as e:
             print(f"\nAn unexpected error occurred: {e}")
 
+    @instrumented("command.distribution")
+    def _command_distribution(self):
+        """
+        Display the rating and release-year distribution of the stored movies.
+
+        The movies are streamed in a single pass, so the catalogue is never
+        held in memory as a whole.
+
+        Returns:
+            None
+        """
+        movies = (details for _, details in self._storage.iter_movies())
+        display_distribution(RatingDistribution.from_records(movies))
+
+    @instrumented("command.facet_search")
+    def _command_facet_search(self):
+        """
+        Search by genre, director and actors combined with rating and year bounds.
+
+        Shows how many movies match, the most frequent values of every facet
+        among them and the FACET_RESULT_LIMIT best rated matches. The index is
+        built on first use and then kept up to date by this app's own changes.
+
+        Returns:
+            None
+        """
+        query = get_facet_query_from_user()
+        result = self._get_index("facets").search(query, limit=FACET_RESULT_LIMIT)
+        display_facet_results(result)
+
+    @instrumented("command.similar_movies")
+    def _command_similar_movies(self):
+        """
+        Show the movies most similar to a chosen one ("More like this").
+
+        Similarity combines release year, rating and, where OMDb metadata is
+        stored, shared genres and director. The index is built on first use
+        and then kept up to date by this app's own changes.
+
+        Returns:
+            None
+        """
+        title = get_title_from_user()
+        index = self._get_index("similar")
+        if title not in index:
+            print(f"\nMovie '{title}' doesn't exist!")
+            return
+        display_similar_movies(title, [(similar, index.movie(similar), distance)
+                                       for similar, distance in index.similar(title, SIMILAR_MOVIES)])
+
     def run(self):
         """
         Start the main loop of the movie app, display the menu, and handle commands.
@@ -224,6 +388,15 @@ class MovieApp:
 
             match user_choice:
                 case 0:
+                    try:
+                        self._storage.flush()
+                    except (OSError, TypeError) as e:
+                        print(f"\nError while saving the file: {e}")
+                        print("Your changes are kept in memory. Fix the problem and choose 0 again to retry.")
+                        continue
+                    if INSTRUMENTATION_ENABLED:
+                        print(f"\n{summary_table()}")
+                        write_report()
                     print("\nBye Bye!")
                     break
                 case 1:
@@ -259,3 +432,12 @@ class MovieApp:
                 case 11:
                     self._command_generate_website()
                     press_enter_to_continue()
+                case 12:
+                    self._command_distribution()
+                    press_enter_to_continue()
+                case 13:
+                    self._command_facet_search()
+                    press_enter_to_continue()
+                case 14:
+                    self._command_similar_movies()
+                    press_enter_to_continue()
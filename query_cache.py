@@ -0,0 +1,143 @@
+"""
+Versioned LRU cache for query results (search, filter, sort, stats).
+
+Results are keyed by (operation, parameters) and stored together with the
+storage's data_version() at the time they were computed. A lookup only
+hits if the version is still the same, so any mutation (which bumps the
+version) invalidates every cached result at once, without scanning or
+guessing which queries it affected. When the version changes, all entries
+of older versions are dropped immediately.
+
+The cache holds at most max_bytes of (estimated) result size and evicts
+the least recently used entries beyond that. MOVIE_APP_QUERY_CACHE_MB sets
+the default cap; 0 disables caching.
+
+Cached results are shared between callers and must not be modified.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("MOVIE_APP_QUERY_CACHE_MB", "32")) * 1024 * 1024)
+
+
+def estimate_size(value):
+    """
+    Estimate the memory held by a query result, including nested containers.
+
+    Objects reachable more than once are counted once.
+
+    Args:
+        value: The result (dicts, lists, tuples, strings and numbers).
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+class QueryCache:
+    """LRU cache of query results, invalidated by the storage data version."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Memory cap for cached results; 0 disables caching.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._version = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, operation, params, version, compute):
+        """
+        Return the cached result of a query, computing it on a miss.
+
+        Args:
+            operation (str): Query name, e.g. "sort_by_rating".
+            params (tuple): Hashable query parameters.
+            version (hashable): The storage's current data_version(). None
+                means the version is unknown; the result is then computed
+                and not cached.
+            compute (callable): Produces the result without arguments.
+
+        Returns:
+            The query result.
+        """
+        if version is None or self.max_bytes <= 0:
+            return compute()
+
+        key = (operation, params)
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        result = compute()
+        size = estimate_size(result)
+        with self._lock:
+            # Skip results that are too large or already stale.
+            if size <= self.max_bytes and version == self._version:
+                if key in self._entries:
+                    self._bytes -= self._entries.pop(key)[1]
+                self._entries[key] = (result, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+        return result
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def invalidate(self):
+        """
+        Drop all cached results.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._clear()
+            self._version = None
+
+    def stats(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: {"entries", "bytes", "max_bytes", "hits", "misses", "evictions"}
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,138 @@
+"""
+Precomputed search and filter indexes for the static website.
+
+The site build writes a handful of small JSON files next to index.html so
+that static/search.js can answer title searches and rating/year filters
+in the browser without rendering, or even downloading, the whole catalogue:
+
+    manifest.json          counts, shard layout and build version
+    docs-<n>.json          [title, year, rating, poster] rows, DOC_CHUNK_SIZE per file
+    ngrams-<n>.json        {trigram: delta-encoded doc ids}, sharded by first character
+    by_rating.json         {"ids": [...], "values": [...]} sorted by rating
+    by_year.json           {"ids": [...], "values": [...]} sorted by year
+
+Doc ids are positions in title order, so any ascending id list is already
+sorted alphabetically. The browser only fetches the n-gram shards a query
+touches and the doc chunks holding the results it shows.
+"""
+
+import json
+import os
+import zlib
+
+NGRAM_SIZE = 3
+NGRAM_SHARDS = 16
+DOC_CHUNK_SIZE = 500
+
+
+def normalize_title(title):
+    """
+    Normalize a title for matching (must stay in sync with static/search.js).
+
+    Args:
+        title (str): The movie title.
+
+    Returns:
+        str: The lower-cased title with runs of whitespace collapsed.
+    """
+    return " ".join(title.lower().split())
+
+
+def title_ngrams(title, size=NGRAM_SIZE):
+    """
+    Split a normalized title into its distinct character n-grams.
+
+    Args:
+        title (str): A normalized title.
+        size (int): The n-gram length.
+
+    Returns:
+        set: The n-grams; empty if the title is shorter than size.
+    """
+    return {title[i:i + size] for i in range(len(title) - size + 1)}
+
+
+def ngram_shard(ngram, shards=NGRAM_SHARDS):
+    """
+    Pick the shard holding an n-gram.
+
+    Args:
+        ngram (str): The n-gram.
+        shards (int): Number of shards.
+
+    Returns:
+        int: The shard number.
+    """
+    return ord(ngram[0]) % shards
+
+
+def _delta_encode(ids):
+    previous = 0
+    encoded = []
+    for doc_id in ids:
+        encoded.append(doc_id - previous)
+        previous = doc_id
+    return encoded
+
+
+def build_search_index(movies):
+    """
+    Build the search index files for a catalogue.
+
+    Args:
+        movies (dict): Movies in the format {title: {rating, year, poster}}.
+
+    Returns:
+        dict: {file name: JSON-serializable content}
+    """
+    titles = sorted(movies, key=lambda name: (normalize_title(name), name))
+    docs = [[title, movies[title].get("year"), movies[title].get("rating"), movies[title].get("poster", "")]
+            for title in titles]
+
+    shards = [{} for _ in range(NGRAM_SHARDS)]
+    for doc_id, title in enumerate(titles):
+        for ngram in title_ngrams(normalize_title(title)):
+            shards[ngram_shard(ngram)].setdefault(ngram, []).append(doc_id)
+
+    files = {}
+    for chunk in range(0, len(docs), DOC_CHUNK_SIZE):
+        files[f"docs-{chunk // DOC_CHUNK_SIZE}.json"] = docs[chunk:chunk + DOC_CHUNK_SIZE]
+    for shard, postings in enumerate(shards):
+        files[f"ngrams-{shard}.json"] = {ngram: _delta_encode(ids) for ngram, ids in sorted(postings.items())}
+    for name, column in (("by_rating", 2), ("by_year", 1)):
+        ordered = sorted(range(len(docs)), key=lambda doc_id: (docs[doc_id][column], doc_id))
+        files[f"{name}.json"] = {"ids": ordered, "values": [docs[doc_id][column] for doc_id in ordered]}
+
+    version = f'{zlib.crc32(json.dumps(docs, separators=(",", ":")).encode("utf-8")):08x}'
+    files["manifest.json"] = {
+        "version": version,
+        "count": len(docs),
+        "ngram_size": NGRAM_SIZE,
+        "ngram_shards": NGRAM_SHARDS,
+        "doc_chunk_size": DOC_CHUNK_SIZE,
+    }
+    return files
+
+
+def write_search_index(movies, directory):
+    """
+    Write the search index files, replacing any previous build.
+
+    Args:
+        movies (dict): Movies in the format {title: {rating, year, poster}}.
+        directory (str): Output directory, e.g. static/search.
+
+    Returns:
+        dict: The manifest that was written.
+    """
+    files = build_search_index(movies)
+    os.makedirs(directory, exist_ok=True)
+    for file_name in os.listdir(directory):
+        if file_name.endswith(".json") and file_name not in files:
+            os.remove(os.path.join(directory, file_name))  # stale shard from a larger catalogue
+
+    # The manifest goes last, so a reader never sees it ahead of its shards.
+    for file_name in sorted(files, key=lambda name: name == "manifest.json"):
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as index_file:
+            json.dump(files[file_name], index_file, separators=(",", ":"), ensure_ascii=False)
+    return files["manifest.json"]
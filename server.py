@@ -0,0 +1,615 @@
+"""
+HTTP/JSON API server for sharing one movie catalogue between several users.
+
+The server exposes the same operations as the MovieApp menu (list, search,
+filter, stats, add, update, delete) on top of any IStorage backend. Requests
+are handled by a bounded number of workers. Reads are answered from a shared
+in-memory copy of the catalogue and carry an ETag, so clients can revalidate
+with If-None-Match. Writes are serialized and go straight to the storage.
+
+Endpoints:
+    GET    /movies?page=1&per_page=50&sort=rating|year&order=asc|desc
+    GET    /movies/search?q=<part of title>&page=&per_page=
+    GET    /movies/filter?min_rating=&start_year=&end_year=&page=&per_page=
+    GET    /movies/<title>
+    GET    /stats
+    POST   /movies            {"title", "year", "rating", "poster"}
+    PATCH  /movies/<title>    {"rating"}
+    DELETE /movies/<title>
+
+With --site, any other GET path is served from a built website directory
+(see site_build.py): precompressed .br/.gz files are sent to clients that
+accept them, content-hashed assets are marked immutable and everything
+else is revalidated with an ETag.
+
+Usage:
+    python server.py --storage data/movies.json --port 8000
+    python server.py --storage data/movies.json --site static/dist
+"""
+
+import argparse
+import json
+import mimetypes
+import os
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from helpers import (MAX_RATING, MAX_YEAR, MIN_RATING, MIN_YEAR, filter_movies, get_average_rating,
+                     get_best_rated_movies, get_median_rating, get_worst_rated_movies, search_movies,
+                     sort_movies_by_rating, sort_movies_by_year)
+from site_build import is_hashed_name
+from storage.storage_factory import open_storage
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 1000
+MAX_CACHED_RESPONSES = 1024
+# Idle keep-alive connections only park a thread, but don't keep them forever.
+KEEP_ALIVE_TIMEOUT = 5
+API_ROOTS = ("movies", "stats")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Preferred first; each is served only if the client accepts it and the sibling file exists.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class CatalogueCache:
+    """
+    Shared in-memory copy of the catalogue with a version counter.
+
+    Readers get an immutable snapshot (the dict is never mutated after it is
+    published), so they need no lock. Writes go through the storage under a
+    lock and then reload the snapshot. Serialized responses are cached per
+    version, so repeated identical reads are a dictionary lookup. Periodic
+    refreshes skip the reload while the storage's data_version() is unchanged.
+    """
+
+    def __init__(self, storage, refresh_interval=2.0):
+        """
+        Initialize the cache.
+
+        Args:
+            storage (IStorage): The storage backend to serve.
+            refresh_interval (float): Seconds after which the snapshot is
+                reloaded to pick up edits made outside the server.
+        """
+        self._storage = storage
+        self._refresh_interval = refresh_interval
+        self._write_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._snapshot = (0, {})
+        self._storage_version = None
+        self._loaded_at = 0.0
+        self._responses = {}
+        self._reload(force=True)
+
+    def _reload(self, force=False):
+        """
+        Reload the snapshot from storage and bump the version if it changed.
+
+        Args:
+            force (bool): Reload and bump the version unconditionally.
+
+        Returns:
+            None
+        """
+        with self._reload_lock:
+            if not force and time.monotonic() - self._loaded_at < self._refresh_interval:
+                return
+            storage_version = self._storage.data_version()
+            if not force and storage_version is not None and storage_version == self._storage_version:
+                self._loaded_at = time.monotonic()
+                return
+            movies = self._storage.list_movies()
+            self._storage_version = storage_version
+            self._loaded_at = time.monotonic()
+            version, current = self._snapshot
+            if force or movies != current:
+                self._responses = {}
+                self._snapshot = (version + 1, movies)
+
+    def snapshot(self):
+        """
+        Return the current catalogue and its version.
+
+        Returns:
+            tuple: (version, movies dict). The dict must not be modified.
+        """
+        if time.monotonic() - self._loaded_at >= self._refresh_interval:
+            self._reload()
+        return self._snapshot
+
+    def cached_response(self, version, key, build):
+        """
+        Return a serialized response body, building it once per version.
+
+        Args:
+            version (int): Catalogue version the response is built from.
+            key (hashable): Identifies the request (path and query).
+            build (callable): Returns the JSON-serializable payload.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON body.
+        """
+        responses = self._responses
+        body = responses.get((version, key))
+        if body is None:
+            body = json.dumps(build()).encode("utf-8")
+            if len(responses) >= MAX_CACHED_RESPONSES:
+                responses.clear()
+            responses[(version, key)] = body
+        return body
+
+    def write(self, operation, *args, check=None, saved=None):
+        """
+        Run a storage mutation and publish a new snapshot.
+
+        The check runs under the write lock against the latest catalogue, so
+        two requests can't both pass it before either has written.
+
+        Args:
+            operation (str): Name of the IStorage method to call.
+            *args: Arguments for that method.
+            check (callable): Called with the movies before the write.
+                Returns (status, message) to refuse the write, or None.
+            saved (callable): Called with the movies after the write.
+                Returns True if the change reached the storage. Backends
+                that print errors instead of raising them are caught here.
+
+        Returns:
+            tuple or None: (status, message) if the write was refused or
+            failed, None if it succeeded.
+        """
+        with self._write_lock:
+            try:
+                _, movies = self.snapshot()
+                error = check(movies) if check else None
+                if error:
+                    return error
+                getattr(self._storage, operation)(*args)
+            except Exception as e:
+                error = (500, f"Storage error: {e}")
+            try:
+                self._reload(force=True)
+            except Exception as e:
+                return error or (500, f"Storage error: {e}")
+            if error is None and saved and not saved(self._snapshot[1]):
+                error = (500, "Storage error: the change was not saved")
+            return error
+
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server with one thread per connection and a fixed number of workers.
+
+    Keep-alive connections get their own thread, which waits for the next
+    request without taking a worker. A request only holds one of the
+    workers while it is being handled, so idle clients can't block the
+    others.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, cache, workers=16, verbose=False, site_dir=None):
+        """
+        Initialize the server.
+
+        Args:
+            server_address (tuple): (host, port) to bind to.
+            handler_class (type): The request handler class.
+            cache (CatalogueCache): Shared catalogue cache.
+            workers (int): Number of requests handled at the same time.
+            verbose (bool): Log every request to stderr.
+            site_dir (str): Built website to serve for non-API paths, or None.
+        """
+        super().__init__(server_address, handler_class)
+        self.cache = cache
+        self.verbose = verbose
+        self.site_dir = os.path.realpath(site_dir) if site_dir else None
+        self.workers = threading.BoundedSemaphore(workers)
+
+
+def _in_worker(method):
+    """Run a request handler method while holding one of the server's workers."""
+    @wraps(method)
+    def wrapper(self):
+        with self.server.workers:
+            return method(self)
+    return wrapper
+
+
+def _movie_list(movies):
+    """
+    Convert a movies dict into a JSON-friendly list of records.
+
+    Args:
+        movies (dict): Movies in the format {title: {rating, year, poster}}.
+
+    Returns:
+        list: [{"title", "rating", "year", "poster"}, ...] in dict order.
+    """
+    return [{"title": title, **data} for title, data in movies.items()]
+
+
+def _page_params(query):
+    """
+    Read the page and per_page parameters.
+
+    Args:
+        query (dict): Parsed query string.
+
+    Returns:
+        tuple: (page, per_page), clamped to the allowed range.
+
+    Raises:
+        ValueError: If a parameter is not a number.
+    """
+    page = max(_int_param(query, "page", 1), 1)
+    per_page = min(max(_int_param(query, "per_page", DEFAULT_PER_PAGE), 1), MAX_PER_PAGE)
+    return page, per_page
+
+
+def _paginate(records, page_params):
+    """
+    Slice a list of records according to the page and per_page parameters.
+
+    Args:
+        records (list): All matching records.
+        page_params (tuple): (page, per_page) from _page_params.
+
+    Returns:
+        dict: Page metadata and the records on the requested page.
+    """
+    page, per_page = page_params
+    start = (page - 1) * per_page
+    return {
+        "total": len(records),
+        "page": page,
+        "per_page": per_page,
+        "movies": records[start:start + per_page],
+    }
+
+
+def _accepted_encodings(header):
+    """
+    Parse an Accept-Encoding header.
+
+    Args:
+        header (str): The header value, e.g. "gzip, deflate, br;q=0.9".
+
+    Returns:
+        set: Lower-cased encodings the client accepts (q > 0).
+    """
+    accepted = set()
+    for item in (header or "").split(","):
+        name, _, quality = item.partition(";")
+        quality = quality.strip().replace(" ", "")
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name.strip():
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _int_param(query, name, default):
+    values = query.get(name)
+    return int(values[0]) if values else default
+
+
+def _float_param(query, name, default):
+    values = query.get(name)
+    return float(values[0]) if values else default
+
+
+def _missing(movies, title):
+    """Write check for updates and deletes: the movie must exist."""
+    return None if title in movies else (404, f"Movie '{title}' doesn't exist!")
+
+
+class MovieRequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to catalogue reads and storage mutations."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MovieAPI/1.0"
+    timeout = KEEP_ALIVE_TIMEOUT
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload=None, body=None, etag=None):
+        if body is None:
+            body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _read_json_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _split_path(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        return parts, parse_qs(url.query)
+
+    def _send_static(self, url_path):
+        """
+        Serve a file of the built website, precompressed when possible.
+
+        Args:
+            url_path (str): The decoded request path.
+
+        Returns:
+            None
+        """
+        site_dir = self.server.site_dir
+        file_path = os.path.realpath(os.path.join(site_dir, url_path.lstrip("/")))
+        if os.path.isdir(file_path):
+            file_path = os.path.join(file_path, "index.html")
+        if not file_path.startswith(site_dir + os.sep) or not os.path.isfile(file_path):
+            self._send_error(404, "Not found")
+            return
+
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding"))
+        body_path, encoding = file_path, None
+        for name, extension in PRECOMPRESSED_ENCODINGS:
+            if name in accepted and os.path.isfile(file_path + extension):
+                body_path, encoding = file_path + extension, name
+                break
+
+        # Each encoding is a different representation, so it gets its own ETag.
+        stat = os.stat(file_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send_not_modified(etag)
+            return
+        with open(body_path, "rb") as body_file:
+            body = body_file.read()
+
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(file_path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("ETag", etag)
+        if is_hashed_name(file_path):
+            self.send_header("Cache-Control", IMMUTABLE_CACHE_CONTROL)
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    @_in_worker
+    def do_GET(self):
+        parts, query = self._split_path()
+        if self.server.site_dir and (not parts or parts[0] not in API_ROOTS):
+            self._send_static(unquote(urlsplit(self.path).path))
+            return
+        cache = self.server.cache
+        version, movies = cache.snapshot()
+
+        # Route and validate first, so only a valid request can get a 304.
+        try:
+            if parts == ["movies"]:
+                page, order = _page_params(query), self._sort_params(query)
+                build = lambda: _paginate(_movie_list(self._sorted(movies, *order)), page)
+            elif parts == ["movies", "search"]:
+                term = query.get("q", [""])[0]
+                page = _page_params(query)
+                build = lambda: _paginate(_movie_list(search_movies(movies, term)), page)
+            elif parts == ["movies", "filter"]:
+                min_rating = _float_param(query, "min_rating", MIN_RATING)
+                start_year = _int_param(query, "start_year", MIN_YEAR)
+                end_year = _int_param(query, "end_year", MAX_YEAR)
+                page = _page_params(query)
+                build = lambda: _paginate(
+                    _movie_list(filter_movies(movies, min_rating, start_year, end_year)), page)
+            elif parts == ["stats"]:
+                build = lambda: self._stats(movies)
+            elif len(parts) == 2 and parts[0] == "movies":
+                if parts[1] not in movies:
+                    self._send_error(404, f"Movie '{parts[1]}' doesn't exist!")
+                    return
+                build = lambda: {"title": parts[1], **movies[parts[1]]}
+            else:
+                self._send_error(404, "Not found")
+                return
+        except ValueError as e:
+            self._send_error(400, f"Invalid parameter: {e}")
+            return
+
+        etag = f'"v{version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send_not_modified(etag)
+            return
+        body = cache.cached_response(version, self.path, build)
+        self._send_json(200, body=body, etag=etag)
+
+    @staticmethod
+    def _sort_params(query):
+        sort_key = query.get("sort", [None])[0]
+        if sort_key not in (None, "rating", "year"):
+            raise ValueError(f"unknown sort key '{sort_key}'")
+        return sort_key, query.get("order", ["desc"])[0] == "desc"
+
+    @staticmethod
+    def _sorted(movies, sort_key, descending):
+        if sort_key == "rating":
+            return sort_movies_by_rating(movies, descending)
+        if sort_key == "year":
+            return sort_movies_by_year(movies, descending)
+        return movies
+
+    @staticmethod
+    def _stats(movies):
+        if not movies:
+            return {"count": 0}
+        return {
+            "count": len(movies),
+            "average": get_average_rating(movies),
+            "median": get_median_rating(movies),
+            "best": get_best_rated_movies(movies),
+            "worst": get_worst_rated_movies(movies),
+        }
+
+    @_in_worker
+    def do_POST(self):
+        parts, _ = self._split_path()
+        if parts != ["movies"]:
+            self._send_error(404, "Not found")
+            return
+        try:
+            data = self._read_json_body()
+            title = str(data["title"]).strip()
+            year = int(data["year"])
+            rating = round(float(data.get("rating", 0.0)), 1)
+            poster = str(data.get("poster", ""))
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_error(400, f"Invalid movie: {e}")
+            return
+        if not title or not MIN_YEAR <= year <= MAX_YEAR or not MIN_RATING <= rating <= MAX_RATING:
+            self._send_error(400, "Invalid movie: title, year or rating out of range")
+            return
+        def check(movies):
+            if title in movies and movies[title].get("year") == year:
+                return 409, f"Movie '{title}' already exists!"
+            return None
+
+        error = self.server.cache.write(
+            "add_movie", title, year, rating, poster, check=check,
+            saved=lambda movies: movies.get(title, {}).get("year") == year)
+        if error:
+            self._send_error(*error)
+            return
+        self._send_json(201, {"title": title, "rating": rating, "year": year, "poster": poster})
+
+    @_in_worker
+    def do_PATCH(self):
+        parts, _ = self._split_path()
+        if len(parts) != 2 or parts[0] != "movies":
+            self._send_error(404, "Not found")
+            return
+        try:
+            rating = round(float(self._read_json_body()["rating"]), 1)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_error(400, f"Invalid rating: {e}")
+            return
+        if not MIN_RATING <= rating <= MAX_RATING:
+            self._send_error(400, f"Rating {rating} is invalid.")
+            return
+        error = self.server.cache.write(
+            "update_movie", parts[1], rating, check=lambda movies: _missing(movies, parts[1]),
+            saved=lambda movies: movies.get(parts[1], {}).get("rating") == rating)
+        if error:
+            self._send_error(*error)
+            return
+        self._send_json(200, {"title": parts[1], "rating": rating})
+
+    @_in_worker
+    def do_DELETE(self):
+        parts, _ = self._split_path()
+        if len(parts) != 2 or parts[0] != "movies":
+            self._send_error(404, "Not found")
+            return
+        error = self.server.cache.write(
+            "delete_movie", parts[1], check=lambda movies: _missing(movies, parts[1]),
+            saved=lambda movies: parts[1] not in movies)
+        if error:
+            self._send_error(*error)
+            return
+        self._send_json(200, {"deleted": parts[1]})
+
+
+def create_server(storage, host="127.0.0.1", port=8000, workers=16, refresh_interval=2.0, verbose=False,
+                  site_dir=None):
+    """
+    Create a movie API server for the given storage.
+
+    Pass port=0 to bind a free port; the chosen port is server.server_address[1].
+
+    Args:
+        storage (IStorage): The storage backend to serve.
+        host (str): Interface to bind to.
+        port (int): Port to bind to.
+        workers (int): Number of requests handled at the same time.
+        refresh_interval (float): Seconds between checks for external edits.
+        verbose (bool): Log every request to stderr.
+        site_dir (str): Built website (see site_build.py) to serve for
+            non-API paths, or None for the API only.
+
+    Returns:
+        PooledHTTPServer: The server, not yet serving.
+    """
+    cache = CatalogueCache(storage, refresh_interval)
+    return PooledHTTPServer((host, port), MovieRequestHandler, cache, workers, verbose, site_dir)
+
+
+def serve_in_background(server):
+    """
+    Start serving on a daemon thread, e.g. for tests with a local client.
+
+    Args:
+        server (PooledHTTPServer): Server returned by create_server.
+
+    Returns:
+        threading.Thread: The thread running serve_forever. Stop it with
+        server.shutdown() followed by server.server_close().
+    """
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a movie catalogue over HTTP/JSON.")
+    parser.add_argument("--storage", help="Path to a .json or .csv data file, or sharded:<dir> / versioned:<dir> "
+                                          "(default: $MOVIE_APP_STORAGE or data/movies.json)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--site", help="Also serve a built website directory, e.g. static/dist")
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, watch=True)
+    server = create_server(storage, args.host, args.port, args.workers, verbose=args.verbose,
+                           site_dir=args.site)
+    print(f"[INFO] Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nBye Bye!")
+    finally:
+        server.server_close()
+        try:
+            storage.flush()
+        except (OSError, TypeError) as e:
+            print(f"Error while saving the file: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Production build of the generated static website.
+
+Takes the output of the "Generate website" command (static/index.html, its
+stylesheet, script and search index) and writes a deployable copy:
+
+    - HTML and CSS are minified.
+    - style.css and search.js are renamed to content-hashed names such as
+      style.3f2a9c1e.css, and the references in index.html are rewritten,
+      so they can be cached forever ("immutable") by browsers and CDNs.
+    - Every text file gets precompressed .gz and, when the optional
+      'brotli' package is installed, .br siblings that a server can send
+      as-is to clients that accept them.
+    - asset-manifest.json maps original names to hashed names.
+
+index.html and the search index keep stable names and should be served
+with revalidation (no-cache + ETag), see server.py --site.
+
+Usage:
+    python site_build.py                     # static -> static/dist
+    python site_build.py --source static --output build
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+HASHED_ASSETS = ("style.css", "search.js")
+INDEX_DIR = "search"
+MANIFEST_FILE = "asset-manifest.json"
+HASH_LENGTH = 8
+MIN_COMPRESS_SIZE = 256
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt")
+HASHED_NAME_PATTERN = re.compile(r"\.[0-9a-f]{%d}\.[A-Za-z0-9]+$" % HASH_LENGTH)
+
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.S)
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*|\s*(:)\s*(?=[^{}]*[;}])")
+_HTML_RAW_BLOCKS = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.S | re.I)
+_HTML_COMMENTS = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_HTML_ATTRIBUTE_REFERENCE = re.compile(r'((?:href|src)\s*=\s*["\'])([^"\'?#]+)([^"\']*["\'])', re.I)
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def minify_css(css):
+    """
+    Remove comments and insignificant whitespace from a stylesheet.
+
+    String literals are left untouched.
+
+    Args:
+        css (str): The stylesheet.
+
+    Returns:
+        str: The minified stylesheet.
+    """
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return "" if match.group(0).startswith("/*") else " "
+
+    parts = []
+    # Punctuation is only tightened outside string literals.
+    for index, chunk in enumerate(re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')',
+                                           _CSS_TOKENS.sub(replace, css))):
+        if index % 2:
+            parts.append(chunk)
+        else:
+            parts.append(_CSS_PUNCTUATION.sub(lambda m: m.group(1) or m.group(2), chunk).replace(";}", "}"))
+    return "".join(parts).strip()
+
+
+def minify_html(html):
+    """
+    Remove comments and collapse whitespace in an HTML page.
+
+    Whitespace between tags on separate lines is dropped, other runs become
+    a single space. <pre>, <textarea>, <script> and <style> contents are
+    kept as they are, except that inline styles are minified.
+
+    Args:
+        html (str): The page.
+
+    Returns:
+        str: The minified page.
+    """
+    parts = []
+    for index, chunk in enumerate(_HTML_RAW_BLOCKS.split(html)):
+        if index % 3 == 1:
+            parts.append(_minify_inline_style(chunk))
+        elif index % 3 == 0:
+            chunk = _HTML_COMMENTS.sub("", chunk)
+            # Raw blocks start with "<" and end with ">", so chunk edges count as tag boundaries.
+            chunk = re.sub(r"(^|>)\s*\n\s*(<|$)", r"\1\2", chunk)
+            parts.append(re.sub(r"\s+", " ", chunk))
+    return "".join(parts).strip()
+
+
+def _minify_inline_style(block):
+    match = re.match(r"(<style\b[^>]*>)(.*)(</style\s*>)$", block, re.S | re.I)
+    if not match:
+        return block
+    return match.group(1) + minify_css(match.group(2)) + match.group(3)
+
+
+def content_hash(data):
+    """
+    Compute the short content hash used in fingerprinted file names.
+
+    Args:
+        data (bytes): File content.
+
+    Returns:
+        str: HASH_LENGTH hex digits.
+    """
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(file_name, data):
+    """
+    Insert the content hash before the extension, e.g. style.css -> style.3f2a9c1e.css.
+
+    Args:
+        file_name (str): The original file name.
+        data (bytes): File content.
+
+    Returns:
+        str: The fingerprinted file name.
+    """
+    stem, extension = os.path.splitext(file_name)
+    return f"{stem}.{content_hash(data)}{extension}"
+
+
+def is_hashed_name(file_name):
+    """
+    Check whether a file name carries a content hash (and can be cached forever).
+
+    Args:
+        file_name (str): The file name or URL path.
+
+    Returns:
+        bool: True for names like style.3f2a9c1e.css.
+    """
+    return HASHED_NAME_PATTERN.search(file_name) is not None
+
+
+def precompress(file_path, data):
+    """
+    Write .gz and (if brotli is installed) .br siblings of a file.
+
+    Nothing is written for small files or when compression does not help.
+
+    Args:
+        file_path (str): Path of the uncompressed file.
+        data (bytes): Its content.
+
+    Returns:
+        list: Paths of the compressed files written.
+    """
+    if len(data) < MIN_COMPRESS_SIZE or not file_path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return []
+    variants = [(".gz", gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))]
+    brotli = _brotli()
+    if brotli is not None:
+        variants.append((".br", brotli.compress(data, quality=BROTLI_QUALITY)))
+
+    written = []
+    for extension, compressed in variants:
+        if len(compressed) < len(data):
+            with open(file_path + extension, "wb") as compressed_file:
+                compressed_file.write(compressed)
+            written.append(file_path + extension)
+    return written
+
+
+def _read(file_path):
+    with open(file_path, "rb") as source_file:
+        return source_file.read()
+
+
+def _write(file_path, data):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as output_file:
+        output_file.write(data)
+
+
+def build_site(source_dir="static", output_dir=None):
+    """
+    Build the production copy of the website.
+
+    Args:
+        source_dir (str): Directory with index.html, its assets and the search index.
+        output_dir (str): Target directory, replaced completely. Defaults to
+            <source_dir>/dist.
+
+    Returns:
+        dict: Build statistics {"files", "bytes", "gzip_bytes", "brotli_bytes", "assets"}.
+
+    Raises:
+        FileNotFoundError: If index.html was not generated yet.
+    """
+    output_dir = output_dir or os.path.join(source_dir, "dist")
+    html = _read(os.path.join(source_dir, "index.html")).decode("utf-8")
+
+    outputs = {}
+    assets = {}
+    for asset in HASHED_ASSETS:
+        asset_path = os.path.join(source_dir, asset)
+        if not os.path.exists(asset_path):
+            continue
+        data = _read(asset_path)
+        if asset.endswith(".css"):
+            data = minify_css(data.decode("utf-8")).encode("utf-8")
+        assets[asset] = hashed_name(asset, data)
+        outputs[assets[asset]] = data
+
+    def rewrite(match):
+        target = assets.get(match.group(2).lstrip("./"))
+        return match.group(1) + target + match.group(3) if target else match.group(0)
+
+    outputs["index.html"] = minify_html(_HTML_ATTRIBUTE_REFERENCE.sub(rewrite, html)).encode("utf-8")
+    index_dir = os.path.join(source_dir, INDEX_DIR)
+    if os.path.isdir(index_dir):
+        for file_name in sorted(os.listdir(index_dir)):
+            if file_name.endswith(".json"):
+                outputs[f"{INDEX_DIR}/{file_name}"] = _read(os.path.join(index_dir, file_name))
+    outputs[MANIFEST_FILE] = json.dumps(assets, indent=2).encode("utf-8")
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    stats = {"files": len(outputs), "bytes": 0, "gzip_bytes": 0, "brotli_bytes": 0, "assets": assets}
+    for relative_path, data in outputs.items():
+        file_path = os.path.join(output_dir, *relative_path.split("/"))
+        _write(file_path, data)
+        compressed = {os.path.splitext(path)[1]: os.path.getsize(path) for path in precompress(file_path, data)}
+        stats["bytes"] += len(data)
+        stats["gzip_bytes"] += compressed.get(".gz", len(data))
+        stats["brotli_bytes"] += compressed.get(".br", compressed.get(".gz", len(data)))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify, fingerprint and precompress the generated website.")
+    parser.add_argument("--source", default="static", help="Directory containing the generated index.html")
+    parser.add_argument("--output", help="Build directory (default: <source>/dist)")
+    args = parser.parse_args()
+
+    try:
+        stats = build_site(args.source, args.output)
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Generate the website first.")
+        return
+    print(f"Built {stats['files']} files: {stats['bytes']} bytes, {stats['gzip_bytes']} gzipped"
+          + (f", {stats['brotli_bytes']} brotli" if _brotli() else " (install 'brotli' for .br files)"))
+
+
+if __name__ == "__main__":
+    main()
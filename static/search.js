@@ -0,0 +1,226 @@
+// Instant search and filtering over the JSON index written by search_index.py.
+// Index files are fetched lazily: the manifest on first use, then only the
+// n-gram shards a query needs and the doc chunks holding the visible results.
+(function () {
+  "use strict";
+
+  var INDEX_DIR = "search/";
+  var PAGE_SIZE = 60;
+
+  var form = document.getElementById("movie-search");
+  var grid = document.querySelector(".movie-grid");
+  var status = document.getElementById("movie-search-status");
+  if (!form || !grid) {
+    return;
+  }
+
+  var cache = {};
+  var manifest = null;
+  var originalGrid = grid.innerHTML;
+  var originalStatus = status ? status.textContent : "";
+  var results = [];
+  var shown = 0;
+  var generation = 0;
+
+  function load(name) {
+    if (!cache[name]) {
+      var url = INDEX_DIR + name + (manifest ? "?v=" + manifest.version : "");
+      cache[name] = fetch(url).then(function (response) {
+        if (!response.ok) {
+          throw new Error(name + ": HTTP " + response.status);
+        }
+        return response.json();
+      });
+    }
+    return cache[name];
+  }
+
+  function loadManifest() {
+    return manifest ? Promise.resolve(manifest) : load("manifest.json").then(function (data) {
+      manifest = data;
+      return data;
+    });
+  }
+
+  // Must match search_index.normalize_title.
+  function normalize(text) {
+    return text.toLowerCase().split(/\s+/).filter(Boolean).join(" ");
+  }
+
+  function ngrams(text, size) {
+    var grams = {};
+    var chars = Array.from(text);
+    for (var i = 0; i + size <= chars.length; i++) {
+      grams[chars.slice(i, i + size).join("")] = true;
+    }
+    return Object.keys(grams);
+  }
+
+  function decode(deltas) {
+    var ids = new Array(deltas.length);
+    var value = 0;
+    for (var i = 0; i < deltas.length; i++) {
+      value += deltas[i];
+      ids[i] = value;
+    }
+    return ids;
+  }
+
+  function intersect(a, b) {
+    var out = [];
+    for (var i = 0, j = 0; i < a.length && j < b.length;) {
+      if (a[i] === b[j]) { out.push(a[i]); i++; j++; }
+      else if (a[i] < b[j]) { i++; }
+      else { j++; }
+    }
+    return out;
+  }
+
+  // First position in a sorted array whose value is >= target (or > target if after).
+  function bound(values, target, after) {
+    var low = 0;
+    var high = values.length;
+    while (low < high) {
+      var mid = (low + high) >> 1;
+      if (values[mid] < target || (after && values[mid] === target)) { low = mid + 1; }
+      else { high = mid; }
+    }
+    return low;
+  }
+
+  function rangeIds(name, low, high) {
+    return load(name).then(function (sorted) {
+      var start = low === null ? 0 : bound(sorted.values, low, false);
+      var end = high === null ? sorted.values.length : bound(sorted.values, high, true);
+      return sorted.ids.slice(start, end).sort(function (a, b) { return a - b; });
+    });
+  }
+
+  function doc(id) {
+    var chunk = Math.floor(id / manifest.doc_chunk_size);
+    return load("docs-" + chunk + ".json").then(function (docs) {
+      return docs[id - chunk * manifest.doc_chunk_size];
+    });
+  }
+
+  function titleIds(query) {
+    var grams = ngrams(query, manifest.ngram_size);
+    if (!grams.length) {
+      return null; // too short for the n-gram index, checked against titles instead
+    }
+    return Promise.all(grams.map(function (gram) {
+      var shard = gram.codePointAt(0) % manifest.ngram_shards;
+      return load("ngrams-" + shard + ".json").then(function (postings) {
+        return postings[gram] ? decode(postings[gram]) : [];
+      });
+    })).then(function (lists) {
+      lists.sort(function (a, b) { return a.length - b.length; });
+      return lists.reduce(intersect);
+    });
+  }
+
+  function number(name) {
+    var value = form.elements[name].value.trim();
+    return value === "" ? null : Number(value);
+  }
+
+  function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, function (c) {
+      return {"&": "&amp;", "<": "&lt;", ">": "&gt;", "\"": "&quot;", "'": "&#39;"}[c];
+    });
+  }
+
+  function render(row) {
+    var title = escapeHtml(row[0]);
+    return "<li><div class=\"movie\">" +
+      "<img class=\"movie-poster\" src=\"" + escapeHtml(row[3] || "") + "\" alt=\"" + title + " poster\" loading=\"lazy\"/>" +
+      "<div class=\"movie-title\">" + title + "</div>" +
+      "<div class=\"movie-year\">" + escapeHtml(row[1]) + "</div>" +
+      "<div class=\"movie-rating\">Rating: " + escapeHtml(row[2]) + "</div>" +
+      "</div></li>";
+  }
+
+  function showMore(run) {
+    var page = results.slice(shown, shown + PAGE_SIZE);
+    return Promise.all(page.map(doc)).then(function (rows) {
+      if (run !== generation) {
+        return;
+      }
+      rows = rows.filter(function (row) { return row; });
+      grid.insertAdjacentHTML("beforeend", rows.map(render).join(""));
+      shown += page.length;
+      if (status) {
+        status.textContent = results.length + " movies found" +
+          (shown < results.length ? ", showing " + shown : "");
+      }
+      var more = document.getElementById("movie-search-more");
+      if (more) {
+        more.hidden = shown >= results.length;
+      }
+    });
+  }
+
+  function search() {
+    var run = ++generation;
+    var query = normalize(form.elements.q.value);
+    var minRating = number("min_rating");
+    var fromYear = number("from_year");
+    var toYear = number("to_year");
+
+    if (!query && minRating === null && fromYear === null && toYear === null) {
+      grid.innerHTML = originalGrid;
+      if (status) { status.textContent = originalStatus; }
+      var more = document.getElementById("movie-search-more");
+      if (more) { more.hidden = true; }
+      return;
+    }
+
+    loadManifest().then(function () {
+      var filters = [];
+      var byTitle = query ? titleIds(query) : null;
+      if (byTitle) { filters.push(byTitle); }
+      if (minRating !== null) { filters.push(rangeIds("by_rating.json", minRating, null)); }
+      if (fromYear !== null || toYear !== null) { filters.push(rangeIds("by_year.json", fromYear, toYear)); }
+      if (!filters.length) {
+        // Only a 1-2 character query: scan every title chunk.
+        var all = [];
+        for (var i = 0; i < manifest.count; i++) { all.push(i); }
+        filters.push(Promise.resolve(all));
+      }
+      return Promise.all(filters);
+    }).then(function (lists) {
+      var ids = lists.reduce(intersect);
+      if (query && Array.from(query).length !== manifest.ngram_size && ids.length) {
+        // N-gram hits are only candidates; confirm the full substring on the titles.
+        return Promise.all(ids.map(doc)).then(function (rows) {
+          return ids.filter(function (id, i) { return normalize(rows[i][0]).indexOf(query) !== -1; });
+        });
+      }
+      return ids;
+    }).then(function (ids) {
+      if (run !== generation) {
+        return;
+      }
+      results = ids;
+      shown = 0;
+      grid.innerHTML = "";
+      return showMore(run);
+    }).catch(function (error) {
+      if (status) { status.textContent = "Search unavailable: " + error.message; }
+    });
+  }
+
+  var timer = null;
+  form.addEventListener("input", function () {
+    clearTimeout(timer);
+    timer = setTimeout(search, 120);
+  });
+  form.addEventListener("submit", function (event) {
+    event.preventDefault();
+    search();
+  });
+  var moreButton = document.getElementById("movie-search-more");
+  if (moreButton) {
+    moreButton.addEventListener("click", function () { showMore(generation); });
+  }
+})();
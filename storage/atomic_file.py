@@ -0,0 +1,73 @@
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+
+def _read_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import: os.umask() can only be read by setting it, which is
+# not safe once other threads may be creating files.
+_UMASK = _read_umask()
+
+
+def _target_mode(file_path):
+    """
+    Return the permission bits the replaced file should keep.
+
+    Args:
+        file_path (str): The file about to be replaced.
+
+    Returns:
+        int: The mode of the existing file, or 0o666 minus the umask
+            (what open() would give a new file).
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_write(file_path, mode="w", newline=None, encoding=None):
+    """
+    Write a file so that readers see either the old or the new content, never a mix.
+
+    The content goes to a temporary file in the same directory, which is
+    flushed to disk and then renamed over the target with os.replace.
+    The temporary file gets the permissions of the file it replaces
+    (mkstemp creates it owner-only). If the block raises, the target is
+    left untouched.
+
+    Args:
+        file_path (str): The file to replace.
+        mode (str): "w" for text or "wb" for bytes.
+        newline (str): Passed to open() in text mode (e.g. "" for csv).
+        encoding (str): Passed to open() in text mode.
+
+    Yields:
+        file: The temporary file to write to.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        if "b" in mode:
+            file = os.fdopen(descriptor, mode)
+        else:
+            file = os.fdopen(descriptor, mode, newline=newline, encoding=encoding)
+        with file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, _target_mode(file_path))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
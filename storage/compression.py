@@ -0,0 +1,118 @@
+"""
+Transparent compression for storage data files, selected by file extension.
+
+    movies.json       plain text
+    movies.json.gz    gzip (standard library)
+    movies.csv.zst    zstandard (requires the optional 'zstandard' package)
+
+Compressed files are decoded as a stream, so the compressed bytes are never
+held in memory as a whole.
+"""
+
+import gzip
+import io
+import os
+from contextlib import contextmanager
+
+from storage.atomic_file import atomic_write
+
+GZIP = ".gz"
+ZSTD = ".zst"
+COMPRESSION_EXTENSIONS = (GZIP, ZSTD)
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def split_compression(file_path):
+    """
+    Split the compression suffix off a data file path.
+
+    Args:
+        file_path (str): e.g. "data/movies.json.gz".
+
+    Returns:
+        tuple: (path without the compression suffix, suffix or None),
+        e.g. ("data/movies.json", ".gz").
+    """
+    base, extension = os.path.splitext(file_path)
+    if extension.lower() in COMPRESSION_EXTENSIONS:
+        return base, extension.lower()
+    return file_path, None
+
+
+def is_compressed(file_path):
+    """
+    Check whether a data file path selects compression.
+
+    Args:
+        file_path (str): Path to the data file.
+
+    Returns:
+        bool: True for .gz and .zst files.
+    """
+    return split_compression(file_path)[1] is not None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading or writing .zst files requires the 'zstandard' package "
+                          "(pip install zstandard).") from None
+    return zstandard
+
+
+@contextmanager
+def open_text_reader(file_path, newline=None):
+    """
+    Open a possibly compressed data file for reading text.
+
+    Args:
+        file_path (str): Path to the data file.
+        newline (str): Passed to the text layer (e.g. "" for csv).
+
+    Yields:
+        file: A text stream that decompresses on the fly.
+    """
+    compression = split_compression(file_path)[1]
+    if compression is None:
+        with open(file_path, "r", newline=newline) as file:
+            yield file
+    elif compression == GZIP:
+        with gzip.open(file_path, "rt", newline=newline, encoding="utf-8") as file:
+            yield file
+    else:
+        decompressor = _zstandard().ZstdDecompressor()
+        with open(file_path, "rb") as raw, decompressor.stream_reader(raw) as stream:
+            with io.TextIOWrapper(stream, encoding="utf-8", newline=newline) as file:
+                yield file
+
+
+@contextmanager
+def atomic_text_writer(file_path, newline=None):
+    """
+    Atomically replace a possibly compressed data file with new text content.
+
+    Args:
+        file_path (str): Path to the data file.
+        newline (str): Passed to the text layer (e.g. "" for csv).
+
+    Yields:
+        file: A text stream that compresses on the fly.
+    """
+    compression = split_compression(file_path)[1]
+    if compression is None:
+        with atomic_write(file_path, newline=newline) as file:
+            yield file
+        return
+
+    with atomic_write(file_path, "wb") as raw:
+        if compression == GZIP:
+            # mtime=0 keeps the output deterministic for identical content
+            stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL, mtime=0)
+        else:
+            stream = _zstandard().ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False)
+        # Closing the text layer finishes the compressed stream but leaves raw open.
+        with io.TextIOWrapper(stream, encoding="utf-8", newline=newline) as file:
+            yield file
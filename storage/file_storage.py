@@ -0,0 +1,151 @@
+import os
+
+from instrumentation import instrumented
+from storage.istorage import IStorage
+from storage.random_index import RandomIndex, pick_random_title
+
+
+class FileStorage(IStorage):
+    """
+    Shared base of the single-file backends (StorageJson, StorageCsv).
+
+    Keeps the change detection, the error handling of writes and the random
+    index that both backends maintain the same way. Subclasses implement
+    _load_data() and _write_data() for their file format.
+    """
+
+    def __init__(self, file_path):
+        """
+        Initialize the state shared by the file backends.
+
+        Args:
+            file_path (str): Path to the data file.
+        """
+        self.file_path = file_path
+        self._random_movies = None
+        self._random_index = None
+        self._random_signature = None
+        self._mutations = 0
+
+    def _file_signature(self):
+        """
+        Return a cheap fingerprint of the storage file used to detect changes.
+
+        Returns:
+            tuple or None: (mtime_ns, size) of the file, or None if it is missing.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def data_version(self):
+        """
+        Return a token that changes whenever the stored movies change.
+
+        Combines a counter bumped by every save with the file signature, so
+        external edits are noticed as well.
+
+        Returns:
+            tuple: (saves by this instance, file signature)
+        """
+        return self._mutations, self._file_signature()
+
+    def _save_data(self, movies):
+        """
+        Save the movies, printing errors instead of raising them.
+
+        Args:
+            movies (dict): The movies to save.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        try:
+            self._write_data(movies)
+        except TypeError as e:
+            print("Error while converting the movies:", e)
+        except OSError as e:
+            print(f"Error while saving the file: {e}")
+        else:
+            return True
+        return False
+
+    def _save_and_index(self, movies, was_current, added=None, removed=None):
+        """
+        Save the movies and keep the random index in step with the file.
+
+        Args:
+            movies (dict): The movies to save.
+            was_current (bool): Whether the index matched the file before the write.
+            added (str): Title that was added, if any.
+            removed (str): Title that was removed, if any.
+
+        Returns:
+            bool: True if the file was written. Otherwise the index is dropped,
+            because it may no longer match the file.
+        """
+        if not self._save_data(movies):
+            self._random_index = None
+            return False
+        self._update_random_index(movies, was_current, added, removed)
+        return True
+
+    def _random_index_is_current(self):
+        """
+        Check whether the cached random index still matches the file on disk.
+
+        Returns:
+            bool: True if the index can be used without reloading.
+        """
+        return self._random_index is not None and self._random_signature == self._file_signature()
+
+    def _update_random_index(self, movies, was_current, added=None, removed=None):
+        """
+        Keep the random index in step with a write instead of rebuilding it.
+
+        Args:
+            movies (dict): The movies that were just written.
+            was_current (bool): Whether the index matched the file before the write.
+            added (str): Title that was added, if any.
+            removed (str): Title that was removed, if any.
+
+        Returns:
+            None
+        """
+        if not was_current:
+            self._random_index = None
+            return
+        if added is not None:
+            self._random_index.add(added)
+        if removed is not None:
+            self._random_index.remove(removed)
+        self._random_index.invalidate_weights()
+        self._random_movies = movies
+        self._random_signature = self._file_signature()
+
+    @instrumented("storage.file.random_movie")
+    def random_movie(self, weighted_by=None, start_year=None, end_year=None):
+        """
+        Select a random movie without reloading the file when it is unchanged.
+
+        The title index is built on first use and kept up to date by
+        add_movie, delete_movie and update_movie. It is only rebuilt when the
+        file was changed by someone else.
+
+        Args:
+            weighted_by (str): Movie field to weight by (e.g. "rating"), or None
+                for a uniform pick.
+            start_year (int): Only consider movies released in or after this year.
+            end_year (int): Only consider movies released in or before this year.
+
+        Returns:
+            tuple or None: Movie title and its details, or None if no movie matches.
+        """
+        if not self._random_index_is_current():
+            self._random_signature = self._file_signature()
+            self._random_movies = self._load_data()
+            self._random_index = RandomIndex(self._random_movies)
+        title = pick_random_title(self._random_index, self._random_movies, weighted_by, start_year, end_year)
+        return (title, dict(self._random_movies[title])) if title is not None else None
@@ -0,0 +1,219 @@
+"""
+Cheap "has this file changed?" checks for long-running processes.
+
+On Linux the file's directory is watched with inotify (through ctypes, no
+extra dependency). The directory is watched rather than the file, because
+atomic writes (temp file + rename, see storage/atomic_file.py) replace the
+file's inode. Checking drains a non-blocking descriptor, which costs one
+system call and no background thread. Only finished writes count
+(close-after-write, rename, create, delete), so a reader never reloads a
+file that is still being written.
+
+Elsewhere, or on file systems without inotify support (NFS, some
+container mounts), a polling watcher compares os.stat() results. It only
+reports a change once the file has looked the same for two checks in a
+row, so a file that is still being written is not picked up.
+
+MOVIE_APP_WATCH selects the method: "auto" (default), "inotify" or "poll"
+("off" disables watching in storage_factory.open_storage).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+import weakref
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+DEFAULT_POLL_INTERVAL = 1.0
+
+_libc = None
+
+
+def file_signature(file_path):
+    """
+    Return a fingerprint that changes when a file is rewritten or replaced.
+
+    Args:
+        file_path (str): The file.
+
+    Returns:
+        tuple or None: (inode, mtime_ns, size), or None if the file is missing.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _load_libc():
+    """
+    Load the C library and check that it provides inotify.
+
+    Returns:
+        ctypes.CDLL: The C library.
+
+    Raises:
+        OSError: If inotify is not available on this platform.
+    """
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        _libc = libc
+    return _libc
+
+
+class InotifyWatcher:
+    """Reports changes to one file through inotify on its directory."""
+
+    method = "inotify"
+
+    def __init__(self, file_path):
+        """
+        Start watching a file.
+
+        Args:
+            file_path (str): The file to watch. Its directory must exist.
+
+        Raises:
+            OSError: If inotify is unavailable or the watch cannot be added.
+        """
+        libc = _load_libc()
+        self.file_path = file_path
+        self._name = os.fsencode(os.path.basename(file_path))
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(file_path))
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(error, f"Cannot watch {directory}")
+        self._fd = fd
+        self._closer = weakref.finalize(self, os.close, fd)
+
+    def changed(self):
+        """
+        Drain pending events and report whether any concerned the file.
+
+        Returns:
+            bool: True if the file may have changed since the last call.
+        """
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                if mask & (IN_Q_OVERFLOW | IN_IGNORED) or name == self._name:
+                    changed = True
+
+    def close(self):
+        """Stop watching."""
+        self._closer()
+
+
+class PollingWatcher:
+    """Reports changes to one file by comparing os.stat() results."""
+
+    method = "poll"
+
+    def __init__(self, file_path, interval=DEFAULT_POLL_INTERVAL):
+        """
+        Start watching a file.
+
+        Args:
+            file_path (str): The file to watch.
+            interval (float): Minimum seconds between two stat calls.
+        """
+        self.file_path = file_path
+        self.interval = interval
+        self._reported = file_signature(file_path)
+        self._last_seen = self._reported
+        self._checked_at = time.monotonic()
+
+    def changed(self):
+        """
+        Report whether the file changed and then stayed unchanged for one check.
+
+        Returns:
+            bool: True if the file changed since the last reported change.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return False
+        self._checked_at = now
+        signature = file_signature(self.file_path)
+        stable = signature == self._last_seen
+        self._last_seen = signature
+        if stable and signature != self._reported:
+            self._reported = signature
+            return True
+        return False
+
+    def close(self):
+        """Stop watching (nothing to release)."""
+
+
+def watch_file(file_path, method=None, interval=DEFAULT_POLL_INTERVAL):
+    """
+    Create the best available watcher for a file.
+
+    Args:
+        file_path (str): The file to watch.
+        method (str): "auto", "inotify" or "poll". Defaults to the
+            MOVIE_APP_WATCH environment variable, then "auto".
+        interval (float): Seconds between checks of the polling watcher.
+
+    Returns:
+        InotifyWatcher or PollingWatcher: The watcher.
+
+    Raises:
+        OSError: If method is "inotify" and inotify cannot be used.
+        ValueError: If method is unknown.
+    """
+    method = (method or os.getenv("MOVIE_APP_WATCH") or "auto").lower()
+    if method not in ("auto", "inotify", "poll"):
+        raise ValueError(f"Unknown watch method '{method}'. Use auto, inotify or poll")
+    if method != "poll":
+        try:
+            return InotifyWatcher(file_path)
+        except OSError:
+            if method == "inotify":
+                raise
+    return PollingWatcher(file_path, interval)
+
+
+if __name__ == "__main__":
+    # test functions
+    for watch_method in ("auto", "poll"):
+        watcher = watch_file("test_watch.json", watch_method, interval=0.1)
+        print(watcher.method, watcher.changed())
+        with open("test_watch.json", "w") as file:
+            file.write("{}")
+        deadline = time.monotonic() + 1
+        while not watcher.changed() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        print("changed after", round(1 - (deadline - time.monotonic()), 2), "s;", watcher.changed())
+        watcher.close()
@@ -0,0 +1,289 @@
+"""
+Streaming readers and writers for catalogue files.
+
+Every format is read and written one movie at a time (or in bounded
+batches for the columnar formats), so converting a catalogue never needs
+the whole dataset in memory. The format is selected by file extension:
+
+    .json              {title: {rating, year, poster}} (the StorageJson format)
+    .csv               title,rating,year,poster (the StorageCsv format)
+    .ndjson / .jsonl   one {"title", "rating", "year", "poster"} object per line
+    .parquet           Apache Parquet (requires the optional 'pyarrow' package)
+    .arrow             Arrow IPC file (requires the optional 'pyarrow' package)
+
+The text formats may carry a .gz or .zst suffix for compression.
+"""
+
+import csv
+import json
+import os
+
+from storage.compression import atomic_text_writer, open_text_reader, split_compression
+from storage.movie import CSV_HEADER
+
+DEFAULT_BATCH_SIZE = 10000
+READ_CHUNK_SIZE = 1 << 16
+
+FORMAT_JSON = "json"
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+
+FORMATS = {
+    ".json": FORMAT_JSON,
+    ".csv": FORMAT_CSV,
+    ".ndjson": FORMAT_NDJSON,
+    ".jsonl": FORMAT_NDJSON,
+    ".parquet": FORMAT_PARQUET,
+    ".arrow": FORMAT_ARROW,
+}
+
+
+def detect_format(file_path):
+    """
+    Detect the catalogue format of a file from its extension.
+
+    Args:
+        file_path (str): Path to the file, optionally with .gz/.zst.
+
+    Returns:
+        str: One of the FORMAT_* constants.
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    base, compression = split_compression(file_path)
+    extension = os.path.splitext(base)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported catalogue format '{file_path}'. "
+                         f"Supported extensions: {', '.join(sorted(FORMATS))}")
+    file_format = FORMATS[extension]
+    if compression and file_format in (FORMAT_PARQUET, FORMAT_ARROW):
+        raise ValueError(f"{file_format} files use their own compression; drop the '{compression}' suffix")
+    return file_format
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet and Arrow files require the 'pyarrow' package (pip install pyarrow).") from None
+    return pyarrow
+
+
+def _movie_details(rating, year, poster):
+    return {"rating": float(rating), "year": int(year), "poster": poster or ""}
+
+
+def iter_json_object(file, chunk_size=READ_CHUNK_SIZE):
+    """
+    Incrementally parse a top-level JSON object, yielding its members.
+
+    Only the current member has to fit in memory, not the whole document.
+
+    Args:
+        file: A text stream containing one JSON object.
+        chunk_size (int): Characters read per refill.
+
+    Yields:
+        tuple: (key, value) for each member, in document order.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    end_of_file = False
+
+    def refill():
+        nonlocal buffer, position, end_of_file
+        chunk = file.read(chunk_size)
+        if not chunk:
+            end_of_file = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def next_token():
+        # Skip whitespace and return the next character without consuming it.
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if end_of_file:
+                return ""
+            refill()
+
+    def decode_value():
+        nonlocal position
+        while True:
+            next_token()  # raw_decode does not skip leading whitespace
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+                refill()
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(buffer) and not end_of_file:
+                refill()
+                continue
+            position = end
+            return value
+
+    if next_token() == "":
+        return
+    if next_token() != "{":
+        raise json.JSONDecodeError("Expected '{'", buffer, position)
+    position += 1
+    if next_token() == "}":
+        return
+    while True:
+        key = decode_value()
+        if next_token() != ":":
+            raise json.JSONDecodeError("Expected ':'", buffer, position)
+        position += 1
+        yield key, decode_value()
+        separator = next_token()
+        position += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Expected ',' or '}'", buffer, position - 1)
+
+
+def iter_catalogue(file_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream the movies of a catalogue file.
+
+    Args:
+        file_path (str): Path to the file; the extension selects the format.
+        batch_size (int): Rows per batch for the columnar formats.
+
+    Yields:
+        tuple: (title, {"rating", "year", "poster"})
+    """
+    file_format = detect_format(file_path)
+    if file_format == FORMAT_JSON:
+        with open_text_reader(file_path) as file:
+            for title, details in iter_json_object(file):
+                yield title, _movie_details(details["rating"], details["year"], details.get("poster"))
+    elif file_format == FORMAT_CSV:
+        with open_text_reader(file_path, newline="") as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            title_at, rating_at, year_at, poster_at = (header.index(column) for column in CSV_HEADER)
+            for row in reader:
+                if row:
+                    yield row[title_at], _movie_details(row[rating_at], row[year_at], row[poster_at])
+    elif file_format == FORMAT_NDJSON:
+        with open_text_reader(file_path) as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["title"], _movie_details(record["rating"], record["year"], record.get("poster"))
+    else:
+        pyarrow = _pyarrow()
+        if file_format == FORMAT_PARQUET:
+            batches = pyarrow.parquet.ParquetFile(file_path).iter_batches(batch_size=batch_size)
+            yield from _iter_record_batches(batches)
+        else:
+            with pyarrow.memory_map(file_path) as source:
+                reader = pyarrow.ipc.open_file(source)
+                yield from _iter_record_batches(reader.get_batch(i) for i in range(reader.num_record_batches))
+
+
+def _iter_record_batches(batches):
+    for batch in batches:
+        columns = batch.to_pydict()
+        for title, rating, year, poster in zip(columns["title"], columns["rating"], columns["year"],
+                                               columns["poster"]):
+            yield title, _movie_details(rating, year, poster)
+
+
+def _batched(movies, batch_size):
+    batch = []
+    for movie in movies:
+        batch.append(movie)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_catalogue(file_path, movies, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream movies into a catalogue file, replacing it atomically.
+
+    Args:
+        file_path (str): Target path; the extension selects the format.
+        movies (iterable): (title, {"rating", "year", "poster"}) pairs.
+        batch_size (int): Rows buffered per batch for the columnar formats.
+
+    Returns:
+        int: Number of movies written.
+    """
+    file_format = detect_format(file_path)
+    count = 0
+    if file_format == FORMAT_JSON:
+        compact = split_compression(file_path)[1] is not None
+        with atomic_text_writer(file_path) as file:
+            file.write("{")
+            for title, details in movies:
+                entry = {"rating": details["rating"], "year": details["year"], "poster": details["poster"]}
+                if compact:
+                    file.write(f'{"," if count else ""}{json.dumps(title)}:{json.dumps(entry, separators=(",", ":"))}')
+                else:
+                    body = json.dumps(entry, indent=4).replace("\n", "\n    ")
+                    file.write(f'{"," if count else ""}\n    {json.dumps(title)}: {body}')
+                count += 1
+            file.write("}" if compact or not count else "\n}")
+    elif file_format == FORMAT_CSV:
+        with atomic_text_writer(file_path, newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            for title, details in movies:
+                writer.writerow([title, details["rating"], details["year"], details["poster"]])
+                count += 1
+    elif file_format == FORMAT_NDJSON:
+        with atomic_text_writer(file_path) as file:
+            for title, details in movies:
+                file.write(json.dumps({"title": title, "rating": details["rating"], "year": details["year"],
+                                       "poster": details["poster"]}) + "\n")
+                count += 1
+    else:
+        count = _write_columnar(file_path, file_format, movies, batch_size)
+    return count
+
+
+def _write_columnar(file_path, file_format, movies, batch_size):
+    pyarrow = _pyarrow()
+    schema = pyarrow.schema([("title", pyarrow.string()), ("rating", pyarrow.float64()),
+                             ("year", pyarrow.int32()), ("poster", pyarrow.string())])
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    count = 0
+    try:
+        if file_format == FORMAT_PARQUET:
+            writer = pyarrow.parquet.ParquetWriter(temp_path, schema, compression="zstd")
+        else:
+            writer = pyarrow.ipc.new_file(temp_path, schema)
+        with writer:
+            for batch in _batched(movies, batch_size):
+                writer.write_batch(pyarrow.record_batch([
+                    [title for title, _ in batch],
+                    [details["rating"] for _, details in batch],
+                    [details["year"] for _, details in batch],
+                    [details["poster"] for _, details in batch],
+                ], schema=schema))
+                count += len(batch)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
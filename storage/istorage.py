@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
 
+from storage.movie import Movie
+from storage.random_index import RandomIndex, pick_random_title
+
 
 class IStorage(ABC):
     """Interface that defines the required methods for a movie storage system."""
@@ -56,3 +59,92 @@ class IStorage(ABC):
             None
         """
         pass
+
+    def data_version(self):
+        """
+        Return a token that changes whenever the stored movies change.
+
+        Query results computed from list_movies() can be cached under this
+        token (see query_cache.QueryCache). Backends bump it on every
+        mutation and include the state of their files, so edits made by
+        other processes invalidate it too.
+
+        The default returns None, which means "unknown" and disables caching.
+
+        Returns:
+            hashable or None: The current data version.
+        """
+        return None
+
+    def iter_movies(self):
+        """
+        Stream all movies one at a time.
+
+        The default implementation iterates list_movies(). File-backed
+        backends override it to read incrementally.
+
+        Yields:
+            tuple: (title, {"rating", "year", "poster"})
+        """
+        yield from self.list_movies().items()
+
+    def list_movie_records(self):
+        """
+        Retrieve all movies as compact Movie records.
+
+        The default implementation converts list_movies(). Backends can
+        override it to decode their file straight into records.
+
+        Returns:
+            dict: {title: Movie}
+        """
+        return {title: Movie.from_dict(data) for title, data in self.list_movies().items()}
+
+    def list_movies_in_years(self, start_year, end_year):
+        """
+        Retrieve movies released between start_year and end_year (inclusive).
+
+        The default implementation filters list_movies(). Backends that
+        partition data by year can override it to skip partitions.
+
+        Args:
+            start_year (int): First year to include.
+            end_year (int): Last year to include.
+
+        Returns:
+            dict: Matching movies in the format {title: {rating, year, poster}}.
+        """
+        return {title: data for title, data in self.list_movies().items()
+                if start_year <= data["year"] <= end_year}
+
+    def random_movie(self, weighted_by=None, start_year=None, end_year=None):
+        """
+        Select a random movie, optionally weighted by a field and filtered by year.
+
+        The default implementation loads all movies. Backends that can keep
+        an index between calls should override it.
+
+        Args:
+            weighted_by (str): Movie field to weight by (e.g. "rating"), or None
+                for a uniform pick.
+            start_year (int): Only consider movies released in or after this year.
+            end_year (int): Only consider movies released in or before this year.
+
+        Returns:
+            tuple or None: Movie title and its details, or None if no movie matches.
+        """
+        movies = self.list_movies()
+        title = pick_random_title(RandomIndex(movies), movies, weighted_by, start_year, end_year)
+        return (title, movies[title]) if title is not None else None
+
+    def flush(self):
+        """
+        Write any buffered changes to disk.
+
+        Backends that write every mutation immediately have nothing to do;
+        write-behind storage (storage/write_behind.py) overrides this.
+
+        Returns:
+            int: Number of buffered mutations written.
+        """
+        return 0
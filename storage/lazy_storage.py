@@ -0,0 +1,62 @@
+import abc
+
+from storage.istorage import IStorage
+
+
+class LazyStorage(IStorage):
+    """
+    IStorage proxy that creates the real backend on first use.
+
+    Opening a backend touches its data file (and may create it), so
+    deferring that until the first command keeps application startup cheap.
+    """
+
+    def __init__(self, factory):
+        """
+        Initialize the LazyStorage object.
+
+        Args:
+            factory (callable): Called without arguments to create the backend.
+        """
+        self._factory = factory
+        self._backend = None
+
+    @property
+    def backend(self):
+        """
+        The real storage backend, created on first access.
+
+        Returns:
+            IStorage: The wrapped backend.
+        """
+        if self._backend is None:
+            self._backend = self._factory()
+        return self._backend
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy (e.g. file_path).
+        if name.startswith("__") or name in ("_factory", "_backend"):
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def flush(self):
+        # A backend that was never opened has nothing to write.
+        return self._backend.flush() if self._backend is not None else 0
+
+
+def _forward(name):
+    def method(self, *args, **kwargs):
+        return getattr(self.backend, name)(*args, **kwargs)
+
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = getattr(IStorage, name).__doc__
+    return method
+
+
+# Forward every IStorage method the proxy doesn't define itself, so methods
+# added to IStorage later reach the backend's override instead of the
+# inherited default.
+for _name, _member in vars(IStorage).items():
+    if callable(_member) and not _name.startswith("_") and _name not in vars(LazyStorage):
+        setattr(LazyStorage, _name, _forward(_name))
+abc.update_abstractmethods(LazyStorage)
@@ -0,0 +1,293 @@
+"""
+Side store for the full OMDb payload of every movie (genre, director, actors, plot, ...).
+
+The catalogue backends only keep title, rating, year and poster. Everything
+else OMDb returns is appended to a separate file next to the data file
+(data/movies.json -> data/movies.omdb.ndjson), one line per movie:
+
+    <title as JSON string> TAB <OMDb payload as JSON, or null when deleted>
+
+Appending makes adds O(1) and leaves the catalogue file untouched. A later
+line for the same title supersedes earlier ones. The store is loaded lazily:
+the first read scans the file once and remembers the offset of each title's
+latest line, and payloads are only parsed when they are asked for, so the
+payloads themselves stay on disk. Superseded lines are compacted away once
+they outnumber the live ones.
+"""
+
+import json
+import os
+import threading
+
+from storage.atomic_file import atomic_write
+from storage.compression import split_compression
+from storage.movie import json_loads
+
+METADATA_SUFFIX = ".omdb.ndjson"
+COMPACT_MIN_LINES = 1000
+
+
+def _complete_length(file):
+    """
+    Return the length of a file up to and including its last newline.
+
+    Args:
+        file: A binary file opened for reading.
+
+    Returns:
+        int: The offset just past the last complete line.
+    """
+    end = file.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(position - 65536, 0)
+        file.seek(start)
+        block = file.read(position - start)
+        newline = block.rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def metadata_path(storage):
+    """
+    Return the side-store path for a storage backend.
+
+    Args:
+        storage (IStorage): A file backend (file_path) or a directory backend
+            (directory, e.g. sharded or versioned storage).
+
+    Returns:
+        str: Path of the metadata file.
+    """
+    file_path = getattr(storage, "file_path", None)
+    if file_path:
+        return os.path.splitext(split_compression(file_path)[0])[0] + METADATA_SUFFIX
+    return os.path.join(storage.directory, "movies" + METADATA_SUFFIX)
+
+
+class MetadataStore:
+    """Append-only, lazily indexed store of OMDb payloads keyed by title."""
+
+    def __init__(self, file_path):
+        """
+        Initialize the MetadataStore object. The file is not read until first use.
+
+        Args:
+            file_path (str): Path to the .omdb.ndjson file.
+        """
+        self.file_path = file_path
+        self._offsets = None  # title -> offset of its latest line
+        self._lines = 0
+        self._signature = None
+        self._mutations = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_storage(cls, storage):
+        """
+        Open the side store that belongs to a storage backend.
+
+        Args:
+            storage (IStorage): The catalogue storage.
+
+        Returns:
+            MetadataStore: The store at metadata_path(storage).
+        """
+        return cls(metadata_path(storage))
+
+    def _file_signature(self):
+        """
+        Return a cheap fingerprint of the metadata file used to detect changes.
+
+        Returns:
+            tuple or None: (mtime_ns, size), or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _scan(self):
+        """
+        Index the latest line of every title, if not done yet or the file changed.
+
+        Lines that are not terminated (an append cut short by a crash) are ignored.
+
+        Returns:
+            dict: title -> offset of its latest line.
+        """
+        signature = self._file_signature()
+        if self._offsets is not None and signature == self._signature:
+            return self._offsets
+        offsets = {}
+        lines = 0
+        if signature is not None:
+            with open(self.file_path, "rb") as file:
+                offset = 0
+                for line in file:
+                    if line.endswith(b"\n"):
+                        title_part, _, payload_part = line.partition(b"\t")
+                        title = json.loads(title_part)
+                        if payload_part.strip() == b"null":
+                            offsets.pop(title, None)
+                        else:
+                            offsets[title] = offset
+                        lines += 1
+                    offset += len(line)
+        self._offsets, self._lines, self._signature = offsets, lines, signature
+        if lines > max(2 * len(offsets), COMPACT_MIN_LINES):
+            self.compact()
+        return self._offsets
+
+    def _is_loaded(self):
+        return self._offsets is not None and self._signature == self._file_signature()
+
+    def _append(self, title, payload):
+        """
+        Append one line, keeping the offset index in step if it is loaded.
+
+        Appending does not need the index, so adding or deleting a movie
+        never scans the file. A torn last line left by a crash is cut off first.
+
+        Args:
+            title (str): The movie title.
+            payload (dict or None): The OMDb payload, or None to delete the title.
+
+        Returns:
+            None
+        """
+        loaded = self._is_loaded()
+        line = (json.dumps(title, ensure_ascii=False) + "\t"
+                + json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+        with open(self.file_path, "a+b") as file:
+            offset = _complete_length(file)
+            file.truncate(offset)
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        if loaded:
+            if payload is None:
+                self._offsets.pop(title, None)
+            else:
+                self._offsets[title] = offset
+            self._lines += 1
+            self._signature = self._file_signature()
+        self._mutations += 1
+
+    def _read_payload(self, file, offset):
+        file.seek(offset)
+        return json_loads(file.readline().partition(b"\t")[2])
+
+    def version(self):
+        """
+        Return a token that changes whenever the stored payloads change.
+
+        Returns:
+            tuple: (mutations made through this object, file signature)
+        """
+        return self._mutations, self._file_signature()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._scan())
+
+    def __contains__(self, title):
+        with self._lock:
+            return title in self._scan()
+
+    def get(self, title):
+        """
+        Return the stored OMDb payload of a movie.
+
+        Args:
+            title (str): The movie title.
+
+        Returns:
+            dict or None: The payload, or None if none is stored.
+        """
+        with self._lock:
+            offset = self._scan().get(title)
+            if offset is None:
+                return None
+            with open(self.file_path, "rb") as file:
+                return self._read_payload(file, offset)
+
+    def put(self, title, payload):
+        """
+        Store (or replace) the OMDb payload of a movie.
+
+        Args:
+            title (str): The movie title, as stored in the catalogue.
+            payload (dict): The full OMDb response.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._append(title, payload)
+
+    def remove(self, title):
+        """
+        Forget the payload of a movie. Unknown titles are ignored.
+
+        Args:
+            title (str): The movie title.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if not self._is_loaded() or title in self._offsets:
+                self._append(title, None)
+
+    def items(self):
+        """
+        Stream the live payloads in file order.
+
+        Yields:
+            tuple: (title, payload)
+        """
+        with self._lock:
+            latest = {offset: title for title, offset in self._scan().items()}
+            if not latest:
+                return
+            with open(self.file_path, "rb") as file:
+                offset = 0
+                for line in file:
+                    title = latest.get(offset)
+                    if title is not None:
+                        yield title, json_loads(line.partition(b"\t")[2])
+                    offset += len(line)
+
+    def compact(self):
+        """
+        Rewrite the file with only the latest line of every title.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            offsets = self._offsets if self._offsets is not None else self._scan()
+            compacted = {}
+            with open(self.file_path, "rb") as source, atomic_write(self.file_path, "wb") as target:
+                for title, offset in sorted(offsets.items(), key=lambda item: item[1]):
+                    source.seek(offset)
+                    compacted[title] = target.tell()
+                    target.write(source.readline())
+            self._offsets, self._lines = compacted, len(compacted)
+            self._mutations += 1
+            self._signature = self._file_signature()
+
+
+if __name__ == "__main__":
+    # test functions
+    store = MetadataStore("test_metadata.omdb.ndjson")
+    store.put("Inception", {"Title": "Inception", "Genre": "Action, Sci-Fi", "Director": "Christopher Nolan"})
+    store.put("Titanic", {"Title": "Titanic", "Genre": "Drama, Romance", "Director": "James Cameron"})
+    print(store.get("Inception"))
+    store.remove("Titanic")
+    print(len(store), list(store.items()))
@@ -0,0 +1,183 @@
+"""
+Typed, memory-compact movie records and schema-driven decoders.
+
+A Movie uses __slots__, so it needs roughly a third of the memory of the
+equivalent {"rating", "year", "poster"} dict. It also supports
+movie["rating"] and movie.get("poster"), so the helper functions work on
+record catalogues ({title: Movie}) unchanged.
+
+JSON catalogues are decoded with msgspec when it is installed: it parses
+straight into MovieStruct records (the same interface as Movie) without
+building a dict per movie. Otherwise the document is parsed with orjson,
+or the standard library, and each movie's dict is replaced by a Movie as
+it is converted, so no more than one dict per movie is alive at a time.
+"""
+
+import json
+
+_orjson = None
+_msgspec = None
+
+FIELDS = ("rating", "year", "poster")
+CSV_HEADER = ["title", "rating", "year", "poster"]
+
+
+class MovieRecord:
+    """Interface shared by the record types: item access, get() and equality by value."""
+
+    __slots__ = ()
+
+    def to_dict(self):
+        """
+        Convert the record back into the dict shape returned by list_movies().
+
+        Returns:
+            dict: {"rating", "year", "poster"}
+        """
+        return {"rating": self.rating, "year": self.year, "poster": self.poster}
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def __eq__(self, other):
+        if not isinstance(other, MovieRecord):
+            return NotImplemented
+        return (self.rating, self.year, self.poster) == (other.rating, other.year, other.poster)
+
+    __hash__ = None
+
+
+class Movie(MovieRecord):
+    """A single movie record: rating, release year and poster URL."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, rating, year, poster=""):
+        """
+        Initialize the Movie.
+
+        Args:
+            rating (float): The rating of the movie.
+            year (int): The release year of the movie.
+            poster (str): URL or path to the movie poster.
+        """
+        self.rating = rating
+        self.year = year
+        self.poster = poster
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a Movie from a {"rating", "year", "poster"} dict.
+
+        Args:
+            data (dict): The movie details.
+
+        Returns:
+            Movie: The record.
+        """
+        return cls(float(data["rating"]), int(data["year"]), data.get("poster") or "")
+
+    def __repr__(self):
+        return f"Movie(rating={self.rating!r}, year={self.year!r}, poster={self.poster!r})"
+
+
+def _msgspec_decoder():
+    """
+    Return a msgspec decoder for {title: MovieStruct}, creating it on first use.
+
+    Returns:
+        msgspec.json.Decoder or None: The decoder, or None if msgspec is not installed.
+    """
+    global _msgspec
+    if _msgspec is None:
+        try:
+            import msgspec
+        except ImportError:
+            _msgspec = False
+            return None
+
+        class MovieStruct(msgspec.Struct, MovieRecord, gc=False):
+            """Movie record decoded by msgspec; interchangeable with Movie."""
+
+            rating: float
+            year: int
+            poster: str = ""
+
+            __eq__ = MovieRecord.__eq__
+
+        _msgspec = (msgspec.json.Decoder(dict[str, MovieStruct]), msgspec.MsgspecError)
+    return _msgspec[0] if _msgspec else None
+
+
+def json_loads(data):
+    """
+    Parse JSON text or bytes, using orjson when available.
+
+    Args:
+        data (str or bytes): The JSON document.
+
+    Returns:
+        object: The parsed document.
+    """
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson as _orjson  # imported on first parse, it is slow to import
+        except ImportError:
+            _orjson = False
+    if _orjson:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_json_records(data):
+    """
+    Decode a JSON catalogue document into Movie records.
+
+    Args:
+        data (str or bytes): A JSON object {title: {rating, year, poster}}.
+
+    Returns:
+        dict: {title: Movie or MovieStruct}
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON.
+    """
+    decoder = _msgspec_decoder()
+    if decoder is not None:
+        try:
+            return decoder.decode(data)
+        except _msgspec[1]:
+            pass  # e.g. a null poster: the generic path below accepts it or reports the error
+    movies = json_loads(data)
+    for title, details in movies.items():
+        movies[title] = Movie(float(details["rating"]), int(details["year"]), details.get("poster") or "")
+    return movies
+
+
+def decode_csv_records(reader):
+    """
+    Decode CSV rows into Movie records using the header row as schema.
+
+    Column positions are resolved once from the header, so each row is
+    converted without building an intermediate dict.
+
+    Args:
+        reader (iterable): A csv.reader positioned at the header row.
+
+    Returns:
+        dict: {title: Movie}
+    """
+    header = next(reader, None)
+    if header is None:
+        return {}
+    title_at, rating_at, year_at, poster_at = (header.index(column) for column in CSV_HEADER)
+    return {row[title_at]: Movie(float(row[rating_at]), int(row[year_at]), row[poster_at])
+            for row in reader if row}
+
@@ -0,0 +1,144 @@
+from bisect import bisect_right
+from itertools import accumulate
+from random import random
+
+
+class RandomIndex:
+    """
+    Array of movie titles supporting O(1) random selection.
+
+    Titles are kept in a list together with a title -> position map so that
+    deletes can swap the last element into the freed slot instead of
+    shifting the whole list.
+    """
+
+    def __init__(self, titles=()):
+        """
+        Initialize the index.
+
+        Args:
+            titles (iterable): Initial titles to index.
+        """
+        self._titles = list(titles)
+        self._positions = {title: position for position, title in enumerate(self._titles)}
+        self._cumulative_weights = {}
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __contains__(self, title):
+        return title in self._positions
+
+    def add(self, title):
+        """
+        Add a title to the index.
+
+        Adding an existing title keeps its position. The weight tables are
+        dropped either way, because the caller may have replaced the record.
+
+        Args:
+            title (str): The title to add.
+
+        Returns:
+            None
+        """
+        if title not in self._positions:
+            self._positions[title] = len(self._titles)
+            self._titles.append(title)
+        self.invalidate_weights()
+
+    def remove(self, title):
+        """
+        Remove a title from the index using swap-remove.
+
+        Args:
+            title (str): The title to remove.
+
+        Returns:
+            None
+        """
+        position = self._positions.pop(title, None)
+        if position is None:
+            return
+        last_title = self._titles.pop()
+        if position < len(self._titles):
+            self._titles[position] = last_title
+            self._positions[last_title] = position
+        self.invalidate_weights()
+
+    def invalidate_weights(self):
+        """
+        Drop all cached cumulative weight tables, e.g. after a rating change.
+
+        Returns:
+            None
+        """
+        self._cumulative_weights.clear()
+
+    def choice(self):
+        """
+        Pick a uniformly random title.
+
+        Returns:
+            str or None: A random title, or None if the index is empty.
+        """
+        if not self._titles:
+            return None
+        return self._titles[int(random() * len(self._titles))]
+
+    def weighted_choice(self, weight_of, cache_key=None):
+        """
+        Pick a random title with probability proportional to its weight.
+
+        The cumulative weight table is built once per cache_key and reused
+        until the index changes, so repeated picks cost O(log n).
+
+        Args:
+            weight_of (callable): Maps a title to a non-negative weight.
+                A weight of 0 excludes the title.
+            cache_key (hashable): Identifies weight_of for caching.
+                If None, the table is rebuilt on every call.
+
+        Returns:
+            str or None: A random title, or None if all weights are zero.
+        """
+        cumulative = self._cumulative_weights.get(cache_key) if cache_key is not None else None
+        if cumulative is None:
+            cumulative = list(accumulate(max(weight_of(title), 0.0) for title in self._titles))
+            if cache_key is not None:
+                self._cumulative_weights[cache_key] = cumulative
+        if not cumulative or cumulative[-1] <= 0:
+            return None
+        position = bisect_right(cumulative, random() * cumulative[-1])
+        return self._titles[min(position, len(self._titles) - 1)]
+
+
+def pick_random_title(index, movies, weighted_by=None, start_year=None, end_year=None):
+    """
+    Pick a random title from an index, optionally weighted and filtered by year.
+
+    Without weighting or filters the pick is O(1). Weighted or filtered picks
+    reuse a cached cumulative weight table until the index changes.
+
+    Args:
+        index (RandomIndex): Index over the titles in movies.
+        movies (dict): Movies in the format {title: {rating, year, poster}}.
+        weighted_by (str): Movie field to weight by (e.g. "rating"), or None.
+        start_year (int): Only consider movies released in or after this year.
+        end_year (int): Only consider movies released in or before this year.
+
+    Returns:
+        str or None: A random title, or None if no movie matches.
+    """
+    if weighted_by is None and start_year is None and end_year is None:
+        return index.choice()
+
+    def weight_of(title):
+        data = movies[title]
+        if start_year is not None and data["year"] < start_year:
+            return 0.0
+        if end_year is not None and data["year"] > end_year:
+            return 0.0
+        return float(data[weighted_by]) if weighted_by else 1.0
+
+    return index.weighted_choice(weight_of, cache_key=(weighted_by, start_year, end_year))
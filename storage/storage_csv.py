@@ -1,28 +1,37 @@
 import csv
 import os
 
-from storage.istorage import IStorage
+from instrumentation import instrumented
+from storage.compression import atomic_text_writer, open_text_reader
+from storage.formats import iter_catalogue
+from storage.file_storage import FileStorage
+from storage.movie import CSV_HEADER, decode_csv_records
 
 
-class StorageCsv(IStorage):
+class StorageCsv(FileStorage):
     """CSV-based implementation of the IStorage interface for managing movie data."""
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, quiet=False):
         """
         Initialize the StorageCsv object and ensure the CSV file exists.
 
         Args:
             file_path (str): Path to the CSV file used for storing movies.
+                A .gz or .zst suffix (e.g. movies.csv.gz) enables compression.
+            quiet (bool): Don't announce the file (used for the files of a
+                multi-file storage, which announces itself).
         """
-        self.file_path = file_path
+        super().__init__(file_path)
 
         if not os.path.exists(self.file_path):
-            with open(self.file_path, mode="w", newline='') as file:
+            with atomic_text_writer(self.file_path, newline="") as file:
                 writer = csv.writer(file)
-                writer.writerow(["title", "rating", "year", "poster"])
+                writer.writerow(CSV_HEADER)
 
-        print(f"[INFO] Storage ready: {self.file_path}")
+        if not quiet:
+            print(f"[INFO] Storage ready: {self.file_path}")
 
+    @instrumented("storage.csv.load_data")
     def _load_data(self):
         """
         Load movie data from the CSV file.
@@ -32,35 +41,61 @@ class StorageCsv(IStorage):
         """
         movies = {}
         try:
-            with open(self.file_path, mode="r", newline="") as file:
-                reader = csv.DictReader(file)
+            with open_text_reader(self.file_path, newline="") as file:
+                reader = csv.reader(file)
+                header = next(reader, None)
+                if header is None:
+                    return {}
+                # Resolve column positions once instead of building a dict per row
+                title_at, rating_at, year_at, poster_at = (header.index(column) for column in CSV_HEADER)
                 for row in reader:
-                    movies[row["title"]] = {
-                        "rating": float(row["rating"]),
-                        "year": int(row["year"]),
-                        "poster": row["poster"]
-                    }
+                    if row:
+                        movies[row[title_at]] = {
+                            "rating": float(row[rating_at]),
+                            "year": int(row[year_at]),
+                            "poster": row[poster_at]
+                        }
         except FileNotFoundError:
             return {}
 
         return movies
 
-    def _save_data(self, movies):
+    @instrumented("storage.csv.load_records")
+    def _load_records(self):
         """
-        Save the entire movie dictionary into the CSV file.
+        Load movie data from the CSV file straight into Movie records.
+
+        Returns:
+            dict: {title: Movie}
+        """
+        try:
+            with open_text_reader(self.file_path, newline="") as file:
+                return decode_csv_records(csv.reader(file))
+        except FileNotFoundError:
+            return {}
+
+    @instrumented("storage.csv.save_data")
+    def _write_data(self, movies):
+        """
+        Write the entire movie dictionary into the CSV file.
 
         Args:
             movies (dict): The movies to save.
 
         Returns:
             None
+
+        Raises:
+            OSError: If the file cannot be written.
         """
-        with open(self.file_path, mode="w", newline="") as file:
+        self._mutations += 1
+        with atomic_text_writer(self.file_path, newline="") as file:
             writer = csv.writer(file)
-            writer.writerow(["title", "rating", "year", "poster"])  # Header
+            writer.writerow(CSV_HEADER)  # Header
             for title, data in movies.items():
                 writer.writerow([title, data["rating"], data["year"], data["poster"]])
 
+    @instrumented("storage.csv.list_movies")
     def list_movies(self):
         """
         Retrieve all movies from the CSV file.
@@ -70,6 +105,26 @@ class StorageCsv(IStorage):
         """
         return self._load_data()
 
+    def iter_movies(self):
+        """
+        Stream movies from the file without loading it as a whole.
+
+        Yields:
+            tuple: (title, {"rating", "year", "poster"})
+        """
+        if os.path.exists(self.file_path):
+            yield from iter_catalogue(self.file_path)
+
+    def list_movie_records(self):
+        """
+        Retrieve all movies as compact Movie records.
+
+        Returns:
+            dict: {title: Movie}
+        """
+        return self._load_records()
+
+    @instrumented("storage.csv.add_movie")
     def add_movie(self, title, year, rating, poster):
         """
         Add a new movie to the CSV storage.
@@ -83,15 +138,18 @@ class StorageCsv(IStorage):
         Returns:
             None
         """
+        was_current = self._random_index_is_current()
         movies = self.list_movies()
         movies[title] = {
             "rating": float(round(rating, 1)),
             "year": year,
             "poster": poster
         }
-        self._save_data(movies)
+        if not self._save_and_index(movies, was_current, added=title):
+            return
         print(f"Movie '{title}' added successfully.")
 
+    @instrumented("storage.csv.delete_movie")
     def delete_movie(self, title):
         """
         Delete a movie from the CSV storage by its title.
@@ -102,14 +160,17 @@ class StorageCsv(IStorage):
         Returns:
             None
         """
+        was_current = self._random_index_is_current()
         movies = self.list_movies()
         if title in movies:
             del movies[title]
-            self._save_data(movies)
+            if not self._save_and_index(movies, was_current, removed=title):
+                return
             print(f"Movie '{title}' deleted successfully.")
         else:
             print(f"Movie '{title}' does not exist!")
 
+    @instrumented("storage.csv.update_movie")
     def update_movie(self, title, rating):
         """
         Update the rating of an existing movie.
@@ -121,10 +182,12 @@ class StorageCsv(IStorage):
         Returns:
             None
         """
+        was_current = self._random_index_is_current()
         movies = self.list_movies()
         if title in movies:
             movies[title]["rating"] = float(round(rating, 1))
-            self._save_data(movies)
+            if not self._save_and_index(movies, was_current):
+                return
             print(f"Movie '{title}' updated successfully. New rating: {rating}")
         else:
             print(f"Movie '{title}' does not exist!")
@@ -0,0 +1,173 @@
+import importlib
+import os
+from urllib.parse import parse_qsl
+
+from storage.compression import split_compression
+from storage.lazy_storage import LazyStorage
+
+DEFAULT_STORAGE_PATH = "data/movies.json"
+
+# File extension -> (module, class). Modules are only imported when selected.
+BACKENDS = {
+    ".json": ("storage.storage_json", "StorageJson"),
+    ".csv": ("storage.storage_csv", "StorageCsv"),
+}
+
+# "<scheme>:<directory>[?option=value&...]" -> (module, class) for storages
+# that keep several files in a directory, e.g. "sharded:data/shards?partition=decade".
+DIRECTORY_BACKENDS = {
+    "sharded": ("storage.storage_sharded", "StorageSharded"),
+    "versioned": ("storage.storage_versioned", "StorageVersioned"),
+}
+
+
+def get_backend_class(file_path):
+    """
+    Import and return the storage class that handles a data file.
+
+    Args:
+        file_path (str): Path to the data file; its extension selects the backend.
+
+    Returns:
+        type: The IStorage implementation.
+    """
+    module_name, class_name = BACKENDS[_extension(file_path)]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _extension(file_path):
+    """
+    Return the backend-selecting extension of a data file.
+
+    A compression suffix is ignored, so movies.json.gz selects ".json".
+
+    Args:
+        file_path (str): Path to the data file.
+
+    Returns:
+        str: The lower-cased extension, e.g. ".json".
+
+    Raises:
+        ValueError: If no backend handles the file extension.
+    """
+    extension = os.path.splitext(split_compression(file_path)[0])[1].lower()
+    if extension not in BACKENDS:
+        raise ValueError(f"No storage backend for '{file_path}'. "
+                         f"Supported extensions: {', '.join(sorted(BACKENDS))} "
+                         f"(optionally followed by .gz or .zst)")
+    return extension
+
+
+def _split_scheme(location):
+    """
+    Split a directory storage location into its parts.
+
+    Args:
+        location (str): e.g. "sharded:data/shards?partition=decade&shards=16".
+
+    Returns:
+        tuple or None: (scheme, directory, options dict), or None if the
+            location is a plain data file path.
+
+    Raises:
+        ValueError: If the directory is missing.
+    """
+    scheme, separator, rest = location.partition(":")
+    if not separator or scheme.lower() not in DIRECTORY_BACKENDS:
+        return None
+    directory, _, query = rest.partition("?")
+    if not directory:
+        raise ValueError(f"No directory in '{location}', e.g. '{scheme}:data/{scheme}'")
+    options = {name: int(value) if value.isdigit() else value for name, value in parse_qsl(query)}
+    return scheme.lower(), directory, options
+
+
+def _open_directory_backend(scheme, directory, options):
+    """
+    Create a directory storage (sharded or versioned).
+
+    Args:
+        scheme (str): A key of DIRECTORY_BACKENDS.
+        directory (str): The storage directory.
+        options (dict): Keyword arguments for the storage class.
+
+    Returns:
+        IStorage: The backend.
+
+    Raises:
+        ValueError: If an option is not supported by the storage class.
+    """
+    module_name, class_name = DIRECTORY_BACKENDS[scheme]
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    try:
+        return backend_class(directory, **options)
+    except TypeError as e:
+        raise ValueError(f"Invalid option for {scheme} storage: {e}") from None
+
+
+def _open_backend(file_path, write_behind, watch):
+    """
+    Create the backend for a data file, optionally wrapped in an in-memory proxy.
+
+    Directory storages are never wrapped: they already write only what
+    changed and read from immutable or per-shard files.
+
+    Args:
+        file_path (str): Path to the data file, or a directory storage location.
+        write_behind (float or None): Debounce delay in seconds, or None to
+            write every mutation immediately.
+        watch (bool): Keep the movies in memory and reload them only when the
+            file changes. Ignored with write_behind, whose in-memory copy is
+            authoritative.
+
+    Returns:
+        IStorage: The backend.
+    """
+    directory_storage = _split_scheme(file_path)
+    if directory_storage is not None:
+        return _open_directory_backend(*directory_storage)
+    backend = get_backend_class(file_path)(file_path)
+    if write_behind is not None:
+        from storage.write_behind import WriteBehindStorage
+
+        return WriteBehindStorage(backend, delay=write_behind)
+    if watch:
+        from storage.watched_storage import WatchedStorage
+
+        return WatchedStorage(backend)
+    return backend
+
+
+def open_storage(file_path=None, lazy=False, write_behind=None, watch=False):
+    """
+    Open the storage backend selected by configuration.
+
+    Args:
+        file_path (str): Path to the data file, or "sharded:<directory>" /
+            "versioned:<directory>" with optional "?option=value&..." keyword
+            arguments for StorageSharded / StorageVersioned. Defaults to the
+            MOVIE_APP_STORAGE environment variable, then to data/movies.json.
+        lazy (bool): Defer importing and opening the backend until first use.
+        write_behind (float): Buffer mutations in memory and write them this many
+            seconds after the last one (see storage/write_behind.py). Defaults to
+            the MOVIE_APP_WRITE_BEHIND environment variable; unset means every
+            mutation is written immediately.
+        watch (bool): Serve reads from memory and reload only when the file
+            changes (see storage/watched_storage.py), for long-running
+            processes. MOVIE_APP_WATCH=off disables it.
+
+    Returns:
+        IStorage: The selected storage backend.
+
+    Raises:
+        ValueError: If no backend handles the file extension or location.
+    """
+    file_path = file_path or os.getenv("MOVIE_APP_STORAGE") or DEFAULT_STORAGE_PATH
+    if write_behind is None and os.getenv("MOVIE_APP_WRITE_BEHIND"):
+        write_behind = float(os.getenv("MOVIE_APP_WRITE_BEHIND"))
+    watch = watch and os.getenv("MOVIE_APP_WATCH", "").lower() != "off"
+    if _split_scheme(file_path) is None:
+        _extension(file_path)
+    if lazy:
+        return LazyStorage(lambda: _open_backend(file_path, write_behind, watch))
+    return _open_backend(file_path, write_behind, watch)
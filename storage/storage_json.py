@@ -1,27 +1,36 @@
 import json
 import os
 
-from storage.istorage import IStorage
+from instrumentation import instrumented
+from storage.compression import atomic_text_writer, is_compressed, open_text_reader
+from storage.formats import iter_catalogue
+from storage.file_storage import FileStorage
+from storage.movie import decode_json_records, json_loads
 
 
-class StorageJson(IStorage):
+class StorageJson(FileStorage):
     """JSON-based implementation of the IStorage interface for managing movie data."""
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, quiet=False):
         """
         Initialize the StorageJson object.
 
         Args:
             file_path (str): Path to the JSON file used for storing movies.
+                A .gz or .zst suffix (e.g. movies.json.gz) enables compression.
+            quiet (bool): Don't announce the file (used for the files of a
+                multi-file storage, which announces itself).
         """
-        self.file_path = file_path
+        super().__init__(file_path)
 
         if not os.path.exists(self.file_path):
-            with open(self.file_path, "w") as file:
+            with atomic_text_writer(self.file_path) as file:
                 json.dump({}, file)
 
-        print(f"[INFO] Storage ready: {self.file_path}")
+        if not quiet:
+            print(f"[INFO] Storage ready: {self.file_path}")
 
+    @instrumented("storage.json.load_data")
     def _load_data(self):
         """
         Load movie data from the JSON file.
@@ -30,33 +39,51 @@ class StorageJson(IStorage):
             dict: Dictionary containing all stored movie data.
         """
         try:
-            with open(self.file_path, "r") as content:
-                return json.load(content)
+            with open_text_reader(self.file_path) as content:
+                return json_loads(content.read())
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
 
-    def _save_data(self, data):
+    @instrumented("storage.json.load_records")
+    def _load_records(self):
         """
-        Save movie data to the JSON file.
+        Load movie data from the JSON file straight into Movie records.
+
+        Returns:
+            dict: {title: Movie}
+        """
+        try:
+            with open_text_reader(self.file_path) as content:
+                return decode_json_records(content.read())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @instrumented("storage.json.save_data")
+    def _write_data(self, data):
+        """
+        Write movie data to the JSON file.
 
         Args:
             data (dict): The dictionary of movies to be saved.
 
         Returns:
             None
+
+        Raises:
+            TypeError: If the data cannot be converted to JSON.
+            OSError: If the file cannot be written.
         """
-        try:
+        if is_compressed(self.file_path):
+            # compact output: whitespace would only cost compression time
+            json_data = json.dumps(data, separators=(",", ":"))
+        else:
             json_data = json.dumps(data, indent=4)
-        except TypeError as e:
-            print("Error while converting to JSON:", e)
-            return
 
-        try:
-            with open(self.file_path, 'w') as file:
-                file.write(json_data)
-        except IOError as e:
-            print(f"Error while saving the file: {e}")
+        self._mutations += 1
+        with atomic_text_writer(self.file_path) as file:
+            file.write(json_data)
 
+    @instrumented("storage.json.list_movies")
     def list_movies(self):
         """
         Retrieve all movies from the storage.
@@ -66,6 +93,26 @@ class StorageJson(IStorage):
         """
         return self._load_data()
 
+    def iter_movies(self):
+        """
+        Stream movies from the file without loading it as a whole.
+
+        Yields:
+            tuple: (title, {"rating", "year", "poster"})
+        """
+        if os.path.exists(self.file_path):
+            yield from iter_catalogue(self.file_path)
+
+    def list_movie_records(self):
+        """
+        Retrieve all movies as compact Movie records.
+
+        Returns:
+            dict: {title: Movie}
+        """
+        return self._load_records()
+
+    @instrumented("storage.json.add_movie")
     def add_movie(self, title, year, rating, poster):
         """
         Add a new movie to the storage.
@@ -79,6 +126,7 @@ class StorageJson(IStorage):
         Returns:
             None
         """
+        was_current = self._random_index_is_current()
         movies = self._load_data()
 
         movies[title] = {
@@ -87,9 +135,11 @@ class StorageJson(IStorage):
             "poster": poster
         }
 
-        self._save_data(movies)
+        if not self._save_and_index(movies, was_current, added=title):
+            return
         print(f"Movie '{title}' added successfully.")
 
+    @instrumented("storage.json.delete_movie")
     def delete_movie(self, title):
         """
         Delete a movie from the storage by title.
@@ -100,15 +150,18 @@ class StorageJson(IStorage):
         Returns:
             None
         """
+        was_current = self._random_index_is_current()
         movies = self._load_data()
 
         if title in movies:
             del movies[title]
-            self._save_data(movies)
+            if not self._save_and_index(movies, was_current, removed=title):
+                return
             print(f"Movie '{title}' deleted successfully.")
         else:
             print(f"Movie '{title}' does not exist!")
 
+    @instrumented("storage.json.update_movie")
     def update_movie(self, title, rating):
         """
         Update the rating of an existing movie.
@@ -120,11 +173,13 @@ class StorageJson(IStorage):
         Returns:
             None
         """
+        was_current = self._random_index_is_current()
         movies = self._load_data()
 
         if title in movies:
             movies[title]["rating"] = float(round(rating, 1))
-            self._save_data(movies)
+            if not self._save_and_index(movies, was_current):
+                return
             print(f"Movie '{title}' updated successfully. New rating: {rating}")
         else:
             print(f"Movie '{title}' does not exist!")
@@ -0,0 +1,275 @@
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import instrumented
+from storage.istorage import IStorage
+from storage.storage_factory import get_backend_class
+
+PARTITION_HASH = "hash"
+PARTITION_DECADE = "decade"
+
+
+class StorageSharded(IStorage):
+    """
+    IStorage that partitions movies across several files in one directory.
+
+    Every shard is a regular StorageJson/StorageCsv file, so a write only
+    rewrites the shard the movie belongs to. Two partitioning schemes exist:
+
+    - "hash":   K shards chosen by a stable hash of the title
+                (movies-00.json ... movies-07.json).
+    - "decade": one shard per decade of the release year
+                (movies-1990s.json, movies-2000s.json, ...). Year-range
+                queries only load the decades that overlap the range.
+    """
+
+    def __init__(self, directory, partition=PARTITION_HASH, shards=8, extension=".json", max_workers=None):
+        """
+        Initialize the StorageSharded object and open the existing shards.
+
+        Args:
+            directory (str): Directory holding the shard files.
+            partition (str): "hash" or "decade".
+            shards (int): Number of shards for hash partitioning.
+            extension (str): Shard file extension, selects the backend (".json" or ".csv").
+            max_workers (int): Threads used to load shards in parallel.
+        """
+        if partition not in (PARTITION_HASH, PARTITION_DECADE):
+            raise ValueError(f"Unknown partition scheme '{partition}'")
+        self.directory = directory
+        self.partition = partition
+        self.shard_count = shards
+        self.extension = extension
+        self._backend_class = get_backend_class(f"shard{extension}")
+        self._max_workers = max_workers
+        self._shards = {}
+        self._locations = {}  # title -> shard key, for the shards in self._scanned
+        self._scanned = set()
+
+        os.makedirs(self.directory, exist_ok=True)
+        if partition == PARTITION_HASH:
+            for number in range(shards):
+                self._shard(f"{number:02d}")
+        else:
+            pattern = re.compile(rf"^movies-(\d{{4}}s){re.escape(extension)}$")
+            for file_name in sorted(os.listdir(self.directory)):
+                match = pattern.match(file_name)
+                if match:
+                    self._shard(match.group(1))
+
+        print(f"[INFO] Storage ready: {self.directory} ({len(self._shards)} {partition} shards)")
+
+    def _shard(self, key):
+        """
+        Return the shard for a key, opening (and creating) it on first use.
+
+        Args:
+            key (str): Shard key, e.g. "03" or "1990s".
+
+        Returns:
+            IStorage: The shard storage.
+        """
+        shard = self._shards.get(key)
+        if shard is None:
+            path = os.path.join(self.directory, f"movies-{key}{self.extension}")
+            shard = self._shards[key] = self._backend_class(path, quiet=True)
+        return shard
+
+    def _shard_key(self, title, year):
+        """
+        Compute the shard key of a movie.
+
+        Args:
+            title (str): The movie title.
+            year (int): The release year.
+
+        Returns:
+            str: The shard key.
+        """
+        if self.partition == PARTITION_HASH:
+            return f"{zlib.crc32(title.encode('utf-8')) % self.shard_count:02d}"
+        return f"{year // 10 * 10}s"
+
+    def _load_shards(self, keys):
+        """
+        Load several shards in parallel and merge them.
+
+        Args:
+            keys (list): Shard keys to load.
+
+        Returns:
+            dict: Movies in the format {title: {rating, year, poster}}.
+        """
+        movies = {}
+        if not keys:
+            return movies
+        shards = [self._shards[key] for key in keys]
+        with ThreadPoolExecutor(max_workers=self._max_workers or len(shards)) as pool:
+            for key, shard_movies in zip(keys, pool.map(lambda shard: shard.list_movies(), shards)):
+                movies.update(shard_movies)
+                self._locations.update(dict.fromkeys(shard_movies, key))
+                self._scanned.add(key)
+        return movies
+
+    def _scan_shard(self, key):
+        """
+        Load one shard and add its titles to the title -> shard map.
+
+        Args:
+            key (str): The shard key.
+
+        Returns:
+            dict: The shard's movies.
+        """
+        movies = self._shards[key].list_movies()
+        self._locations.update(dict.fromkeys(movies, key))
+        self._scanned.add(key)
+        return movies
+
+    def _locate(self, title, hint=None):
+        """
+        Find the shard that currently holds a title.
+
+        With hash partitioning the title decides the shard. With decade
+        partitioning the title -> shard map is filled one shard at a time:
+        the hinted shard first, then the others until the title is found.
+        Each shard is read at most once, and read again only if a mapped
+        title has moved (e.g. after an external edit).
+
+        Args:
+            title (str): The movie title.
+            hint (str): Shard key to look in first, e.g. the decade of the
+                year being added.
+
+        Returns:
+            str or None: The shard key, or None if the movie does not exist.
+        """
+        if self.partition == PARTITION_HASH:
+            key = self._shard_key(title, None)
+            return key if title in self._shards[key].list_movies() else None
+        key = self._locations.get(title)
+        if key is not None:
+            if title in self._scan_shard(key):
+                return key
+            # Moved by someone else: the map can't be trusted any more.
+            self._locations = {}
+            self._scanned = set()
+        keys = sorted(self._shards, key=lambda candidate: candidate != hint)
+        for key in keys:
+            if key not in self._scanned and title in self._scan_shard(key):
+                return key
+        return None
+
+    def data_version(self):
+        """
+        Return a token that changes whenever any shard changes.
+
+        Returns:
+            tuple: ((shard key, shard data version), ...) for all open shards.
+        """
+        return tuple((key, shard.data_version()) for key, shard in sorted(self._shards.items()))
+
+    @instrumented("storage.sharded.list_movies")
+    def list_movies(self):
+        """
+        Retrieve all movies from all shards.
+
+        Returns:
+            dict: Movies in the format {title: {rating, year, poster}}
+        """
+        self._locations = {}
+        return self._load_shards(list(self._shards))
+
+    @instrumented("storage.sharded.list_movies_in_years")
+    def list_movies_in_years(self, start_year, end_year):
+        """
+        Retrieve movies released between start_year and end_year (inclusive).
+
+        With decade partitioning, shards outside the range are not read.
+
+        Args:
+            start_year (int): First year to include.
+            end_year (int): Last year to include.
+
+        Returns:
+            dict: Matching movies in the format {title: {rating, year, poster}}
+        """
+        keys = list(self._shards)
+        if self.partition == PARTITION_DECADE:
+            keys = [key for key in keys if start_year // 10 * 10 <= int(key[:-1]) <= end_year]
+        movies = self._load_shards(keys)
+        return {title: data for title, data in movies.items() if start_year <= data["year"] <= end_year}
+
+    @instrumented("storage.sharded.add_movie")
+    def add_movie(self, title, year, rating, poster):
+        """
+        Add a movie to the shard it belongs to.
+
+        If the title already exists in another decade shard, it is moved.
+
+        Args:
+            title (str): Movie title.
+            year (int): Release year.
+            rating (float): Movie rating.
+            poster (str): Poster URL or path.
+
+        Returns:
+            None
+        """
+        key = self._shard_key(title, year)
+        if self.partition == PARTITION_DECADE:
+            old_key = self._locate(title, hint=key)
+            if old_key is not None and old_key != key:
+                self._shards[old_key].delete_movie(title)
+        self._shard(key).add_movie(title, year, rating, poster)
+        self._locations[title] = key
+
+    @instrumented("storage.sharded.delete_movie")
+    def delete_movie(self, title):
+        """
+        Delete a movie from the shard that holds it.
+
+        Args:
+            title (str): The title of the movie to delete.
+
+        Returns:
+            None
+        """
+        key = self._locate(title)
+        if key is None:
+            print(f"Movie '{title}' does not exist!")
+            return
+        self._shards[key].delete_movie(title)
+        self._locations.pop(title, None)
+
+    @instrumented("storage.sharded.update_movie")
+    def update_movie(self, title, rating):
+        """
+        Update the rating of a movie in the shard that holds it.
+
+        Args:
+            title (str): The title of the movie to update.
+            rating (float): The new rating to assign.
+
+        Returns:
+            None
+        """
+        key = self._locate(title)
+        if key is None:
+            print(f"Movie '{title}' does not exist!")
+            return
+        self._shards[key].update_movie(title, rating)
+
+
+if __name__ == "__main__":
+    # test functions
+    storage = StorageSharded("test_shards", partition=PARTITION_DECADE)
+    storage.add_movie("The Matrix", 1999, 8.7, "https://poster/matrix.jpg")
+    storage.add_movie("Inception", 2010, 8.8, "https://poster/inception.jpg")
+    print(storage.list_movies())
+    print(storage.list_movies_in_years(2000, 2019))
+    storage.update_movie("The Matrix", 9.2)
+    storage.delete_movie("Inception")
+    print(storage.list_movies())
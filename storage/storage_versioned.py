@@ -0,0 +1,374 @@
+import json
+import os
+import re
+import weakref
+from contextlib import contextmanager
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers fall back to optimistic publishing only
+    fcntl = None
+
+from instrumentation import instrumented
+from storage.atomic_file import atomic_write
+from storage.istorage import IStorage
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = "WRITER.lock"
+GENERATION_PATTERN = re.compile(r"^gen-(\d{8})\.json$")
+MAX_READ_ATTEMPTS = 5
+
+
+class Snapshot:
+    """
+    Immutable view of one generation of the catalogue.
+
+    The movies mapping and every record in it are read-only, so a snapshot
+    can be shared between threads and used for stats, listing or a site
+    build while writers publish newer generations.
+    """
+
+    __slots__ = ("generation", "movies", "__weakref__")
+
+    def __init__(self, generation, movies):
+        """
+        Initialize the Snapshot.
+
+        Args:
+            generation (int): The generation number.
+            movies (dict): Movies in the format {title: {rating, year, poster}}.
+        """
+        self.generation = generation
+        self.movies = MappingProxyType({title: MappingProxyType(data) for title, data in movies.items()})
+
+    def to_dict(self):
+        """
+        Return a mutable copy of the movies.
+
+        Returns:
+            dict: Movies in the format {title: {rating, year, poster}}.
+        """
+        return {title: dict(data) for title, data in self.movies.items()}
+
+
+class StorageVersioned(IStorage):
+    """
+    Multi-version (MVCC) storage built from immutable, copy-on-write generations.
+
+    Every write produces a new file gen-<n>.json that is never modified
+    afterwards, and then atomically swaps the CURRENT pointer file to it.
+    Readers load the generation CURRENT points to and keep it for as long as
+    they need, so they never see a half-written file and never wait for a
+    writer. Writers take a short exclusive lock among themselves (readers
+    never do), and a generation file can only be created once, so a writer
+    that still loses a race re-applies its change on top of the winner's
+    generation.
+
+    Only the newest keep_generations generations (plus any still held by a
+    Snapshot in this process) are kept on disk; older ones are deleted.
+    Readers in other processes that lose their generation to this cleanup
+    simply retry with the current one.
+    """
+
+    def __init__(self, directory, keep_generations=3):
+        """
+        Initialize the StorageVersioned object and create the first generation if needed.
+
+        Args:
+            directory (str): Directory holding the generation files.
+            keep_generations (int): Number of recent generations kept on disk.
+        """
+        self.directory = directory
+        self.keep_generations = max(keep_generations, 1)
+        self._snapshot = None
+        self._live_snapshots = weakref.WeakSet()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._writer_lock():
+            # A writer that crashed after linking its generation but before
+            # updating CURRENT left a complete generation behind: publish it.
+            self._advance_current(self._read_current())
+            if self._read_current() == 0:
+                self._publish({}, 0)
+
+        print(f"[INFO] Storage ready: {self.directory}")
+
+    def _generation_path(self, generation):
+        return os.path.join(self.directory, f"gen-{generation:08d}.json")
+
+    def _read_current(self):
+        """
+        Read the generation number the CURRENT pointer refers to.
+
+        Returns:
+            int: The current generation, or 0 if none was published yet.
+        """
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE), "r") as current_file:
+                return int(current_file.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _load_generation(self, generation):
+        """
+        Load one generation file.
+
+        Args:
+            generation (int): The generation to load.
+
+        Returns:
+            Snapshot: The loaded generation.
+
+        Raises:
+            FileNotFoundError: If the generation was garbage-collected.
+        """
+        with open(self._generation_path(generation), "r") as content:
+            return Snapshot(generation, json.load(content))
+
+    @instrumented("storage.versioned.snapshot")
+    def snapshot(self):
+        """
+        Return an immutable snapshot of the current generation.
+
+        The snapshot is cached, so this only reads the small CURRENT file
+        unless a new generation was published.
+
+        Returns:
+            Snapshot: The current generation.
+        """
+        for _ in range(MAX_READ_ATTEMPTS):
+            generation = self._read_current()
+            if self._snapshot is not None and self._snapshot.generation == generation:
+                return self._snapshot
+            try:
+                snapshot = self._load_generation(generation)
+            except FileNotFoundError:
+                continue  # collected between reading CURRENT and opening it
+            self._snapshot = snapshot
+            self._live_snapshots.add(snapshot)
+            return snapshot
+        raise RuntimeError(f"Could not read a stable generation from {self.directory}")
+
+    def _publish(self, movies, base_generation):
+        """
+        Write movies as the generation after base_generation and point CURRENT to it.
+
+        The file is written completely under a temporary name and then
+        hard-linked into place, which fails if another writer already
+        published that generation.
+
+        Args:
+            movies (dict): The new catalogue.
+            base_generation (int): The generation the change was based on.
+
+        Returns:
+            int: The published generation.
+
+        Raises:
+            FileExistsError: If another writer published first.
+        """
+        generation = base_generation + 1
+        temp_path = self._generation_path(generation) + f".{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as file:
+                json.dump(movies, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.link(temp_path, self._generation_path(generation))
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+        self._advance_current(generation)
+        self.collect_garbage()
+        return generation
+
+    def _advance_current(self, generation):
+        """
+        Point CURRENT to the newest complete generation, never backwards.
+
+        A concurrent writer may have published a later generation in the
+        meantime, so the pointer is moved to the last consecutive one.
+
+        Args:
+            generation (int): The generation just published.
+
+        Returns:
+            None
+        """
+        latest = generation
+        while os.path.exists(self._generation_path(latest + 1)):
+            latest += 1
+        if latest > self._read_current():
+            with atomic_write(os.path.join(self.directory, CURRENT_FILE)) as current_file:
+                current_file.write(str(latest))
+
+    @contextmanager
+    def _writer_lock(self):
+        """
+        Serialize writers across processes. Readers never take this lock.
+
+        Without the lock, a slow writer could re-create a generation number
+        that was already published and garbage-collected.
+
+        Yields:
+            None
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _mutate(self, change):
+        """
+        Apply a change to the current generation and publish the result.
+
+        Args:
+            change (callable): Receives a mutable copy of the movies and
+                returns False if the change does not apply.
+
+        Returns:
+            bool: True if a new generation was published.
+        """
+        with self._writer_lock():
+            snapshot = self.snapshot()
+            while True:
+                movies = snapshot.to_dict()
+                if change(movies) is False:
+                    return False
+                try:
+                    self._publish(movies, snapshot.generation)
+                    return True
+                except FileExistsError:
+                    # Another writer won; re-apply the change on top of its generation.
+                    try:
+                        snapshot = self._load_generation(snapshot.generation + 1)
+                    except FileNotFoundError:
+                        snapshot = self.snapshot()  # already collected, CURRENT is past it
+
+    def collect_garbage(self):
+        """
+        Delete generations that are neither recent nor held by a live snapshot.
+
+        Returns:
+            int: Number of generation files deleted.
+        """
+        current = self._read_current()
+        pinned = {snapshot.generation for snapshot in self._live_snapshots}
+        if self._snapshot is not None:
+            pinned.add(self._snapshot.generation)
+        deleted = 0
+        for file_name in os.listdir(self.directory):
+            match = GENERATION_PATTERN.match(file_name)
+            if not match:
+                continue
+            generation = int(match.group(1))
+            if generation <= current - self.keep_generations and generation not in pinned:
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                    deleted += 1
+                except OSError:
+                    pass
+        return deleted
+
+    def data_version(self):
+        """
+        Return the current generation, which changes with every published write.
+
+        Returns:
+            int: The generation CURRENT points to.
+        """
+        return self._read_current()
+
+    def list_movies(self):
+        """
+        Retrieve all movies from the current generation.
+
+        Returns:
+            dict: A copy of the movies in the format {title: {rating, year, poster}}.
+                Use snapshot().movies to read them without copying.
+        """
+        return self.snapshot().to_dict()
+
+    @instrumented("storage.versioned.add_movie")
+    def add_movie(self, title, year, rating, poster):
+        """
+        Add a new movie by publishing a new generation.
+
+        Args:
+            title (str): The title of the movie.
+            year (int): The release year of the movie.
+            rating (float): The rating of the movie.
+            poster (str): URL or path to the movie poster.
+
+        Returns:
+            None
+        """
+        def change(movies):
+            movies[title] = {"rating": float(round(rating, 1)), "year": year, "poster": poster}
+
+        self._mutate(change)
+        print(f"Movie '{title}' added successfully.")
+
+    @instrumented("storage.versioned.delete_movie")
+    def delete_movie(self, title):
+        """
+        Delete a movie by publishing a new generation.
+
+        Args:
+            title (str): The title of the movie to delete.
+
+        Returns:
+            None
+        """
+        def change(movies):
+            if title not in movies:
+                return False
+            del movies[title]
+
+        if self._mutate(change):
+            print(f"Movie '{title}' deleted successfully.")
+        else:
+            print(f"Movie '{title}' does not exist!")
+
+    @instrumented("storage.versioned.update_movie")
+    def update_movie(self, title, rating):
+        """
+        Update the rating of a movie by publishing a new generation.
+
+        Args:
+            title (str): The title of the movie to update.
+            rating (float): The new rating to assign.
+
+        Returns:
+            None
+        """
+        def change(movies):
+            if title not in movies:
+                return False
+            movies[title]["rating"] = float(round(rating, 1))
+
+        if self._mutate(change):
+            print(f"Movie '{title}' updated successfully. New rating: {rating}")
+        else:
+            print(f"Movie '{title}' does not exist!")
+
+
+if __name__ == "__main__":
+    # test functions
+    storage = StorageVersioned("test_versions")
+    storage.add_movie("Inception", 2010, 8.8, "https://poster.url/inception.jpg")
+    before = storage.snapshot()
+    storage.update_movie("Inception", 9.5)
+    print(before.generation, dict(before.movies["Inception"]))
+    print(storage.snapshot().generation, storage.list_movies())
+    storage.delete_movie("Inception")
+    print(storage.list_movies())
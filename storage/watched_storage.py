@@ -0,0 +1,305 @@
+import threading
+
+from instrumentation import instrumented
+from storage.file_watch import file_signature, watch_file
+from storage.istorage import IStorage
+from storage.movie import Movie
+from storage.random_index import RandomIndex, pick_random_title
+
+
+class WatchedStorage(IStorage):
+    """
+    In-memory copy of a file-based catalogue (JSON or CSV) that is refreshed
+    only when the file really changes.
+
+    The backends reload the whole file on every call. For long-running
+    processes (the interactive app, the HTTP server) this proxy keeps the
+    movies in memory and asks a file watcher (storage/file_watch.py) before
+    every read whether the file changed. With inotify that costs one
+    non-blocking system call and nothing at all while idle.
+
+    Writes save the changed catalogue through the backend without
+    reloading, and only replace the in-memory copy once the file was
+    written. When another process has changed the file, it is
+    parsed again. JSON and CSV files are rewritten as a whole, so there is
+    no smaller unit to reparse. The result is then diffed against the
+    in-memory copy: only added, removed and changed titles are applied,
+    so the random index is updated rather than rebuilt. A rewrite with
+    identical content (e.g. a sync job touching the file) does not change
+    data_version(), so query caches stay valid.
+    """
+
+    def __init__(self, backend, watcher=None):
+        """
+        Initialize the WatchedStorage object and load the catalogue.
+
+        Args:
+            backend (IStorage): A StorageJson or StorageCsv.
+            watcher: Object with changed() and close() for backend.file_path.
+                Defaults to watch_file(backend.file_path).
+        """
+        if not (hasattr(backend, "_load_data") and hasattr(backend, "_write_data")):
+            raise TypeError(f"{type(backend).__name__} does not support file watching")
+        self.backend = backend
+        self._lock = threading.RLock()
+        # Start watching before loading, so no change can slip in between.
+        self._watcher = watcher if watcher is not None else watch_file(backend.file_path)
+        self._signature = file_signature(backend.file_path)
+        self._movies = backend._load_data()
+        self._version = 0
+        self._random_index = None
+        self.reloads = 0
+        self.last_diff = None
+
+    @property
+    def file_path(self):
+        return self.backend.file_path
+
+    @property
+    def watch_method(self):
+        """How changes are detected: "inotify" or "poll"."""
+        return self._watcher.method
+
+    @instrumented("storage.watched.refresh")
+    def refresh(self):
+        """
+        Pick up changes made to the file by other processes.
+
+        Called before every read. Does nothing unless the watcher reports
+        a change and the file is no longer the one this object last wrote
+        or read.
+
+        Returns:
+            bool: True if the movies changed.
+        """
+        with self._lock:
+            if not self._watcher.changed():
+                return False
+            signature = file_signature(self.file_path)
+            if signature == self._signature:
+                return False  # our own write
+            self._signature = signature
+            self.reloads += 1
+            return self._apply(self.backend._load_data())
+
+    def _apply(self, movies):
+        """
+        Apply the difference between the in-memory copy and a fresh load.
+
+        Args:
+            movies (dict): The catalogue as just read from the file.
+
+        Returns:
+            bool: True if anything differed.
+        """
+        current = self._movies
+        added = movies.keys() - current.keys()
+        removed = current.keys() - movies.keys()
+        changed = [title for title in movies.keys() & current.keys() if movies[title] != current[title]]
+        self.last_diff = {"added": len(added), "removed": len(removed), "changed": len(changed)}
+        if not (added or removed or changed):
+            return False
+        for title in removed:
+            del current[title]
+        for title in added:
+            current[title] = movies[title]
+        for title in changed:
+            current[title] = movies[title]
+        if self._random_index is not None:
+            for title in removed:
+                self._random_index.remove(title)
+            for title in added:
+                self._random_index.add(title)
+            self._random_index.invalidate_weights()
+        self._version += 1
+        return True
+
+    def _save(self, movies):
+        """
+        Write movies through the backend and make them the in-memory copy.
+
+        Args:
+            movies (dict): The changed catalogue.
+
+        Returns:
+            bool: True if the file was written. Otherwise the in-memory copy
+            is left as it was and the error is printed.
+        """
+        try:
+            self.backend._write_data(movies)
+        except (OSError, TypeError) as e:
+            print(f"Error while saving the file: {e}")
+            return False
+        self._movies = movies
+        self._signature = file_signature(self.file_path)
+        self._version += 1
+        return True
+
+    def data_version(self):
+        """
+        Return a token that changes whenever the movies change.
+
+        Returns:
+            int: Number of changes applied to the in-memory copy.
+        """
+        self.refresh()
+        return self._version
+
+    @instrumented("storage.watched.list_movies")
+    def list_movies(self):
+        """
+        Retrieve all movies from memory, refreshed if the file changed.
+
+        Returns:
+            dict: Movies in the format {title: {rating, year, poster}}
+        """
+        self.refresh()
+        with self._lock:
+            return {title: dict(data) for title, data in self._movies.items()}
+
+    def iter_movies(self):
+        """
+        Yield movies from a snapshot of the in-memory copy.
+
+        Yields:
+            tuple: (title, {"rating", "year", "poster"})
+        """
+        yield from self.list_movies().items()
+
+    def list_movie_records(self):
+        """
+        Retrieve all movies as compact Movie records, without reparsing the file.
+
+        Returns:
+            dict: {title: Movie}
+        """
+        self.refresh()
+        with self._lock:
+            return {title: Movie.from_dict(data) for title, data in self._movies.items()}
+
+    def list_movies_in_years(self, start_year, end_year):
+        """
+        Retrieve movies released between start_year and end_year (inclusive).
+
+        Args:
+            start_year (int): First year to include.
+            end_year (int): Last year to include.
+
+        Returns:
+            dict: Matching movies in the format {title: {rating, year, poster}}.
+        """
+        self.refresh()
+        with self._lock:
+            return {title: dict(data) for title, data in self._movies.items()
+                    if start_year <= data["year"] <= end_year}
+
+    @instrumented("storage.watched.add_movie")
+    def add_movie(self, title, year, rating, poster):
+        """
+        Add a new movie and save the catalogue.
+
+        Args:
+            title (str): The title of the movie.
+            year (int): The release year of the movie.
+            rating (float): The rating of the movie.
+            poster (str): URL or path to the movie poster.
+
+        Returns:
+            None
+        """
+        self.refresh()
+        with self._lock:
+            movies = {**self._movies, title: {"rating": float(round(rating, 1)), "year": year, "poster": poster}}
+            if not self._save(movies):
+                return
+            if self._random_index is not None:
+                self._random_index.add(title)
+        print(f"Movie '{title}' added successfully.")
+
+    @instrumented("storage.watched.delete_movie")
+    def delete_movie(self, title):
+        """
+        Delete a movie by title and save the catalogue.
+
+        Args:
+            title (str): The title of the movie to delete.
+
+        Returns:
+            None
+        """
+        self.refresh()
+        with self._lock:
+            if title not in self._movies:
+                print(f"Movie '{title}' does not exist!")
+                return
+            movies = dict(self._movies)
+            del movies[title]
+            if not self._save(movies):
+                return
+            if self._random_index is not None:
+                self._random_index.remove(title)
+        print(f"Movie '{title}' deleted successfully.")
+
+    @instrumented("storage.watched.update_movie")
+    def update_movie(self, title, rating):
+        """
+        Update the rating of an existing movie and save the catalogue.
+
+        Args:
+            title (str): The title of the movie to update.
+            rating (float): The new rating to assign.
+
+        Returns:
+            None
+        """
+        self.refresh()
+        with self._lock:
+            if title not in self._movies:
+                print(f"Movie '{title}' does not exist!")
+                return
+            movies = {**self._movies, title: {**self._movies[title], "rating": float(round(rating, 1))}}
+            if not self._save(movies):
+                return
+            if self._random_index is not None:
+                self._random_index.invalidate_weights()
+        print(f"Movie '{title}' updated successfully. New rating: {rating}")
+
+    def random_movie(self, weighted_by=None, start_year=None, end_year=None):
+        """
+        Select a random movie from the in-memory copy.
+
+        Args:
+            weighted_by (str): Movie field to weight by (e.g. "rating"), or None
+                for a uniform pick.
+            start_year (int): Only consider movies released in or after this year.
+            end_year (int): Only consider movies released in or before this year.
+
+        Returns:
+            tuple or None: Movie title and its details, or None if no movie matches.
+        """
+        self.refresh()
+        with self._lock:
+            if self._random_index is None:
+                self._random_index = RandomIndex(self._movies)
+            title = pick_random_title(self._random_index, self._movies, weighted_by, start_year, end_year)
+            return (title, dict(self._movies[title])) if title is not None else None
+
+    def close(self):
+        """
+        Stop watching the file.
+
+        Returns:
+            None
+        """
+        self._watcher.close()
+
+
+if __name__ == "__main__":
+    # test functions
+    from storage.storage_json import StorageJson
+
+    storage = WatchedStorage(StorageJson("test_watched.json"))
+    storage.add_movie("Inception", 2010, 8.8, "https://poster.url/inception.jpg")
+    print(storage.watch_method, storage.data_version(), storage.list_movies())
+    StorageJson("test_watched.json").update_movie("Inception", 9.1)
+    print(storage.data_version(), storage.last_diff, storage.list_movies())
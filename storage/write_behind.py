@@ -0,0 +1,271 @@
+import atexit
+import threading
+import weakref
+
+from instrumentation import instrumented
+from storage.istorage import IStorage
+from storage.random_index import RandomIndex, pick_random_title
+
+DEFAULT_DELAY = 2.0
+DEFAULT_MAX_PENDING = 100
+
+
+def _flush_at_exit(reference):
+    storage = reference()
+    if storage is not None:
+        try:
+            storage.flush()
+        except (OSError, TypeError) as e:
+            print(f"Error while saving the file: {e}. {storage.pending} changes were not saved.")
+
+
+class WriteBehindStorage(IStorage):
+    """
+    Opt-in write-behind buffering for the file-based backends (JSON and CSV).
+
+    The catalogue is loaded once and kept in memory. Mutations change the
+    in-memory copy immediately, so every read sees them, and the file is
+    rewritten once for a whole burst of changes:
+
+    - delay seconds after the last mutation (debounce),
+    - as soon as max_pending mutations are waiting,
+    - on flush(), which MovieApp.run calls when the user exits,
+    - at normal interpreter exit (atexit).
+
+    If a write fails, the mutations stay pending: a background write
+    prints the error and tries again delay seconds later, and flush()
+    raises the error to its caller.
+
+    Durability: a mutation is only on disk after the next flush. If the
+    process is killed or crashes before that, up to max_pending mutations
+    from the last delay seconds are lost. Each flush replaces the file
+    atomically, so the file always holds either the previous or the new
+    complete catalogue, never a partial write. While buffering, the
+    in-memory copy is authoritative: changes made to the file by another
+    process are not seen and are overwritten by the next flush, so use
+    write-behind only when this process is the single writer.
+    """
+
+    def __init__(self, backend, delay=DEFAULT_DELAY, max_pending=DEFAULT_MAX_PENDING):
+        """
+        Initialize the WriteBehindStorage object and load the catalogue.
+
+        Args:
+            backend (IStorage): A StorageJson or StorageCsv to write through to.
+            delay (float): Seconds of inactivity after which pending changes are written.
+            max_pending (int): Number of pending mutations that triggers an immediate write.
+        """
+        if not (hasattr(backend, "_load_data") and hasattr(backend, "_write_data")):
+            raise TypeError(f"{type(backend).__name__} does not support write-behind buffering")
+        self.backend = backend
+        self.delay = delay
+        self.max_pending = max(max_pending, 1)
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._pending = 0
+        self._version = 0
+        self._movies = backend._load_data()
+        self._random_index = None
+
+        # A weak reference, so registering does not keep the storage alive.
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @property
+    def file_path(self):
+        return self.backend.file_path
+
+    @property
+    def pending(self):
+        """Number of mutations not yet written to disk."""
+        return self._pending
+
+    def _mutated(self):
+        """
+        Record one mutation and schedule or trigger the write.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._pending += 1
+            self._version += 1
+            if self._pending >= self.max_pending:
+                flush_now = True
+            else:
+                flush_now = False
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._schedule()
+        if flush_now:
+            self.flush()
+
+    def _schedule(self):
+        """
+        (Re)start the debounce timer. Call with self._lock held.
+
+        Returns:
+            None
+        """
+        self._timer = threading.Timer(self.delay, self._flush_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_in_background(self):
+        """
+        Timer callback: flush, and on failure report the error and retry later.
+
+        Returns:
+            None
+        """
+        try:
+            self.flush()
+        except (OSError, TypeError) as e:
+            print(f"Error while saving the file: {e}. Retrying in {self.delay:g} seconds.")
+            with self._lock:
+                if self._pending and self._timer is None:
+                    self._schedule()
+
+    @instrumented("storage.write_behind.flush")
+    def flush(self):
+        """
+        Write all pending mutations to disk now.
+
+        Returns:
+            int: Number of mutations written (0 if nothing was pending).
+
+        Raises:
+            OSError: If the file cannot be written. The mutations stay pending.
+            TypeError: If the movies cannot be serialized. The mutations stay pending.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending = self._pending
+                if not pending:
+                    return 0
+                snapshot = dict(self._movies)
+                self._pending = 0
+            try:
+                self.backend._write_data(snapshot)
+            except Exception:
+                with self._lock:
+                    self._pending += pending  # keep them for the next attempt
+                raise
+            return pending
+
+    def data_version(self):
+        """
+        Return a token that changes with every buffered mutation.
+
+        Returns:
+            int: The number of mutations applied in memory.
+        """
+        return self._version
+
+    def list_movies(self):
+        """
+        Retrieve all movies, including changes not yet written to disk.
+
+        Returns:
+            dict: Movies in the format {title: {rating, year, poster}}
+        """
+        with self._lock:
+            return {title: dict(data) for title, data in self._movies.items()}
+
+    @instrumented("storage.write_behind.add_movie")
+    def add_movie(self, title, year, rating, poster):
+        """
+        Add a new movie in memory and schedule the write.
+
+        Args:
+            title (str): The title of the movie.
+            year (int): The release year of the movie.
+            rating (float): The rating of the movie.
+            poster (str): URL or path to the movie poster.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._movies[title] = {"rating": float(round(rating, 1)), "year": year, "poster": poster}
+            if self._random_index is not None:
+                self._random_index.add(title)
+        self._mutated()
+        print(f"Movie '{title}' added successfully.")
+
+    @instrumented("storage.write_behind.delete_movie")
+    def delete_movie(self, title):
+        """
+        Delete a movie in memory and schedule the write.
+
+        Args:
+            title (str): The title of the movie to delete.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if title not in self._movies:
+                print(f"Movie '{title}' does not exist!")
+                return
+            del self._movies[title]
+            if self._random_index is not None:
+                self._random_index.remove(title)
+        self._mutated()
+        print(f"Movie '{title}' deleted successfully.")
+
+    @instrumented("storage.write_behind.update_movie")
+    def update_movie(self, title, rating):
+        """
+        Update the rating of a movie in memory and schedule the write.
+
+        Args:
+            title (str): The title of the movie to update.
+            rating (float): The new rating to assign.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if title not in self._movies:
+                print(f"Movie '{title}' does not exist!")
+                return
+            # A new dict, so snapshots taken by a running flush stay unchanged.
+            self._movies[title] = {**self._movies[title], "rating": float(round(rating, 1))}
+            if self._random_index is not None:
+                self._random_index.invalidate_weights()
+        self._mutated()
+        print(f"Movie '{title}' updated successfully. New rating: {rating}")
+
+    def random_movie(self, weighted_by=None, start_year=None, end_year=None):
+        """
+        Select a random movie from the in-memory catalogue.
+
+        Args:
+            weighted_by (str): Movie field to weight by (e.g. "rating"), or None
+                for a uniform pick.
+            start_year (int): Only consider movies released in or after this year.
+            end_year (int): Only consider movies released in or before this year.
+
+        Returns:
+            tuple or None: Movie title and its details, or None if no movie matches.
+        """
+        with self._lock:
+            if self._random_index is None:
+                self._random_index = RandomIndex(self._movies)
+            title = pick_random_title(self._random_index, self._movies, weighted_by, start_year, end_year)
+            return (title, dict(self._movies[title])) if title is not None else None
+
+
+if __name__ == "__main__":
+    # test functions
+    from storage.storage_json import StorageJson
+
+    storage = WriteBehindStorage(StorageJson("test_write_behind.json"), delay=0.5)
+    for rating in (7.0, 7.5, 8.0, 8.5):
+        storage.add_movie("Inception", 2010, rating, "https://poster.url/inception.jpg")
+    print(storage.pending, storage.list_movies())
+    print(storage.flush(), storage.pending)
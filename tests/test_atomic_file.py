@@ -0,0 +1,64 @@
+import os
+import stat
+
+import pytest
+
+from storage import atomic_file
+from storage.atomic_file import atomic_write
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.parametrize("mode", [0o644, 0o664, 0o600])
+def test_atomic_write_keeps_mode_of_replaced_file(tmp_path, mode):
+    path = tmp_path / "movies.json"
+    path.write_text("{}")
+    os.chmod(path, mode)
+
+    with atomic_write(str(path)) as file:
+        file.write('{"a": 1}')
+
+    assert path.read_text() == '{"a": 1}'
+    assert _mode(path) == mode
+
+
+@pytest.mark.parametrize("umask, mode", [(0o022, 0o644), (0o002, 0o664), (0o077, 0o600)])
+def test_atomic_write_new_file_follows_umask(tmp_path, monkeypatch, umask, mode):
+    monkeypatch.setattr(atomic_file, "_UMASK", umask)
+    path = tmp_path / "new.json"
+
+    with atomic_write(str(path)) as file:
+        file.write("{}")
+
+    assert _mode(path) == mode
+
+
+def test_atomic_write_failure_leaves_target_and_no_temp_file(tmp_path):
+    path = tmp_path / "movies.json"
+    path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as file:
+            file.write("new")
+            raise RuntimeError("boom")
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["movies.json"]
+
+
+@pytest.mark.parametrize("backend, name", [(StorageJson, "movies.json"), (StorageCsv, "movies.csv"),
+                                           (StorageJson, "movies.json.gz")])
+def test_backend_saves_keep_mode(tmp_path, backend, name):
+    path = str(tmp_path / name)
+    storage = backend(path)
+    storage.add_movie("Inception", 2010, 8.8, "poster")
+    os.chmod(path, 0o644)
+
+    storage.update_movie("Inception", 9.1)
+    storage.delete_movie("Inception")
+
+    assert _mode(path) == 0o644
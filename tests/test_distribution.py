@@ -0,0 +1,73 @@
+import random
+import statistics
+
+import pytest
+
+from distribution import RATING_BUCKETS, RatingDistribution
+from storage.storage_json import StorageJson
+
+
+def _movies(ratings, year=2000):
+    return {f"movie {number}": {"rating": rating, "year": year, "poster": ""}
+            for number, rating in enumerate(ratings)}
+
+
+def test_ratings_are_counted_per_tenth_including_the_edges():
+    distribution = RatingDistribution.from_movies(_movies([0.0, 0.04, 5.5, 9.96, 10.0]))
+
+    assert len(distribution.rating_counts) == RATING_BUCKETS
+    assert distribution.rating_counts[0] == 2
+    assert distribution.rating_counts[55] == 1
+    assert distribution.rating_counts[100] == 2
+    assert distribution.count == 5
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100, 1001])
+def test_median_and_average_match_statistics(size):
+    generator = random.Random(size)
+    ratings = [round(generator.choice([0.0, 10.0, generator.uniform(0, 10)]), 1) for _ in range(size)]
+
+    distribution = RatingDistribution.from_movies(_movies(ratings))
+
+    assert distribution.median() == round(statistics.median(ratings), 1)
+    assert distribution.average() == round(statistics.mean(ratings), 1)
+
+
+def test_percentiles_interpolate_between_ranks():
+    distribution = RatingDistribution.from_movies(_movies([1.0, 2.0, 3.0, 4.0]))
+
+    assert distribution.percentile(0) == 1.0
+    assert distribution.percentile(50) == 2.5
+    assert distribution.percentile(100) == 4.0
+
+
+def test_histogram_puts_ten_in_the_last_bin():
+    histogram = RatingDistribution.from_movies(_movies([0.0, 0.9, 1.0, 9.9, 10.0])).rating_histogram()
+
+    assert len(histogram) == 10
+    assert histogram[(0.0, 1.0)] == 2
+    assert histogram[(1.0, 2.0)] == 1
+    assert histogram[(9.0, 10.0)] == 2
+
+
+def test_decades_and_empty_distribution():
+    movies = {"a": {"rating": 8.0, "year": 1994}, "b": {"rating": 6.0, "year": 1999},
+              "c": {"rating": 7.0, "year": 2001}}
+    distribution = RatingDistribution.from_movies(movies)
+
+    assert distribution.decade_counts() == {1990: 2, 2000: 1}
+    assert distribution.decade_averages() == {1990: 7.0, 2000: 7.0}
+    empty = RatingDistribution()
+    assert (empty.median(), empty.average(), empty.percentile(50)) == (None, None, None)
+
+
+def test_streamed_storage_gives_the_same_distribution(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    for title, year, rating in (("Heat", 1995, 8.3), ("Alien", 1979, 8.5), ("Cats", 2019, 2.8)):
+        storage.add_movie(title, year, rating, "")
+
+    streamed = RatingDistribution.from_records(details for _, details in storage.iter_movies())
+    loaded = RatingDistribution.from_movies(storage.list_movies())
+
+    assert streamed.rating_counts == loaded.rating_counts
+    assert streamed.year_counts == loaded.year_counts
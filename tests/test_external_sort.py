@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+import external_sort
+from external_sort import SORT_KEYS, external_sort as sort_stream, movie_filter, paginate, sort_catalogue_file
+from storage.formats import iter_catalogue, write_catalogue
+
+
+@pytest.fixture
+def movies():
+    generator = random.Random(39)
+    # Few distinct ratings and years, so most keys are tied.
+    return [(f"Movie {number}, \"part\" {generator.randint(1, 3)} é",
+             {"rating": generator.choice([0.0, 5.5, 7.3, 10.0]), "year": generator.choice([1979, 1995, 2019]),
+              "poster": generator.choice(["", "https://img/a.jpg", "line\nbreak"])})
+            for number in range(3000)]
+
+
+@pytest.fixture
+def tiny_runs(monkeypatch):
+    # A few rows per run and at most 4 open runs: about 600 runs merged in several passes.
+    monkeypatch.setattr(external_sort, "MIN_MEMORY_BUDGET", 0)
+    monkeypatch.setattr(external_sort, "MAX_MERGE_FAN_IN", 4)
+    return 2000
+
+
+@pytest.mark.parametrize("key", sorted(SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_multi_pass_merge_matches_sorted_including_ties(movies, tiny_runs, tmp_path, key, descending):
+    result = list(sort_stream(iter(movies), key, descending, memory_budget=tiny_runs, temp_dir=str(tmp_path)))
+
+    assert result == sorted(movies, key=SORT_KEYS[key], reverse=descending)
+    assert list(tmp_path.iterdir()) == []  # run files are cleaned up
+
+
+def test_filter_and_in_memory_path_match_sorted(movies):
+    predicate = movie_filter(5.5, 1990, 2020)
+
+    result = list(sort_stream(movies, "rating", True, predicate))
+
+    assert result == sorted(filter(predicate, movies), key=SORT_KEYS["rating"], reverse=True)
+
+
+def test_paginate_takes_one_page_of_the_stream(movies, tiny_runs):
+    expected = sorted(movies, key=SORT_KEYS["year"])
+
+    page = paginate(sort_stream(movies, "year", memory_budget=tiny_runs), 3, 50)
+
+    assert list(page.items()) == expected[100:150]
+
+
+def test_sort_catalogue_file_writes_the_sorted_catalogue(movies, tiny_runs, tmp_path):
+    source, target = str(tmp_path / "movies.csv"), str(tmp_path / "sorted.ndjson")
+    write_catalogue(source, movies)
+
+    written = sort_catalogue_file(source, target, "title", True, movie_filter(7.0), memory_budget=tiny_runs)
+
+    expected = sorted(filter(movie_filter(7.0), movies), key=SORT_KEYS["title"], reverse=True)
+    assert written == len(expected)
+    assert list(iter_catalogue(target)) == expected
+
+
+def test_unknown_sort_key_is_rejected(movies):
+    with pytest.raises(ValueError):
+        list(sort_stream(movies, "poster"))
@@ -0,0 +1,50 @@
+import pytest
+
+from facet_index import FacetIndex, parse_facet_query
+
+MOVIES = {
+    "Inception": {"rating": 8.8, "year": 2010},
+    "Memento": {"rating": 8.4, "year": 2000},
+    "Titanic": {"rating": 7.9, "year": 1997},
+}
+PAYLOADS = [
+    ("Inception", {"Genre": "Action, Sci-Fi", "Director": "Christopher Nolan", "Actors": "Leonardo DiCaprio"}),
+    ("Memento", {"Genre": "Mystery, Thriller", "Director": "Christopher Nolan", "Actors": "Guy Pearce"}),
+    ("Titanic", {"Genre": "Drama, Romance", "Director": "James Cameron", "Actors": "Leonardo DiCaprio"}),
+]
+
+
+def test_parses_terms_and_bounds():
+    query = parse_facet_query("genre:drama & nolan and rating>=8, year<2000")
+
+    assert query.terms == (("genre", "drama"), (None, "nolan"))
+    assert query.min_rating == 8.0
+    assert query.end_year == 1999
+
+
+@pytest.mark.parametrize("text", ["", "   ", " & ", "genre:", "drama & director: "])
+def test_empty_query_or_facet_value_is_rejected(text):
+    with pytest.raises(ValueError):
+        parse_facet_query(text)
+
+
+@pytest.mark.parametrize("text", ["rating>=11", "rating<-1", "year>=99999", "year<=999", "rating=ten"])
+def test_out_of_range_or_invalid_bound_is_rejected(text):
+    with pytest.raises(ValueError):
+        parse_facet_query(text)
+
+
+@pytest.mark.parametrize("text", ["rating>=0", "rating<=10", "year>=1000", "year<=9999"])
+def test_bounds_at_the_limits_are_accepted(text):
+    parse_facet_query(text)
+
+
+def test_search_intersects_terms_and_applies_bounds():
+    index = FacetIndex.build(MOVIES, PAYLOADS)
+
+    result = index.search(parse_facet_query("director:nolan & rating>=8.5"))
+    assert list(result["movies"]) == ["Inception"]
+
+    result = index.search(parse_facet_query("dicaprio"))
+    assert list(result["movies"]) == ["Inception", "Titanic"]
+    assert ("Leonardo DiCaprio", 2) in result["facets"]["actor"]
@@ -0,0 +1,69 @@
+import threading
+import tracemalloc
+
+import pytest
+
+import instrumentation
+from instrumentation import get_stats, measure
+
+MIB = 1 << 20
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    instrumentation.reset_stats()
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    instrumentation.reset_stats()
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def _peak(name):
+    return get_stats()[name]["peak_memory_bytes"]
+
+
+def _allocate_and_free(size):
+    buffer = bytearray(size)
+    del buffer
+
+
+def test_nested_call_keeps_the_outer_peak():
+    with measure("outer"):
+        _allocate_and_free(8 * MIB)
+        with measure("inner"):
+            _allocate_and_free(1 * MIB)
+
+    assert _peak("outer") >= 8 * MIB
+    assert 1 * MIB <= _peak("inner") < 8 * MIB
+
+
+def test_inner_peak_counts_towards_the_outer_frame():
+    with measure("outer"):
+        with measure("inner"):
+            _allocate_and_free(4 * MIB)
+
+    assert _peak("outer") >= 4 * MIB
+    assert get_stats()["outer"]["calls"] == get_stats()["inner"]["calls"] == 1
+
+
+def test_other_threads_do_not_erase_a_running_peak():
+    allocated = threading.Event()
+    measured = threading.Event()
+
+    def other_thread():
+        allocated.wait(5)
+        with measure("other"):
+            pass
+        measured.set()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    with measure("busy"):
+        _allocate_and_free(8 * MIB)
+        allocated.set()
+        measured.wait(5)
+    thread.join()
+
+    assert _peak("busy") >= 8 * MIB
@@ -0,0 +1,52 @@
+import inspect
+
+import pytest
+
+from storage.istorage import IStorage
+from storage.lazy_storage import LazyStorage
+
+PUBLIC_METHODS = sorted(name for name, member in vars(IStorage).items()
+                        if callable(member) and not name.startswith("_"))
+
+
+class RecordingStorage(IStorage):
+    """Backend that overrides every IStorage method and records the calls."""
+
+    file_path = "recording.json"
+
+    def __init__(self):
+        self.calls = []
+
+
+def _recorder(name):
+    def method(self, *args):
+        self.calls.append((name, args))
+        return name
+    return method
+
+
+for _name in PUBLIC_METHODS:
+    setattr(RecordingStorage, _name, _recorder(_name))
+RecordingStorage.__abstractmethods__ = frozenset()
+
+
+@pytest.mark.parametrize("name", PUBLIC_METHODS)
+def test_every_istorage_method_reaches_the_backend(name):
+    backend = RecordingStorage()
+    storage = LazyStorage(lambda: backend)
+    storage.backend  # flush() skips a backend that was never opened
+    arguments = tuple(range(len(inspect.signature(getattr(IStorage, name)).parameters) - 1))
+
+    assert getattr(storage, name)(*arguments) == name
+    assert backend.calls == [(name, arguments)]
+
+
+def test_backend_is_created_on_first_use_only():
+    created = []
+    storage = LazyStorage(lambda: created.append(RecordingStorage()) or created[-1])
+
+    assert storage.flush() == 0
+    assert created == []
+    assert storage.file_path == "recording.json"
+    storage.list_movies()
+    assert len(created) == 1
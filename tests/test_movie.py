@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from storage import movie
+from storage.movie import Movie, MovieRecord, decode_json_records
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from storage.watched_storage import WatchedStorage
+
+DOCUMENT = json.dumps({
+    "Heat": {"rating": 8.3, "year": 1995, "poster": "https://img/heat.jpg"},
+    "Alien": {"rating": 8, "year": 1979, "poster": ""},
+    "Cats": {"rating": 2.8, "year": 2019},
+})
+
+
+@pytest.fixture(params=["msgspec", "generic"])
+def decoder(request, monkeypatch):
+    if request.param == "msgspec":
+        pytest.importorskip("msgspec")
+    else:
+        monkeypatch.setattr(movie, "_msgspec", False)
+    return request.param
+
+
+def test_decodes_records_with_typed_fields(decoder):
+    records = decode_json_records(DOCUMENT)
+
+    assert list(records) == ["Heat", "Alien", "Cats"]
+    assert all(isinstance(record, MovieRecord) for record in records.values())
+    assert records["Alien"] == Movie(8.0, 1979, "")
+    assert type(records["Alien"].rating) is float
+    assert records["Cats"]["poster"] == "" and records["Cats"].get("title") is None
+    assert records["Heat"].to_dict() == {"rating": 8.3, "year": 1995, "poster": "https://img/heat.jpg"}
+
+
+def test_null_poster_falls_back_to_the_generic_path(decoder):
+    records = decode_json_records('{"Heat": {"rating": 8.3, "year": 1995, "poster": null}}')
+
+    assert records == {"Heat": Movie(8.3, 1995, "")}
+
+
+def test_invalid_json_raises_json_decode_error(decoder):
+    with pytest.raises(json.JSONDecodeError):
+        decode_json_records('{"Heat": {"rating": 8.3,')
+
+
+@pytest.mark.parametrize("name", ["movies.json", "movies.json.gz", "movies.csv"])
+def test_records_match_list_movies(tmp_path, name, decoder):
+    backend_class = StorageCsv if ".csv" in name else StorageJson
+    storage = backend_class(str(tmp_path / name))
+    storage.add_movie("Heat", 1995, 8.3, "https://img/heat.jpg")
+    storage.add_movie("Alien", 1979, 8.0, "")
+    storage.add_movie("Amélie", 2001, 8.3, "https://img/amélie.jpg")
+
+    watched = WatchedStorage(storage)
+    for candidate in (storage, watched):
+        records = candidate.list_movie_records()
+        assert list(records) == list(candidate.list_movies())
+        assert {title: record.to_dict() for title, record in records.items()} == candidate.list_movies()
+    watched.close()
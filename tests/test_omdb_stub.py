@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import fetch_movie
+from benchmarks.omdb_stub import ABOUT_KEY, DEFAULT_FIXTURES, FixtureStore, start_stub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    servers = []
+
+    def start(**conditions):
+        server = start_stub(DEFAULT_FIXTURES, mode="replay", **conditions)
+        servers.append(server)
+        monkeypatch.setenv("OMDB_BASE_URL", server.base_url)
+        return server
+
+    monkeypatch.setattr(fetch_movie, "_api_key", "test")
+    monkeypatch.setattr(fetch_movie, "_retry_delay", lambda response, attempt: 0)
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fixtures_carry_metadata_for_facets_and_recommendations():
+    fixtures = FixtureStore(DEFAULT_FIXTURES)
+
+    assert fixtures.about and len(fixtures) == 20
+    matrix = fixtures.get("The Matrix")
+    assert matrix["Genre"] == "Action, Sci-Fi" and "Wachowski" in matrix["Director"]
+    with_genre = [key for key in json.load(open(DEFAULT_FIXTURES)) if key != ABOUT_KEY
+                  and fixtures.get(key)["Genre"] != "N/A"]
+    assert len(with_genre) >= 18
+
+
+def test_recording_keeps_the_about_entry(tmp_path):
+    path = tmp_path / "omdb.json"
+    path.write_text(json.dumps({ABOUT_KEY: "hand-written", "heat": {"Title": "Heat"}}))
+    fixtures = FixtureStore(str(path))
+
+    fixtures.record("Alien", {"Title": "Alien"})
+
+    assert list(json.loads(path.read_text())) == [ABOUT_KEY, "alien", "heat"]
+
+
+def test_fetch_replays_fixture(stub):
+    stub()
+
+    data = fetch_movie.fetch_movie_data("pulp fiction")
+
+    assert fetch_movie.parse_movie_data(data) == ("Pulp Fiction", 1994, 8.9, data["Poster"])
+    assert data["Director"] == "Quentin Tarantino"
+
+
+def test_fetch_retries_server_errors(stub):
+    server = stub(error_rate=1.0)
+
+    assert fetch_movie.fetch_movie_data("The Matrix", quiet=True) is None
+    assert server.conditions.counts["error"] == fetch_movie.MAX_RETRIES + 1
@@ -0,0 +1,87 @@
+import sys
+
+from query_cache import QueryCache, estimate_size
+from storage.storage_json import StorageJson
+
+
+class Counter:
+    """compute() callable that counts how often it ran."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_hits_until_the_version_changes():
+    cache = QueryCache(max_bytes=1 << 20)
+    compute = Counter(["Heat"])
+
+    assert cache.get_or_compute("search", ("heat",), 1, compute) == ["Heat"]
+    assert cache.get_or_compute("search", ("heat",), 1, compute) is compute.result
+    assert compute.calls == 1
+
+    cache.get_or_compute("search", ("heat",), 2, compute)
+    assert compute.calls == 2
+    assert cache.stats()["entries"] == 1 and (cache.hits, cache.misses) == (1, 2)
+
+
+def test_storage_write_invalidates_through_data_version(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movie("Heat", 1995, 8.3, "")
+    cache = QueryCache(max_bytes=1 << 20)
+
+    def titles():
+        return cache.get_or_compute("titles", (), storage.data_version(), lambda: sorted(storage.list_movies()))
+
+    assert titles() == ["Heat"]
+    storage.add_movie("Alien", 1979, 8.5, "")
+    assert titles() == ["Alien", "Heat"]
+    StorageJson(storage.file_path).delete_movie("Heat")  # another process
+    assert titles() == ["Alien"]
+
+
+def test_least_recently_used_entries_are_evicted():
+    size = estimate_size(list(range(100)))
+    cache = QueryCache(max_bytes=size * 2)
+    for name in ("a", "b"):
+        cache.get_or_compute(name, (), 1, lambda: list(range(100)))
+    cache.get_or_compute("a", (), 1, lambda: None)  # hit: "b" is now least recently used
+
+    cache.get_or_compute("c", (), 1, lambda: list(range(100)))
+
+    assert cache.evictions == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    compute = Counter(None)
+    cache.get_or_compute("a", (), 1, compute)
+    cache.get_or_compute("c", (), 1, compute)
+    assert compute.calls == 0
+    cache.get_or_compute("b", (), 1, compute)
+    assert compute.calls == 1
+
+
+def test_unknown_version_oversized_results_and_disabled_cache_are_not_stored():
+    cache = QueryCache(max_bytes=64)
+    compute = Counter(list(range(100)))
+
+    cache.get_or_compute("big", (), 1, compute)
+    cache.get_or_compute("big", (), 1, compute)
+    cache.get_or_compute("small", (), None, Counter(1))
+    QueryCache(max_bytes=0).get_or_compute("small", (), 1, compute)
+
+    assert compute.calls == 3
+    assert cache.stats()["entries"] == 0
+
+
+def test_estimate_size_counts_nested_containers_once():
+    title = "A fairly long movie title " * 4
+    record = {"rating": 8.3, "year": 1995, "poster": ""}
+    movies = {title: record}
+
+    flat = sys.getsizeof(movies) + sys.getsizeof(title) + sys.getsizeof(record)
+    assert estimate_size(movies) >= flat
+    assert estimate_size([movies, movies]) == sys.getsizeof([movies, movies]) + estimate_size(movies)
+    assert estimate_size((title, [title])) < sys.getsizeof((title, [title])) + 2 * sys.getsizeof(title)
@@ -0,0 +1,79 @@
+import json
+
+from storage.random_index import RandomIndex, pick_random_title
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from storage.write_behind import WriteBehindStorage
+
+
+def test_remove_swaps_last_title_into_the_gap():
+    index = RandomIndex(["a", "b", "c", "d"])
+
+    index.remove("b")
+
+    assert len(index) == 3 and "b" not in index
+    assert {index.choice() for _ in range(200)} == {"a", "c", "d"}
+
+
+def test_re_adding_a_title_invalidates_weights():
+    movies = {"a": {"rating": 10.0, "year": 2000}, "b": {"rating": 0.0, "year": 2000}}
+    index = RandomIndex(movies)
+    assert pick_random_title(index, movies, weighted_by="rating") == "a"
+
+    movies["a"] = {"rating": 0.0, "year": 2000}
+    movies["b"] = {"rating": 10.0, "year": 2000}
+    index.add("a")
+    index.add("b")
+
+    assert len(index) == 2
+    assert {pick_random_title(index, movies, weighted_by="rating") for _ in range(50)} == {"b"}
+
+
+def test_write_behind_overwrite_changes_weighted_picks(tmp_path):
+    path = tmp_path / "movies.json"
+    path.write_text(json.dumps({"a": {"rating": 9.0, "year": 2000, "poster": ""},
+                                "b": {"rating": 0.0, "year": 2000, "poster": ""}}))
+    storage = WriteBehindStorage(StorageJson(str(path)), delay=60)
+    assert storage.random_movie(weighted_by="rating")[0] == "a"
+
+    storage.add_movie("a", 2000, 0.0, "")
+    storage.add_movie("b", 2000, 9.0, "")
+
+    assert {storage.random_movie(weighted_by="rating")[0] for _ in range(50)} == {"b"}
+    storage.flush()
+
+
+def test_file_backends_keep_random_index_in_step(tmp_path):
+    for storage in (StorageJson(str(tmp_path / "movies.json")), StorageCsv(str(tmp_path / "movies.csv"))):
+        storage.add_movie("a", 1990, 9.0, "")
+        assert storage.random_movie()[0] == "a"
+        storage.add_movie("b", 2005, 8.0, "")
+        storage.update_movie("a", 0.0)
+
+        assert {storage.random_movie(weighted_by="rating")[0] for _ in range(50)} == {"b"}
+        assert storage.random_movie(start_year=1980, end_year=1999)[0] == "a"
+        storage.delete_movie("b")
+        assert storage.random_movie(weighted_by="rating") is None
+
+
+def _fail_to_write(movies):
+    raise OSError("disk full")
+
+
+def test_failed_writes_leave_random_index_matching_the_file(tmp_path, capsys):
+    for storage in (StorageJson(str(tmp_path / "movies.json")), StorageCsv(str(tmp_path / "movies.csv"))):
+        storage.add_movie("Heat", 1995, 8.3, "")
+        assert storage.random_movie()[0] == "Heat"
+        capsys.readouterr()
+
+        storage._write_data = _fail_to_write
+        storage.add_movie("Alien", 1979, 8.5, "")
+        storage.delete_movie("Heat")
+        storage.update_movie("Heat", 1.0)
+
+        output = capsys.readouterr().out
+        assert output.count("Error while saving the file: disk full") == 3
+        assert "successfully" not in output
+        assert storage.list_movies() == {"Heat": {"rating": 8.3, "year": 1995, "poster": ""}}
+        assert {storage.random_movie()[0] for _ in range(20)} == {"Heat"}
+        assert storage.random_movie(weighted_by="rating")[1]["rating"] == 8.3
@@ -0,0 +1,107 @@
+import math
+import random
+
+import pytest
+
+from recommend import DIRECTOR_WEIGHT, GENRE_WEIGHT, YEAR_SCALE, SimilarityIndex
+
+GENRES = ["Drama", "Comedy", "Action", "Horror", "Romance", "Sci-Fi", "Crime"]
+DIRECTORS = [f"Director {number}" for number in range(40)]
+
+
+def _random_movie(generator):
+    movie = {"rating": round(generator.uniform(0, 10), 1), "year": generator.randint(1950, 2024)}
+    if generator.random() < 0.1:
+        return movie, None  # no OMDb metadata
+    payload = {"Genre": ", ".join(generator.sample(GENRES, generator.randint(1, 3))),
+               "Director": ", ".join(generator.sample(DIRECTORS, generator.choice([1, 1, 1, 2])))}
+    return movie, payload
+
+
+def _features(payload):
+    if not payload:
+        return frozenset(), frozenset()
+    return (frozenset(genre.strip().lower() for genre in payload["Genre"].split(",")),
+            frozenset(director.strip().lower() for director in payload["Director"].split(",")))
+
+
+def _brute_force(catalogue, title, k):
+    movie, genres, directors = catalogue[title]
+    distances = []
+    for other, (other_movie, other_genres, other_directors) in catalogue.items():
+        if other == title:
+            continue
+        squared = (((other_movie["year"] - movie["year"]) / YEAR_SCALE) ** 2
+                   + (other_movie["rating"] - movie["rating"]) ** 2
+                   + GENRE_WEIGHT ** 2 * len(genres ^ other_genres)
+                   + (0 if directors & other_directors else DIRECTOR_WEIGHT ** 2))
+        distances.append((math.sqrt(squared), other))
+    distances.sort()
+    return distances[:k]
+
+
+def _assert_matches_brute_force(index, catalogue, generator, queries=60, k=10):
+    for title in generator.sample(sorted(catalogue), queries):
+        found = index.similar(title, k)
+        expected = _brute_force(catalogue, title, k)
+        # Ties may pick different titles, but the distances must agree.
+        assert [distance for _, distance in found] == pytest.approx([distance for distance, _ in expected])
+        exact = dict((other, distance) for distance, other in _brute_force(catalogue, title, len(catalogue)))
+        for other, distance in found:
+            assert distance == pytest.approx(exact[other])
+
+
+@pytest.fixture
+def generator():
+    return random.Random(45)
+
+
+@pytest.fixture
+def catalogue(generator):
+    return {f"Movie {number}": _random_movie(generator) for number in range(1500)}
+
+
+def _build(catalogue):
+    movies = {title: movie for title, (movie, _) in catalogue.items()}
+    payloads = [(title, payload) for title, (_, payload) in catalogue.items() if payload]
+    reference = {title: (movie, *_features(payload)) for title, (movie, payload) in catalogue.items()}
+    return SimilarityIndex.build(movies, payloads), reference
+
+
+def test_similar_matches_brute_force(catalogue, generator):
+    index, reference = _build(catalogue)
+
+    _assert_matches_brute_force(index, reference, generator)
+
+
+def test_similar_matches_brute_force_after_changes(catalogue, generator):
+    index, reference = _build(catalogue)
+
+    for number in range(1500):  # doubles some groups, so they are re-gridded
+        movie, payload = _random_movie(generator)
+        index.add_movie(f"New {number}", movie, payload)
+        reference[f"New {number}"] = (movie, *_features(payload))
+    for title in generator.sample(sorted(reference), 1200):  # tombstones half of some groups
+        index.remove_movie(title)
+        del reference[title]
+    for title in generator.sample(sorted(reference), 500):
+        rating = round(generator.uniform(0, 10), 1)
+        index.set_rating(title, rating)
+        movie, genres, directors = reference[title]
+        reference[title] = ({**movie, "rating": rating}, genres, directors)
+
+    assert len(index) == len(reference)
+    for title, (movie, _, _) in generator.sample(sorted(reference.items()), 50):
+        assert index.movie(title) == {"rating": movie["rating"], "year": movie["year"]}
+    _assert_matches_brute_force(index, reference, generator)
+
+
+def test_re_adding_a_title_replaces_it_and_unknown_titles_are_empty(catalogue):
+    index, _ = _build(catalogue)
+
+    index.add_movie("Movie 0", {"rating": 1.0, "year": 1960}, {"Genre": "Horror", "Director": "Someone"})
+
+    assert len(index) == len(catalogue)
+    assert index.movie("Movie 0") == {"rating": 1.0, "year": 1960}
+    assert index.similar("Nope") == [] and index.similar("Movie 0", k=0) == []
+    assert "Movie 0" not in [title for title, _ in index.similar("Movie 0", k=len(catalogue))]
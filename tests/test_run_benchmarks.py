@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.run_benchmarks import BACKENDS, open_populated_storage
+from benchmarks.synthetic_catalogue import generate_catalogue
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_every_backend_is_opened_with_the_whole_catalogue(tmp_path, backend):
+    movies = generate_catalogue(300)
+
+    storage = open_populated_storage(backend, movies, str(tmp_path))
+
+    assert storage.list_movies() == movies
+    assert storage.random_movie()[0] in movies
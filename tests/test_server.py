@@ -0,0 +1,184 @@
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from server import create_server, serve_in_background
+from storage.storage_json import StorageJson
+
+MOVIES = {
+    "Heat": {"rating": 8.3, "year": 1995, "poster": "p1"},
+    "Alien": {"rating": 8.5, "year": 1979, "poster": "p2"},
+    "Cats": {"rating": 2.8, "year": 2019, "poster": "p3"},
+}
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "movies.json"
+    path.write_text(json.dumps(MOVIES))
+    return str(path)
+
+
+@pytest.fixture
+def server(data_file):
+    server = create_server(StorageJson(data_file), port=0, workers=2, refresh_interval=0.05)
+    serve_in_background(server)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _connect(server):
+    return http.client.HTTPConnection(*server.server_address, timeout=5)
+
+
+def _request(server, method, path, body=None, headers=None, connection=None):
+    connection = connection or _connect(server)
+    payload = json.dumps(body) if body is not None else None
+    connection.request(method, path, body=payload, headers=headers or {})
+    response = connection.getresponse()
+    data = response.read()
+    return response, json.loads(data) if data else None
+
+
+def test_get_returns_etag_and_revalidates_with_304(server):
+    response, body = _request(server, "GET", "/movies")
+    etag = response.getheader("ETag")
+    assert response.status == 200 and body["total"] == 3 and etag
+
+    response, body = _request(server, "GET", "/movies", headers={"If-None-Match": etag})
+    assert response.status == 304 and body is None
+
+    _request(server, "PATCH", "/movies/Cats", {"rating": 3.0})
+    response, body = _request(server, "GET", "/movies", headers={"If-None-Match": etag})
+    assert response.status == 200 and response.getheader("ETag") != etag
+
+
+def test_pagination_and_sorting(server):
+    _, body = _request(server, "GET", "/movies?sort=rating&order=desc&page=1&per_page=2")
+    assert [movie["title"] for movie in body["movies"]] == ["Alien", "Heat"]
+    assert (body["total"], body["page"], body["per_page"]) == (3, 1, 2)
+
+    _, body = _request(server, "GET", "/movies?sort=rating&order=desc&page=2&per_page=2")
+    assert [movie["title"] for movie in body["movies"]] == ["Cats"]
+
+    response, _ = _request(server, "GET", "/movies?sort=title")
+    assert response.status == 400
+
+
+def test_writes_are_stored_and_validated(server, data_file):
+    response, _ = _request(server, "POST", "/movies", {"title": "Up", "year": 2009, "rating": 8.3})
+    assert response.status == 201
+    response, _ = _request(server, "POST", "/movies", {"title": "Up", "year": 2009, "rating": 8.3})
+    assert response.status == 409
+    response, _ = _request(server, "POST", "/movies", {"title": "Down", "year": 2009, "rating": 11})
+    assert response.status == 400
+    response, _ = _request(server, "PATCH", "/movies/Heat", {"rating": 9.0})
+    assert response.status == 200
+    response, _ = _request(server, "DELETE", "/movies/Cats")
+    assert response.status == 200
+    response, _ = _request(server, "DELETE", "/movies/Cats")
+    assert response.status == 404
+
+    _, body = _request(server, "GET", "/movies/Heat")
+    assert body["rating"] == 9.0
+    on_disk = json.loads(open(data_file).read())
+    assert set(on_disk) == {"Heat", "Alien", "Up"} and on_disk["Heat"]["rating"] == 9.0
+
+
+def test_external_edits_are_served_after_refresh(server, data_file):
+    _request(server, "GET", "/stats")
+    StorageJson(data_file).update_movie("Alien", 9.9)
+    time.sleep(0.1)
+
+    _, body = _request(server, "GET", "/movies/Alien")
+    assert body["rating"] == 9.9
+
+
+def test_idle_keep_alive_connections_do_not_block_other_clients(server):
+    # More idle keep-alive connections than workers.
+    idle = [_connect(server) for _ in range(4)]
+    for connection in idle:
+        response, _ = _request(server, "GET", "/stats", connection=connection)
+        assert response.status == 200
+
+    started = time.monotonic()
+    response, body = _request(server, "GET", "/stats")
+    assert response.status == 200 and body["count"] == 3
+    assert time.monotonic() - started < 1
+
+    for connection in idle:
+        response, _ = _request(server, "GET", "/stats", connection=connection)
+        assert response.status == 200
+        connection.close()
+
+
+class SlowStorage(StorageJson):
+    """Widens the window between a write's check and the write itself."""
+
+    def add_movie(self, *args):
+        time.sleep(0.2)
+        super().add_movie(*args)
+
+    def delete_movie(self, title):
+        time.sleep(0.2)
+        super().delete_movie(title)
+
+
+def _serve(storage, workers=4):
+    server = create_server(storage, port=0, workers=workers, refresh_interval=0.05)
+    serve_in_background(server)
+    return server
+
+
+def _concurrently(server, method, path, body=None, clients=3):
+    with ThreadPoolExecutor(clients) as pool:
+        futures = [pool.submit(_request, server, method, path, body) for _ in range(clients)]
+        return sorted(future.result()[0].status for future in futures)
+
+
+def test_concurrent_writes_are_checked_under_the_write_lock(data_file):
+    server = _serve(SlowStorage(data_file))
+    try:
+        assert _concurrently(server, "POST", "/movies", {"title": "Up", "year": 2009}) == [201, 409, 409]
+        assert _concurrently(server, "DELETE", "/movies/Cats") == [200, 404, 404]
+        response, _ = _request(server, "PATCH", "/movies/Cats", {"rating": 3.0})
+        assert response.status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_storage_errors_are_reported_as_500(data_file, capsys):
+    storage = StorageJson(data_file)
+    server = _serve(storage)
+    try:
+        def fail_to_write(movies):
+            raise OSError("disk full")
+
+        storage._write_data = fail_to_write  # printed, not raised: caught by the saved check
+        response, body = _request(server, "POST", "/movies", {"title": "Up", "year": 2009})
+        assert response.status == 500 and "not saved" in body["error"]
+
+        storage.delete_movie = lambda title: 1 / 0
+        response, body = _request(server, "DELETE", "/movies/Cats")
+        assert response.status == 500 and "division by zero" in body["error"]
+
+        response, body = _request(server, "GET", "/movies")
+        assert response.status == 200 and body["total"] == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_only_valid_requests_get_a_304(server):
+    response, _ = _request(server, "GET", "/movies")
+    etag = response.getheader("ETag")
+
+    for path, status in (("/nowhere", 404), ("/movies/Nope", 404), ("/movies?page=x", 400),
+                         ("/movies?sort=title", 400), ("/movies/filter?min_rating=high", 400)):
+        response, _ = _request(server, "GET", path, headers={"If-None-Match": etag})
+        assert response.status == status, path
@@ -0,0 +1,39 @@
+import pytest
+
+from storage.storage_factory import open_storage
+from storage.storage_json import StorageJson
+from storage.storage_sharded import StorageSharded
+from storage.storage_versioned import StorageVersioned
+from storage.watched_storage import WatchedStorage
+
+
+def test_extension_selects_file_backend(tmp_path):
+    assert isinstance(open_storage(str(tmp_path / "movies.json")), StorageJson)
+    assert isinstance(open_storage(str(tmp_path / "movies.json"), watch=True), WatchedStorage)
+    with pytest.raises(ValueError):
+        open_storage(str(tmp_path / "movies.txt"))
+
+
+def test_scheme_selects_sharded_storage_with_options(tmp_path):
+    storage = open_storage(f"sharded:{tmp_path}?partition=decade&extension=.csv")
+
+    assert isinstance(storage, StorageSharded)
+    assert (storage.partition, storage.extension) == ("decade", ".csv")
+
+
+def test_scheme_selects_versioned_storage_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("MOVIE_APP_STORAGE", f"versioned:{tmp_path}?keep_generations=2")
+
+    storage = open_storage(lazy=True, watch=True)
+    storage.add_movie("Heat", 1995, 8.3, "")
+
+    assert isinstance(storage.backend, StorageVersioned)
+    assert storage.keep_generations == 2
+    assert set(storage.list_movies()) == {"Heat"}
+
+
+def test_invalid_directory_storage_locations(tmp_path):
+    with pytest.raises(ValueError):
+        open_storage(f"sharded:{tmp_path}?colour=blue")
+    with pytest.raises(ValueError):
+        open_storage("versioned:")
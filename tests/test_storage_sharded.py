@@ -0,0 +1,81 @@
+import pytest
+
+from storage.storage_sharded import PARTITION_DECADE, PARTITION_HASH, StorageSharded
+
+MOVIES = [("Alien", 1979, 8.5), ("Heat", 1995, 8.3), ("Up", 2009, 8.3), ("Her", 2013, 8.0)]
+
+
+@pytest.fixture
+def decade_dir(tmp_path):
+    storage = StorageSharded(str(tmp_path), partition=PARTITION_DECADE)
+    for title, year, rating in MOVIES:
+        storage.add_movie(title, year, rating, "")
+    return str(tmp_path)
+
+
+def _count_shard_reads(storage):
+    reads = []
+    for key, shard in storage._shards.items():
+        def list_movies(list_movies=shard.list_movies, key=key):
+            reads.append(key)
+            return list_movies()
+        shard.list_movies = list_movies
+    return reads
+
+
+@pytest.mark.parametrize("partition", [PARTITION_HASH, PARTITION_DECADE])
+def test_crud_across_shards(tmp_path, partition):
+    storage = StorageSharded(str(tmp_path), partition=partition, shards=4)
+    for title, year, rating in MOVIES:
+        storage.add_movie(title, year, rating, "")
+    storage.update_movie("Heat", 9.0)
+    storage.delete_movie("Up")
+
+    movies = StorageSharded(str(tmp_path), partition=partition, shards=4).list_movies()
+
+    assert set(movies) == {"Alien", "Heat", "Her"}
+    assert movies["Heat"]["rating"] == 9.0
+
+
+def test_year_range_reads_only_overlapping_decades(decade_dir):
+    storage = StorageSharded(decade_dir, partition=PARTITION_DECADE)
+    reads = _count_shard_reads(storage)
+
+    assert set(storage.list_movies_in_years(2000, 2010)) == {"Up"}
+    assert sorted(reads) == ["2000s", "2010s"]
+
+
+def test_update_on_fresh_instance_stops_at_the_holding_shard(decade_dir):
+    storage = StorageSharded(decade_dir, partition=PARTITION_DECADE)
+    reads = _count_shard_reads(storage)
+
+    storage.update_movie("Alien", 9.0)  # 1970s is the first shard
+
+    assert reads == ["1970s"]
+    assert storage.list_movies()["Alien"]["rating"] == 9.0
+
+
+def test_adds_read_each_shard_at_most_once(decade_dir):
+    storage = StorageSharded(decade_dir, partition=PARTITION_DECADE)
+    reads = _count_shard_reads(storage)
+
+    storage.add_movie("Tron", 1982, 6.8, "")
+    storage.add_movie("Jaws", 1975, 8.1, "")
+    storage.add_movie("Dune", 2021, 8.0, "")
+
+    assert sorted(reads) == ["1970s", "1990s", "2000s", "2010s"]
+
+
+def test_re_adding_with_another_year_moves_the_movie(decade_dir):
+    storage = StorageSharded(decade_dir, partition=PARTITION_DECADE)
+
+    storage.add_movie("Heat", 1986, 6.0, "")
+
+    assert "Heat" not in storage.list_movies_in_years(1990, 1999)
+    assert storage.list_movies()["Heat"]["year"] == 1986
+
+
+def test_only_the_sharded_storage_announces_itself(tmp_path, capsys):
+    StorageSharded(str(tmp_path), partition=PARTITION_HASH, shards=4)
+
+    assert capsys.readouterr().out.count("[INFO] Storage ready") == 1
@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+
+import pytest
+
+from storage import storage_versioned
+from storage.storage_versioned import CURRENT_FILE, StorageVersioned
+
+
+def _current(directory):
+    with open(os.path.join(directory, CURRENT_FILE)) as current_file:
+        return int(current_file.read())
+
+
+def test_open_publishes_first_generation_left_by_a_crash(tmp_path):
+    # Crash after linking gen-00000001.json, before CURRENT was written.
+    directory = str(tmp_path)
+    (tmp_path / "gen-00000001.json").write_text(json.dumps({"Heat": {"rating": 8.3, "year": 1995, "poster": ""}}))
+
+    storage = StorageVersioned(directory)
+
+    assert _current(directory) == 1
+    assert set(storage.list_movies()) == {"Heat"}
+
+
+def test_open_rolls_current_forward_after_crash_during_publish(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    storage = StorageVersioned(directory)
+    storage.add_movie("Heat", 1995, 8.3, "")
+
+    def crash(generation):
+        raise KeyboardInterrupt("killed before CURRENT was written")
+
+    monkeypatch.setattr(storage, "_advance_current", crash)
+    with pytest.raises(KeyboardInterrupt):
+        storage.add_movie("Alien", 1979, 8.5, "")
+    assert _current(directory) == 2
+
+    reopened = StorageVersioned(directory)
+
+    assert _current(directory) == 3
+    assert set(reopened.list_movies()) == {"Heat", "Alien"}
+    reopened.update_movie("Alien", 9.0)
+    assert reopened.list_movies()["Alien"]["rating"] == 9.0
+
+
+def test_snapshots_are_isolated_from_later_writes(tmp_path):
+    storage = StorageVersioned(str(tmp_path))
+    storage.add_movie("Heat", 1995, 8.3, "")
+    before = storage.snapshot()
+
+    storage.update_movie("Heat", 9.5)
+    storage.delete_movie("Heat")
+
+    assert before.movies["Heat"]["rating"] == 8.3
+    assert storage.list_movies() == {}
+
+
+def test_list_movies_returns_a_plain_dict_and_snapshots_stay_read_only(tmp_path):
+    storage = StorageVersioned(str(tmp_path))
+    storage.add_movie("Heat", 1995, 8.3, "")
+
+    movies = storage.list_movies()
+    movies["Heat"]["rating"] = 1.0
+    movies["Alien"] = {"rating": 8.5, "year": 1979, "poster": ""}
+
+    assert type(movies) is dict and type(movies["Heat"]) is dict
+    assert json.loads(json.dumps(movies)) == movies
+    assert storage.list_movies() == {"Heat": {"rating": 8.3, "year": 1995, "poster": ""}}
+    with pytest.raises(TypeError):
+        storage.snapshot().movies["Heat"]["rating"] = 1.0
+
+
+def test_old_generations_are_collected_unless_pinned(tmp_path):
+    storage = StorageVersioned(str(tmp_path), keep_generations=2)
+    storage.add_movie("Heat", 1995, 8.3, "")
+    pinned = storage.snapshot()
+    for rating in (1.0, 2.0, 3.0, 4.0):
+        storage.update_movie("Heat", rating)
+
+    generations = sorted(name for name in os.listdir(tmp_path) if storage_versioned.GENERATION_PATTERN.match(name))
+
+    assert generations == ["gen-00000002.json", "gen-00000005.json", "gen-00000006.json"]
+    assert pinned.movies["Heat"]["rating"] == 8.3
+
+
+def test_concurrent_writers_lose_no_update(tmp_path):
+    directory = str(tmp_path)
+    StorageVersioned(directory)
+
+    def writer(name):
+        storage = StorageVersioned(directory)
+        for number in range(20):
+            storage.add_movie(f"{name} {number}", 2000, 7.0, "")
+
+    threads = [threading.Thread(target=writer, args=(name,)) for name in ("a", "b", "c")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(StorageVersioned(directory).list_movies()) == 60
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from storage.file_watch import PollingWatcher, watch_file
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from storage.watched_storage import WatchedStorage
+
+
+@pytest.fixture(params=["poll", "inotify"])
+def method(request):
+    if request.param == "inotify":
+        try:
+            watch_file(__file__, "inotify").close()
+        except OSError:
+            pytest.skip("inotify is not available")
+    return request.param
+
+
+def _open(path, method, backend_class=StorageJson):
+    backend = backend_class(str(path))
+    return WatchedStorage(backend, watch_file(backend.file_path, method, interval=0))
+
+
+def _refresh(storage, timeout=2.0):
+    # Polling needs two checks that see the same file before it reports.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if storage.refresh():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.parametrize("backend_class, name", [(StorageJson, "movies.json"), (StorageCsv, "movies.csv")])
+def test_external_edit_is_applied_as_a_diff(tmp_path, method, backend_class, name):
+    path = tmp_path / name
+    other = backend_class(str(path))
+    other.add_movie("Inception", 2010, 8.8, "")
+    other.add_movie("Titanic", 1997, 7.9, "")
+    storage = _open(path, method, backend_class)
+    assert storage.random_movie() is not None
+    version = storage.data_version()
+
+    other.update_movie("Inception", 9.1)
+    other.delete_movie("Titanic")
+    other.add_movie("Memento", 2000, 8.4, "")
+
+    assert _refresh(storage)
+    assert storage.last_diff == {"added": 1, "removed": 1, "changed": 1}
+    assert storage.data_version() == version + 1
+    assert storage.list_movies()["Inception"]["rating"] == 9.1
+    assert {storage.random_movie()[0] for _ in range(100)} == {"Inception", "Memento"}
+    storage.close()
+
+
+def test_identical_rewrite_keeps_the_data_version(tmp_path, method):
+    path = tmp_path / "movies.json"
+    other = StorageJson(str(path))
+    other.add_movie("Inception", 2010, 8.8, "")
+    storage = _open(path, method)
+    version = storage.data_version()
+
+    other._save_data(other._load_data())
+
+    assert not _refresh(storage, timeout=0.3)
+    assert storage.reloads == 1
+    assert storage.last_diff == {"added": 0, "removed": 0, "changed": 0}
+    assert storage.data_version() == version
+    storage.close()
+
+
+def test_own_writes_are_not_reloaded(tmp_path, method):
+    storage = _open(tmp_path / "movies.json", method)
+
+    storage.add_movie("Inception", 2010, 8.8, "")
+    storage.update_movie("Inception", 9.0)
+
+    assert not _refresh(storage, timeout=0.3)
+    assert storage.reloads == 0
+    assert StorageJson(storage.file_path).list_movies()["Inception"]["rating"] == 9.0
+    storage.close()
+
+
+def test_polling_waits_until_the_file_is_stable(tmp_path):
+    path = tmp_path / "movies.json"
+    path.write_text("{}")
+    watcher = PollingWatcher(str(path), interval=0)
+
+    path.write_text('{"Inception": {}}')
+
+    assert not watcher.changed()  # still being written, as far as it can tell
+    assert watcher.changed()
+    assert not watcher.changed()
+
+
+def test_unknown_watch_method_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        watch_file(str(tmp_path / "movies.json"), "kqueue")
+
+
+def test_failed_write_leaves_memory_and_version_alone(tmp_path, capsys):
+    storage = _open(tmp_path / "movies.json", "poll")
+    storage.add_movie("Heat", 1995, 8.3, "")
+    assert storage.random_movie()[0] == "Heat"
+    version = storage.data_version()
+
+    def fail_to_write(movies):
+        raise OSError("disk full")
+
+    storage.backend._write_data = fail_to_write
+    capsys.readouterr()
+    storage.add_movie("Alien", 1979, 8.5, "")
+    storage.update_movie("Heat", 1.0)
+    storage.delete_movie("Heat")
+
+    output = capsys.readouterr().out
+    assert output.count("Error while saving the file: disk full") == 3
+    assert "successfully" not in output
+    assert storage.data_version() == version
+    assert storage.list_movies() == StorageJson(storage.file_path).list_movies()
+    assert storage.list_movies() == {"Heat": {"rating": 8.3, "year": 1995, "poster": ""}}
+    assert {storage.random_movie()[0] for _ in range(20)} == {"Heat"}
+    storage.close()
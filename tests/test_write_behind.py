@@ -0,0 +1,114 @@
+import json
+import os
+import time
+
+import pytest
+
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from storage.write_behind import WriteBehindStorage, _flush_at_exit
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def _block_writes(path):
+    # Tests may run as root, which ignores file permissions: a directory in
+    # place of the data file makes the final rename fail for everyone.
+    os.remove(path)
+    os.mkdir(path)
+
+
+def _unblock_writes(path):
+    os.rmdir(path)
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "movies.json"
+    path.write_text(json.dumps({"Heat": {"rating": 8.3, "year": 1995, "poster": "p"}}))
+    return str(path)
+
+
+def test_mutations_are_coalesced_into_one_write(json_path):
+    storage = WriteBehindStorage(StorageJson(json_path), delay=60)
+    for rating in (7.0, 7.5, 8.0):
+        storage.update_movie("Heat", rating)
+    storage.add_movie("Inception", 2010, 8.8, "p")
+
+    assert storage.pending == 4
+    assert json.loads(open(json_path).read())["Heat"]["rating"] == 8.3
+    assert storage.list_movies()["Heat"]["rating"] == 8.0
+
+    assert storage.flush() == 4
+    assert storage.pending == 0
+    on_disk = json.loads(open(json_path).read())
+    assert on_disk["Heat"]["rating"] == 8.0 and "Inception" in on_disk
+    assert storage.flush() == 0
+
+
+def test_max_pending_triggers_write(json_path):
+    storage = WriteBehindStorage(StorageJson(json_path), delay=60, max_pending=3)
+    for year in (2001, 2002, 2003):
+        storage.add_movie(f"Movie {year}", year, 7.0, "p")
+
+    assert storage.pending == 0
+    assert len(json.loads(open(json_path).read())) == 4
+
+
+def test_debounce_timer_writes_after_delay(json_path):
+    storage = WriteBehindStorage(StorageJson(json_path), delay=0.05)
+    storage.delete_movie("Heat")
+
+    assert _wait_for(lambda: json.loads(open(json_path).read()) == {})
+    assert storage.pending == 0
+
+
+@pytest.mark.parametrize("backend, name", [(StorageJson, "movies.json"), (StorageCsv, "movies.csv")])
+def test_failed_flush_keeps_mutations_pending(tmp_path, backend, name):
+    path = str(tmp_path / name)
+    storage = WriteBehindStorage(backend(path), delay=60)
+    storage.add_movie("Inception", 2010, 8.8, "p")
+    storage.update_movie("Inception", 9.0)
+    _block_writes(path)
+
+    with pytest.raises(OSError):
+        storage.flush()
+    assert storage.pending == 2
+    assert storage.list_movies()["Inception"]["rating"] == 9.0
+
+    _unblock_writes(path)
+    assert storage.flush() == 2
+    assert backend(path).list_movies()["Inception"]["rating"] == 9.0
+
+
+def test_failed_background_write_is_retried(json_path, capsys):
+    storage = WriteBehindStorage(StorageJson(json_path), delay=0.05)
+    _block_writes(json_path)
+    storage.update_movie("Heat", 9.9)
+
+    output = []
+    assert _wait_for(lambda: output.append(capsys.readouterr().out) or "Retrying" in "".join(output))
+    assert storage.pending == 1
+
+    _unblock_writes(json_path)
+    assert _wait_for(lambda: os.path.isfile(json_path))
+    assert storage.pending == 0
+    assert json.loads(open(json_path).read())["Heat"]["rating"] == 9.9
+
+
+def test_exit_flush_reports_failure_instead_of_raising(json_path, capsys):
+    storage = WriteBehindStorage(StorageJson(json_path), delay=60)
+    storage.update_movie("Heat", 9.9)
+    _block_writes(json_path)
+
+    _flush_at_exit(lambda: storage)
+
+    assert "1 changes were not saved" in capsys.readouterr().out
+    assert storage.pending == 1
+    _unblock_writes(json_path)
+    storage.flush()